@@ -4,10 +4,12 @@ adhan — core domain package for the Adhan Clock application.
 Public API:
     PrayerClock     stateful service for the local machine's prayer schedule
     PrayerSchedule  value object: prayer times for one day
+    PrayerScheduler event-driven timer that fires at each prayer time
     Config          application settings
     Coordinates     latitude/longitude pair
 """
 from adhan.clock import PrayerClock
 from adhan.models import Config, Coordinates, PrayerSchedule
+from adhan.scheduler import PrayerScheduler
 
-__all__ = ["PrayerClock", "PrayerSchedule", "Config", "Coordinates"]
+__all__ = ["PrayerClock", "PrayerSchedule", "PrayerScheduler", "Config", "Coordinates"]
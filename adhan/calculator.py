@@ -3,13 +3,19 @@ Pure prayer-time calculation — no side effects, no I/O, no state.
 
 Takes inputs, returns a PrayerSchedule.  Can be called with any city's
 coordinates, making it usable from the GUI, the daemon, and the chatbot.
+calculate_range() does the same for a whole date range in one vectorised
+pass and returns a columnar PrayerTimetable.
 """
 from __future__ import annotations
 
-from datetime import date
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator
 
+import numpy as np
 import pytz
 from adhanpy.PrayerTimes import PrayerTimes
+from adhanpy.astronomy.CalendricalHelper import julian_day
 from adhanpy.calculation.CalculationMethod import CalculationMethod
 from adhanpy.calculation.CalculationParameters import CalculationParameters
 
@@ -55,3 +61,387 @@ def calculate(
         isha=_local(pt.isha),
         timezone_name=tz.zone,
     )
+
+
+# ── Multi-day engine ──────────────────────────────────────────────────────────
+#
+# calculate_range() is a NumPy port of adhanpy's PrayerTimes that works on a
+# whole date range at once.  Every expression mirrors the adhanpy source
+# (including its truncation and rounding quirks) so the results land on
+# exactly the same minutes — calculate() stays the reference implementation.
+
+PRAYER_NAMES = ("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha")
+
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass(frozen=True)
+class PrayerTimetable:
+    """
+    Columnar prayer times for a contiguous, inclusive date range.
+
+    Each prayer column is an int64 array of minute-rounded UTC epoch seconds,
+    one entry per day.  Local wall-clock values are derived with one vectorised
+    UTC-offset lookup instead of a datetime.astimezone() call per time.
+    """
+    start: date
+    tz: pytz.BaseTzInfo
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.columns["fajr"])
+
+    def __getitem__(self, i: int) -> PrayerSchedule:
+        return self.schedule(i)
+
+    def __iter__(self) -> Iterator[PrayerSchedule]:
+        return (self.schedule(i) for i in range(len(self)))
+
+    @property
+    def timezone_name(self) -> str:
+        return self.tz.zone
+
+    @property
+    def dates(self) -> list[date]:
+        return [self.start + timedelta(days=i) for i in range(len(self))]
+
+    def utc_offsets(self, name: str) -> np.ndarray:
+        """UTC offset in seconds of the timezone at each time in column `name`."""
+        return _utc_offsets(self.tz, self.columns[name])
+
+    def local_minutes(self, name: str) -> np.ndarray:
+        """Minutes after local midnight for each time in column `name`."""
+        local = self.columns[name] + self.utc_offsets(name)
+        return (local // 60) % 1440
+
+    def schedule(self, i: int) -> PrayerSchedule:
+        """Materialise day `i` as a PrayerSchedule (same values as calculate())."""
+        i = range(len(self))[i]           # negative indices; IndexError when out of range
+        times = {
+            name: datetime.fromtimestamp(int(col[i]), self.tz)
+            for name, col in self.columns.items()
+        }
+        return PrayerSchedule(
+            date=self.start + timedelta(days=i),
+            timezone_name=self.tz.zone,
+            **times,
+        )
+
+    def as_columns(self) -> dict[str, list[str]]:
+        """
+        Return HH:MM string lists keyed by prayer name (as in
+        PrayerSchedule.as_dict()), one entry per day.
+        """
+        columns = {}
+        for name in PRAYER_NAMES:
+            minutes = self.local_minutes(name).tolist()
+            columns[name.capitalize()] = [f"{m // 60:02d}:{m % 60:02d}" for m in minutes]
+        return columns
+
+    def as_rows(self) -> list[dict[str, str]]:
+        """
+        Return one dict per day: the ISO date plus HH:MM strings keyed by
+        prayer name, matching PrayerSchedule.as_dict().
+        """
+        columns = self.as_columns()
+        return [
+            {"Date": d.isoformat(), **{name: col[i] for name, col in columns.items()}}
+            for i, d in enumerate(self.dates)
+        ]
+
+
+def calculate_range(
+    start: date,
+    end: date,
+    coords: Coordinates,
+    params: CalculationParameters,
+    tz: pytz.BaseTzInfo,
+) -> PrayerTimetable:
+    """
+    Calculate prayer times for every date from `start` to `end` inclusive.
+
+    Equivalent to calling calculate() once per day, but the solar position,
+    hour angles and rounding are evaluated for the whole range in one pass.
+    Raises ValueError if end < start, or if the sun never rises, sets or
+    reaches the Asr shadow on some day (where adhanpy raises RuntimeError).
+    """
+    n = (end - start).days + 1
+    if n < 1:
+        raise ValueError(f"end ({end}) is before start ({start})")
+
+    lat, lon = coords.latitude, coords.longitude
+    days = np.arange(n + 1, dtype=np.int64)   # one extra day for tomorrow's sunrise
+    midnight = (start.toordinal() - _UNIX_EPOCH_ORDINAL + days) * 86400
+
+    # Solar coordinates from the day before `start` to two days after `end`
+    jd0 = julian_day(start.year, start.month, start.day)
+    solar = _solar_coordinates(jd0 + np.arange(-1, n + 2, dtype=np.float64))
+    prev_ = {k: v[:-2] for k, v in solar.items()}
+    today = {k: v[1:-1] for k, v in solar.items()}
+    next_ = {k: v[2:] for k, v in solar.items()}
+
+    lw = lon * -1
+    m0 = _normalize_with_bound(
+        (today["right_ascension"] + lw - today["sidereal_time"]) / 360, 1
+    )
+
+    def hour_angle(h0, after_transit: bool) -> np.ndarray:
+        return _corrected_hour_angle(m0, h0, lat, lon, after_transit, today, prev_, next_)
+
+    theta = _unwind_angle(today["sidereal_time"] + (360.985647 * m0))
+    alpha = _unwind_angle(_interpolate_angles(
+        today["right_ascension"], prev_["right_ascension"], next_["right_ascension"], m0,
+    ))
+    transit = (m0 + _closest_angle(theta - lw - alpha) / -360) * 24
+
+    solar_altitude = -50.0 / 60.0
+    sunrise = _to_epoch(hour_angle(solar_altitude, False), midnight)
+    sunset = _to_epoch(hour_angle(solar_altitude, True), midnight)
+    dhuhr = _to_epoch(transit, midnight)
+
+    shadow = params.madhab.get_shadow_length().shadow_length
+    tangent = np.abs(lat - today["declination"])
+    inverse = shadow + np.tan(np.radians(tangent))
+    asr = _to_epoch(hour_angle(np.degrees(np.arctan(1.0 / inverse)), True), midnight)
+
+    tomorrow_sunrise = sunrise[1:]
+    sunrise, sunset, dhuhr, asr = sunrise[:-1], sunset[:-1], dhuhr[:-1], asr[:-1]
+    midnight = midnight[:-1]
+
+    invalid = (
+        np.isnan(sunrise) | np.isnan(sunset) | np.isnan(dhuhr)
+        | np.isnan(tomorrow_sunrise) | np.isnan(asr)
+    )
+    if invalid.any():
+        bad = [str(start + timedelta(days=int(i))) for i in np.flatnonzero(invalid)[:3]]
+        raise ValueError(
+            f"Prayer times are undefined at {coords} on {', '.join(bad)}"
+            f"{' ...' if invalid.sum() > 3 else ''}"
+        )
+
+    night_length = tomorrow_sunrise * 1000 - sunset * 1000
+    portions = params.night_portions()
+    is_moonsighting = params.method == CalculationMethod.MOON_SIGHTING_COMMITTEE
+    if is_moonsighting:
+        doy, leap = _day_of_year(start, n)
+
+    # Fajr — never earlier than the high-latitude safe bound
+    fajr = _to_epoch(hour_angle(-params.fajr_angle, False)[:-1], midnight)
+    if is_moonsighting:
+        if lat >= 55:
+            fajr = sunrise - np.trunc(night_length / 7000)
+        safe_fajr = sunrise - _season_adjustment(lat, doy, leap, _MORNING_TWILIGHT)
+    else:
+        safe_fajr = sunrise - np.trunc(portions.fajr * night_length / 1000)
+    fajr = np.where(np.isnan(fajr) | (fajr < safe_fajr), safe_fajr, fajr)
+
+    # Isha — fixed interval after sunset, or angle-based with a safe bound
+    if params.isha_interval is not None and params.isha_interval >= 1:
+        isha = sunset + params.isha_interval * 60
+    else:
+        isha = _to_epoch(hour_angle(-params.isha_angle, True)[:-1], midnight)
+        if is_moonsighting:
+            if lat >= 55:
+                isha = sunset + np.trunc(night_length / 7000)
+            safe_isha = sunset + _season_adjustment(lat, doy, leap, _EVENING_TWILIGHT)
+        else:
+            safe_isha = sunset + np.trunc(portions.isha * night_length / 1000)
+        isha = np.where(np.isnan(isha) | (isha > safe_isha), safe_isha, isha)
+
+    raw = {
+        "fajr": fajr, "sunrise": sunrise, "dhuhr": dhuhr,
+        "asr": asr, "maghrib": sunset, "isha": isha,
+    }
+    columns = {}
+    for name in PRAYER_NAMES:
+        offset = getattr(params.adjustments, name) + getattr(params.method_adjustments, name)
+        columns[name] = _rounded_minute(raw[name].astype(np.int64) + int(offset * 60))
+    return PrayerTimetable(start=start, tz=tz, columns=columns)
+
+
+def _unwind_angle(value):
+    return _normalize_with_bound(value, 360)
+
+
+def _normalize_with_bound(value, bound):
+    return value - (bound * np.floor(value / bound))
+
+
+def _closest_angle(angle):
+    inside = (angle >= -180) & (angle <= 180)
+    return np.where(inside, angle, angle - (360 * np.round(angle / 360)))
+
+
+def _interpolate(y2, y1, y3, n):
+    a = y2 - y1
+    b = y3 - y2
+    c = b - a
+    return y2 + ((n / 2) * (a + b + (n * c)))
+
+
+def _interpolate_angles(y2, y1, y3, n):
+    a = _unwind_angle(y2 - y1)
+    b = _unwind_angle(y3 - y2)
+    c = b - a
+    return y2 + ((n / 2) * (a + b + (n * c)))
+
+
+def _solar_coordinates(jd: np.ndarray) -> dict[str, np.ndarray]:
+    """Declination, right ascension and apparent sidereal time for each Julian day."""
+    t = (jd - 2451545.0) / 36525
+    l0 = _unwind_angle(280.4664567 + 36000.76983 * t + 0.0003032 * (t**2))
+    lp = _unwind_angle(218.3165 + 481267.8813 * t)
+    omega = _unwind_angle(125.04452 - 1934.136261 * t + 0.0020708 * (t**2) + (t**3) / 450000)
+    m = np.radians(_unwind_angle(357.52911 + 35999.05029 * t - 0.0001537 * (t**2)))
+
+    # Equation of the centre → apparent solar longitude
+    centre = (
+        (1.914602 - (0.004817 * t) - (0.000014 * (t**2))) * np.sin(m)
+        + (0.019993 - (0.000101 * t)) * np.sin(2 * m)
+        + 0.000289 * np.sin(3 * m)
+    )
+    omega_app = 125.04 - (1934.136 * t)
+    lam = np.radians(_unwind_angle(
+        l0 + centre - 0.00569 - (0.00478 * np.sin(np.radians(omega_app)))
+    ))
+
+    jd_t = (t * 36525) + 2451545.0
+    theta0 = _unwind_angle(
+        280.46061837 + 360.98564736629 * (jd_t - 2451545)
+        + 0.000387933 * (t**2) - (t**3) / 38710000
+    )
+    d_psi = (
+        (-17.2 / 3600) * np.sin(np.radians(omega))
+        - (1.32 / 3600) * np.sin(2 * np.radians(l0))
+        - (0.23 / 3600) * np.sin(2 * np.radians(lp))
+        + (0.21 / 3600) * np.sin(2 * np.radians(omega))
+    )
+    d_eps = (
+        (9.2 / 3600) * np.cos(np.radians(omega))
+        + (0.57 / 3600) * np.cos(2 * np.radians(l0))
+        + (0.10 / 3600) * np.cos(2 * np.radians(lp))
+        - (0.09 / 3600) * np.cos(2 * np.radians(omega))
+    )
+    eps0 = 23.439291 - 0.013004167 * t - 0.0000001639 * (t**2) + 0.0000005036 * (t**3)
+    eps_app = np.radians(eps0 + (0.00256 * np.cos(np.radians(omega_app))))
+
+    return {
+        "declination": np.degrees(np.arcsin(np.sin(eps_app) * np.sin(lam))),
+        "right_ascension": _unwind_angle(
+            np.degrees(np.arctan2(np.cos(eps_app) * np.sin(lam), np.cos(lam)))
+        ),
+        "sidereal_time": theta0 + (((d_psi * 3600) * np.cos(np.radians(eps0 + d_eps))) / 3600),
+    }
+
+
+def _corrected_hour_angle(m0, h0, lat, lon, after_transit, today, prev_, next_):
+    """Hours after UTC midnight at which the sun reaches altitude `h0` (NaN if never)."""
+    lw = lon * -1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        term1 = np.sin(np.radians(h0)) - (
+            np.sin(np.radians(lat)) * np.sin(np.radians(today["declination"]))
+        )
+        term2 = np.cos(np.radians(lat)) * np.cos(np.radians(today["declination"]))
+        h0_angle = np.degrees(np.arccos(term1 / term2))
+        m = m0 + (h0_angle / 360) if after_transit else m0 - (h0_angle / 360)
+        theta = _unwind_angle(today["sidereal_time"] + (360.985647 * m))
+        alpha = _unwind_angle(_interpolate_angles(
+            today["right_ascension"], prev_["right_ascension"], next_["right_ascension"], m,
+        ))
+        delta = _interpolate(today["declination"], prev_["declination"], next_["declination"], m)
+        h = theta - lw - alpha
+        altitude = np.degrees(np.arcsin(
+            np.sin(np.radians(lat)) * np.sin(np.radians(delta))
+            + np.cos(np.radians(lat)) * np.cos(np.radians(delta)) * np.cos(np.radians(h))
+        ))
+        term4 = 360 * np.cos(np.radians(delta)) * np.cos(np.radians(lat)) * np.sin(np.radians(h))
+        result = (m + ((altitude - h0) / term4)) * 24
+    return np.where(np.isfinite(result), result, np.nan)
+
+
+def _to_epoch(hours: np.ndarray, midnight: np.ndarray) -> np.ndarray:
+    """
+    Whole UTC epoch seconds for `hours` after each day's UTC midnight, truncated
+    exactly like adhanpy's TimeComponents.from_float.  NaN stays NaN.
+    """
+    with np.errstate(invalid="ignore"):
+        minutes, seconds = np.divmod(hours * 60 * 60, 60)
+        hrs, minutes = np.divmod(minutes, 60)
+        return midnight + hrs * 3600 + minutes * 60 + np.trunc(seconds)
+
+
+def _rounded_minute(epoch: np.ndarray) -> np.ndarray:
+    """
+    Round to the nearest minute like adhanpy's rounded_minute: half-even on the
+    seconds, and at minute 59 the seconds are dropped instead of carried.
+    """
+    seconds = epoch % 60
+    minute = (epoch // 60) % 60
+    carry = (seconds > 30) & (minute != 59)
+    return epoch - seconds + np.where(carry, 60, 0)
+
+
+def _day_of_year(start: date, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return (day_of_year, is_leap_year) arrays for `n` days from `start`."""
+    days = np.datetime64(start, "D") + np.arange(n)
+    years = days.astype("datetime64[Y]")
+    year = years.astype(np.int64) + 1970
+    doy = (days - years.astype("datetime64[D]")).astype(np.int64) + 1
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return doy, leap
+
+
+# Moonsighting Committee seasonal coefficients (minutes at 0° + per-degree slope)
+_MORNING_TWILIGHT = ((75, 28.65), (75, 19.44), (75, 32.74), (75, 48.10))
+_EVENING_TWILIGHT = ((75, 25.60), (75, 2.050), (75, -9.210), (75, 6.140))
+
+
+def _season_adjustment(latitude, doy, leap, coefficients) -> np.ndarray:
+    """Seconds between sunrise/sunset and the seasonally adjusted twilight."""
+    a, b, c, d = (base + ((slope / 55.0) * abs(latitude)) for base, slope in coefficients)
+
+    days_in_year = np.where(leap, 366, 365)
+    if latitude >= 0:
+        dyy = doy + 10
+        dyy = np.where(dyy >= days_in_year, dyy - days_in_year, dyy)
+    else:
+        dyy = doy - np.where(leap, 173, 172)
+        dyy = np.where(dyy < 0, dyy + days_in_year, dyy)
+
+    adjustment = np.select(
+        [dyy < 91, dyy < 137, dyy < 183, dyy < 229, dyy < 275],
+        [
+            a + (b - a) / 91.0 * dyy,
+            b + (c - b) / 46.0 * (dyy - 91),
+            c + (d - c) / 46.0 * (dyy - 137),
+            d + (c - d) / 46.0 * (dyy - 183),
+            c + (b - c) / 46.0 * (dyy - 229),
+        ],
+        b + (a - b) / 91.0 * (dyy - 275),
+    )
+    return np.round(adjustment * 60.0)
+
+
+def _utc_offsets(tz: pytz.BaseTzInfo, epoch: np.ndarray) -> np.ndarray:
+    """
+    Vectorised tz.utcoffset() for an array of UTC epoch seconds.
+
+    pytz zones carry their UTC transition table, so one searchsorted() replaces
+    an astimezone() per value; any other tzinfo falls back to the slow path.
+    """
+    transitions = getattr(tz, "_utc_transition_times", None)
+    info = getattr(tz, "_transition_info", None)
+    if transitions is None or info is None:
+        if isinstance(tz, pytz.tzinfo.StaticTzInfo) or tz is pytz.UTC:
+            offset = tz.utcoffset(datetime(2000, 1, 1))
+            return np.full(epoch.shape, int(offset.total_seconds()), dtype=np.int64)
+        return np.array([
+            int(datetime.fromtimestamp(int(t), tz).utcoffset().total_seconds())
+            for t in epoch
+        ], dtype=np.int64)
+
+    epoch0 = datetime(1970, 1, 1)
+    bounds = np.array([(t - epoch0).total_seconds() for t in transitions])
+    offsets = np.array([int(o.total_seconds()) for o, _, _ in info], dtype=np.int64)
+    idx = np.searchsorted(bounds, epoch, side="right") - 1
+    return offsets[np.clip(idx, 0, len(offsets) - 1)]
@@ -3,18 +3,33 @@ PrayerClock — stateful orchestrator for the local machine's prayer schedule.
 
 Knows YOUR location (via IP detection) and YOUR config.  For calculating
 prayer times for arbitrary cities, use services.prayer_service.PrayerService.
+
+The last IP fix is saved to disk, so startup never waits on the network:
+the saved location is used at once and re-detected in a background thread.
+Offline, the last good fix is kept.
 """
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import date, datetime
 from pathlib import Path
+from typing import Callable, Optional
 
 import pytz
 
 from adhan.calculator import build_params, calculate
 from adhan.config import DEFAULT_CONFIG_PATH, load_config, save_config
-from adhan.location import get_current_location
+from adhan.geocache import GeocodeResult
+from adhan.location import (
+    DEFAULT_LOCATION_PATH,
+    detect_location,
+    distance_km,
+    load_last_location,
+    save_last_location,
+)
 from adhan.models import Config, Coordinates, PrayerSchedule
 from adhan.notifications import (
     play_adhan as _play_adhan,
@@ -31,6 +46,11 @@ _LIB = Path(__file__).parent.parent / "lib"
 _FAJR_AUDIO  = _LIB / "fajr.mp3"
 _ADHAN_AUDIO = _LIB / "makkah_adhan.mp3"
 
+_SCHEDULE_CACHE_SIZE = 32   # days — covers yesterday/today/tomorrow with room to spare
+_MOVE_THRESHOLD_KM = 5.0    # IP fixes jitter; closer than this is "the same place"
+
+_OFFLINE: GeocodeResult = (Coordinates(0.0, 0.0), pytz.UTC, "Offline")
+
 
 class PrayerClock:
     """
@@ -38,17 +58,41 @@ class PrayerClock:
     PrayerSchedule objects for any date.
 
     Lifecycle:
-        clock = PrayerClock()           # loads config, detects location
+        clock = PrayerClock()           # loads config + last known location
+        clock.add_location_listener(on_moved)
         clock.refresh_settings()        # reload config + re-detect location
         schedule = clock.get_prayer_times(date.today())
         clock.play_adhan()
+
+    Location listeners are called (from the refresh thread) only when a new
+    fix is more than _MOVE_THRESHOLD_KM away or in another timezone.
+
+    Schedules are memoised in a small LRU keyed on everything that affects the
+    result (date, coordinates, method, angles, timezone), so the GUI and daemon
+    can ask for today's times on every tick at dictionary-lookup cost.
     """
 
-    def __init__(self, config_path: Path = DEFAULT_CONFIG_PATH) -> None:
+    def __init__(
+        self,
+        config_path: Path = DEFAULT_CONFIG_PATH,
+        cache_size: int = _SCHEDULE_CACHE_SIZE,
+        location_path: Path = DEFAULT_LOCATION_PATH,
+    ) -> None:
         self.config_path = config_path
+        self.location_path = location_path
         self._config: Config = Config()
         self._coords: Coordinates = Coordinates(0.0, 0.0)
         self._tz: pytz.BaseTzInfo = pytz.UTC
+        self._cache: OrderedDict[tuple, PrayerSchedule] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_lock = threading.Lock()
+        self._fix: Optional[GeocodeResult] = None
+        self._fix_time: Optional[float] = None
+        self._location_lock = threading.Lock()
+        self._location_listeners: list[Callable[[], None]] = []
+        self._refresh_thread: Optional[threading.Thread] = None
         self.refresh_settings()
 
     # ── Public properties ─────────────────────────────────────────────────────
@@ -61,26 +105,125 @@ class PrayerClock:
     def timezone(self) -> pytz.BaseTzInfo:
         return self._tz
 
+    @property
+    def location_age(self) -> Optional[float]:
+        """Seconds since the location in use was detected (None if never)."""
+        return None if self._fix_time is None else time.time() - self._fix_time
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Hit/miss counters and current size of the schedule cache."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._cache),
+            "maxsize": self._cache_size,
+        }
+
     # ── Core methods ──────────────────────────────────────────────────────────
 
-    def refresh_settings(self) -> None:
-        """Reload config from disk and re-detect location via IP geolocation."""
+    def refresh_settings(self, wait: bool = False) -> None:
+        """
+        Reload config from disk and apply the last known location, then
+        re-detect the location in the background.  Detection runs inline
+        with wait=True, or when no location has ever been saved.
+        """
+        self.invalidate_cache()
         self._config = load_config(self.config_path)
-        coords, tz, city = get_current_location()
-        self._coords = coords
-        self._tz = tz
-        self._config.city = city
-        self._config.latitude = coords.latitude
-        self._config.longitude = coords.longitude
-        self._config.timezone = tz.zone
-        logger.debug("Settings refreshed: city=%s tz=%s", city, tz.zone)
+        if self._fix is None:
+            saved = load_last_location(self.location_path)
+            if saved is not None:
+                self._fix, self._fix_time = saved
+        if self._fix is None or wait:
+            self._update_location()
+        else:
+            self.refresh_location()
+        self._apply_location()
+        logger.debug("Settings refreshed: city=%s tz=%s", self._config.city, self._tz.zone)
+
+    def refresh_location(self) -> threading.Thread:
+        """
+        Re-detect the location via IP geolocation in a daemon thread (or join
+        the one already running) and return that thread.
+        """
+        with self._location_lock:
+            thread = self._refresh_thread
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(
+                    target=self._update_location, name="location-refresh", daemon=True,
+                )
+                self._refresh_thread = thread
+                thread.start()
+        return thread
+
+    def add_location_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback()` whenever a refresh finds the machine has moved."""
+        self._location_listeners.append(callback)
 
     def get_current_time(self) -> datetime:
         return datetime.now(self._tz)
 
     def get_prayer_times(self, target_date: date) -> PrayerSchedule:
-        params = build_params(self._config)
-        return calculate(target_date, self._coords, params, self._tz)
+        cfg = self._config
+        coords, tz = self._coords, self._tz
+        # Config fields are part of the key, so in-place edits (the settings
+        # dialog mutates clock.config) can never be served a stale schedule.
+        key = (target_date, coords, cfg.method, cfg.fajr_angle, cfg.isha_angle, tz.zone)
+        with self._cache_lock:
+            schedule = self._cache.get(key)
+            if schedule is not None:
+                self._cache_hits += 1
+                self._cache.move_to_end(key)
+                return schedule
+            self._cache_misses += 1
+
+        schedule = calculate(target_date, coords, build_params(cfg), tz)
+        with self._cache_lock:
+            self._cache[key] = schedule
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return schedule
+
+    def invalidate_cache(self) -> None:
+        """Drop all memoised schedules (counters are kept)."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    # ── Location ──────────────────────────────────────────────────────────────
+
+    def _update_location(self) -> None:
+        """Detect, save and apply a new fix; notify listeners if it moved."""
+        result = detect_location()
+        if result is None:
+            if self._fix is not None:
+                logger.info("Location refresh failed — keeping %s", self._fix[2])
+            return
+        save_last_location(result, self.location_path)
+        with self._location_lock:
+            moved = self._fix is None or _moved(self._fix, result)
+            if moved:
+                self._fix = result
+            self._fix_time = time.time()
+        if not moved:
+            return
+        self._apply_location()
+        logger.info("Location changed to %s (%s)", result[2], result[1].zone)
+        for callback in list(self._location_listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("Location listener failed: %s", e)
+
+    def _apply_location(self) -> None:
+        with self._location_lock:
+            coords, tz, city = self._fix or _OFFLINE
+            with self._cache_lock:
+                self._coords, self._tz = coords, tz
+                self._cache.clear()
+            self._config.city = city
+            self._config.latitude = coords.latitude
+            self._config.longitude = coords.longitude
+            self._config.timezone = tz.zone
 
     def play_adhan(self, prayer_name: str = "", volume: float = VOLUME_NORMAL) -> None:
         send_notification("Adhaan Clock", "Time for Prayer")
@@ -92,3 +235,7 @@ class PrayerClock:
 
     def set_volume(self, level: float) -> None:
         _set_adhan_volume(level)
+
+
+def _moved(old: GeocodeResult, new: GeocodeResult) -> bool:
+    return old[1].zone != new[1].zone or distance_km(old[0], new[0]) > _MOVE_THRESHOLD_KM
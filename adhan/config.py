@@ -1,15 +1,24 @@
-"""Config file I/O — the only place that reads or writes config.json."""
+"""
+Config file I/O — the only place that reads or writes config.json — plus
+the on-disk locations and write helper shared by the caches.
+"""
 from __future__ import annotations
 
 import json
 import logging
+import os
+import threading
 from pathlib import Path
+from typing import Union
 
 from adhan.models import Config
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_PATH = Path("config.json")
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("ADHAN_CACHE_DIR", Path.home() / ".cache" / "adhan-clock")
+)
 
 
 def load_config(path: Path = DEFAULT_CONFIG_PATH) -> Config:
@@ -30,6 +39,7 @@ def load_config(path: Path = DEFAULT_CONFIG_PATH) -> Config:
         latitude=float(data.get("latitude", 0.0)),
         longitude=float(data.get("longitude", 0.0)),
         timezone=data.get("timezone", "UTC"),
+        whisper_model=data.get("whisper_model", "large-v3"),
     )
 
 
@@ -37,3 +47,22 @@ def save_config(config: Config, path: Path = DEFAULT_CONFIG_PATH) -> None:
     with open(path, "w") as f:
         json.dump(config.to_dict(), f, indent=4)
     logger.debug("Config saved to %s", path)
+
+
+def atomic_write(path: Path, data: Union[str, bytes]) -> None:
+    """
+    Write `data` to `path` through a temp file renamed into place, so readers
+    never see a partial file.  The temp name is unique per process and
+    thread, so concurrent writers of the same path cannot clobber each other.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, bytes):
+            tmp.write_bytes(data)
+        else:
+            tmp.write_text(data, encoding="utf-8", newline="")
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
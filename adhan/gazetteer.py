@@ -0,0 +1,268 @@
+"""
+Offline gazetteer — city name → place, without the network.
+
+The index is a single binary file built once from a GeoNames-style cities
+dump (see scripts/build_gazetteer.py) and memory-mapped at runtime, so opening
+it costs nothing and lookups touch only the pages they need.
+
+File layout (little-endian):
+    header      magic, version, counts and section offsets
+    places      fixed-size records: lat, lon, population, tz id, country, name
+    key_offsets uint32[n_keys + 1] into the keys blob
+    key_places  uint32[n_keys] place index for each key
+    keys        UTF-8 folded names, sorted bytewise (duplicates adjacent)
+    names       UTF-8 display names
+    timezones   newline-separated IANA zone names
+
+Every place is indexed under its name, ASCII name and alternate names, so
+"Makkah", "Mecca" and "مكة المكرمة" all resolve to the same record.
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import mmap
+import struct
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pytz
+
+from adhan.geocache import GeocodeResult, normalize_city
+from adhan.models import Coordinates
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).parent / "data" / "gazetteer.bin"
+
+_MAGIC = b"ADGZ"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII7Q")
+
+_PLACE_DTYPE = np.dtype([
+    ("lat", "<f4"),
+    ("lon", "<f4"),
+    ("population", "<u4"),
+    ("tz", "<u2"),
+    ("country", "S2"),
+    ("name_off", "<u4"),
+    ("name_len", "<u2"),
+])
+
+# GeoNames cities*.txt column indices
+_COL_NAME, _COL_ASCII, _COL_ALT = 1, 2, 3
+_COL_LAT, _COL_LON, _COL_COUNTRY, _COL_POP, _COL_TZ = 4, 5, 8, 14, 17
+
+_MAX_KEY_BYTES = 64   # longer alternate names are noise (sentences, addresses)
+
+
+def fold_name(name: str) -> str:
+    """Gazetteer key: normalize_city() plus accent stripping ("São" → "sao")."""
+    decomposed = unicodedata.normalize("NFKD", normalize_city(name))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    coords: Coordinates
+    timezone: str
+    population: int
+
+    def as_geocode_result(self) -> GeocodeResult:
+        return self.coords, pytz.timezone(self.timezone), self.name
+
+
+class _Keys:
+    """Read-only sequence view of the sorted key blob, for bisect."""
+
+    def __init__(self, blob: memoryview, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+
+class Gazetteer:
+    """
+    Memory-mapped city index.
+
+    Usage:
+        gz = Gazetteer.open()            # None-safe: see open() below
+        gz.lookup("Toronto")             # best exact match or None
+        gz.complete("tor", limit=5)      # prefix matches, most populous first
+        gz.fuzzy("Torontto")             # typo-tolerant matches
+    """
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        (magic, version, _, n_places, n_keys, _,
+         places_off, key_off_off, key_places_off, keys_off,
+         names_off, tz_off, end) = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} gazetteer index")
+
+        self._places = np.frombuffer(buf, _PLACE_DTYPE, n_places, places_off)
+        self._key_places = np.frombuffer(buf, "<u4", n_keys, key_places_off)
+        self._keys = _Keys(
+            buf[keys_off:names_off],
+            np.frombuffer(buf, "<u4", n_keys + 1, key_off_off),
+        )
+        self._names = buf[names_off:tz_off]
+        self._timezones = bytes(buf[tz_off:end]).decode("utf-8").split("\n")
+
+    @classmethod
+    def open(cls, path: Path = DEFAULT_GAZETTEER_PATH) -> Optional["Gazetteer"]:
+        """Open the index at `path`, or return None if it has not been built."""
+        return cls(path) if path.exists() else None
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def lookup(self, name: str, country: Optional[str] = None) -> Optional[Place]:
+        """Most populous place whose name folds to exactly `name`."""
+        matches = self.exact(name, country=country, limit=1)
+        return matches[0] if matches else None
+
+    def exact(self, name: str, country: Optional[str] = None, limit: int = 10) -> list[Place]:
+        key = fold_name(name).encode("utf-8")
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_right(self._keys, key, lo)
+        return self._ranked(range(lo, hi), country, limit)
+
+    def complete(self, prefix: str, country: Optional[str] = None, limit: int = 10) -> list[Place]:
+        """Places with a name starting with `prefix`, most populous first."""
+        key = fold_name(prefix).encode("utf-8")
+        if not key:
+            return []
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + b"\xff", lo)
+        return self._ranked(range(lo, hi), country, limit)
+
+    def fuzzy(self, name: str, limit: int = 5, cutoff: float = 0.8) -> list[Place]:
+        """
+        Typo-tolerant match: candidates share the first two characters of the
+        query and are ranked by similarity, then population.
+        """
+        query = fold_name(name)
+        head = query[:2].encode("utf-8")
+        if not head:
+            return []
+        lo = bisect.bisect_left(self._keys, head)
+        hi = bisect.bisect_left(self._keys, head + b"\xff", lo)
+
+        best: dict[int, float] = {}
+        matcher = difflib.SequenceMatcher(b=query, autojunk=False)
+        for i in range(lo, hi):
+            matcher.set_seq1(self._keys[i].decode("utf-8"))
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                place = int(self._key_places[i])
+                best[place] = max(score, best.get(place, 0.0))
+
+        order = sorted(best, key=lambda p: (-round(best[p], 2), -int(self._places[p]["population"])))
+        return [self._place(p) for p in order[:limit]]
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _ranked(self, key_range: range, country: Optional[str], limit: int) -> list[Place]:
+        ids = np.unique(self._key_places[key_range.start:key_range.stop])
+        if country:
+            if not (country.isascii() and country.isalpha()):
+                return []               # no place has a non-ISO country code
+            ids = ids[self._places["country"][ids] == country.upper().encode("ascii")]
+        ids = ids[np.argsort(-self._places["population"][ids].astype(np.int64), kind="stable")]
+        return [self._place(int(i)) for i in ids[:limit]]
+
+    def _place(self, i: int) -> Place:
+        rec = self._places[i]
+        off, length = int(rec["name_off"]), int(rec["name_len"])
+        return Place(
+            name=bytes(self._names[off:off + length]).decode("utf-8"),
+            country=rec["country"].decode("ascii"),
+            coords=Coordinates(
+                latitude=round(float(rec["lat"]), 5),
+                longitude=round(float(rec["lon"]), 5),
+            ),
+            timezone=self._timezones[int(rec["tz"])],
+            population=int(rec["population"]),
+        )
+
+
+# ── Index builder ─────────────────────────────────────────────────────────────
+
+def build_gazetteer(rows: Iterable[list[str]], path: Path, min_population: int = 0) -> int:
+    """
+    Write a gazetteer index from GeoNames cities*.txt rows (already split on
+    tabs).  Returns the number of places written.
+    """
+    places = []
+    names = bytearray()
+    timezones: dict[str, int] = {}
+    keys: list[tuple[bytes, int]] = []
+
+    for row in rows:
+        if len(row) <= _COL_TZ or not row[_COL_TZ]:
+            continue
+        population = int(row[_COL_POP] or 0)
+        if population < min_population:
+            continue
+        idx = len(places)
+        name = row[_COL_NAME].encode("utf-8")
+        places.append((
+            float(row[_COL_LAT]),
+            float(row[_COL_LON]),
+            min(population, 0xFFFFFFFF),
+            timezones.setdefault(row[_COL_TZ], len(timezones)),
+            row[_COL_COUNTRY].encode("ascii")[:2],
+            len(names),
+            len(name),
+        ))
+        names += name
+
+        aliases = {row[_COL_NAME], row[_COL_ASCII], *row[_COL_ALT].split(",")}
+        folded = {fold_name(a).encode("utf-8") for a in aliases if a}
+        keys.extend((k, idx) for k in folded if k and len(k) <= _MAX_KEY_BYTES)
+
+    keys.sort()
+    key_blob = b"".join(k for k, _ in keys)
+    key_offsets = np.zeros(len(keys) + 1, dtype="<u4")
+    np.cumsum([len(k) for k, _ in keys], out=key_offsets[1:])
+    tz_blob = "\n".join(sorted(timezones, key=timezones.get)).encode("utf-8")
+
+    sections = [
+        np.array(places, dtype=_PLACE_DTYPE).tobytes(),
+        key_offsets.tobytes(),
+        np.array([p for _, p in keys], dtype="<u4").tobytes(),
+        key_blob,
+        bytes(names),
+        tz_blob,
+    ]
+    offsets = []
+    pos = _HEADER.size
+    for section in sections:
+        offsets.append(pos)
+        pos += len(section)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(
+            _MAGIC, _VERSION, 0, len(places), len(keys), len(timezones), *offsets, pos,
+        ))
+        for section in sections:
+            f.write(section)
+    tmp.replace(path)
+    return len(places)
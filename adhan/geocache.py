@@ -0,0 +1,206 @@
+"""
+Persistent geocoding cache — city name → (coordinates, timezone, resolved name).
+
+Backed by a small SQLite file so lookups survive restarts and work offline,
+fronted by an in-process dict so repeated queries cost a dictionary lookup.
+Failed lookups ("no such city") are cached too, for a shorter TTL.  Network
+errors are never cached — the caller decides what to do with those.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import pytz
+
+from adhan.config import DEFAULT_CACHE_DIR
+from adhan.models import Coordinates
+
+logger = logging.getLogger(__name__)
+
+GeocodeResult = tuple[Coordinates, pytz.BaseTzInfo, str]
+
+DEFAULT_GEOCODE_CACHE_PATH = DEFAULT_CACHE_DIR / "geocode.sqlite3"
+
+_TTL = 90 * 24 * 3600           # seconds — cities don't move
+_NEGATIVE_TTL = 24 * 3600       # seconds — retry unknown names daily
+_MAX_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    key       TEXT PRIMARY KEY,
+    latitude  REAL,
+    longitude REAL,
+    timezone  TEXT,
+    name      TEXT,
+    expires   REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+_MISSING = object()
+
+
+def normalize_city(city: str) -> str:
+    """
+    Canonical cache key: Unicode-normalised, case-folded, punctuation-free,
+    single-spaced.  "  São  Paulo, " and "são paulo" share one entry.
+    """
+    s = unicodedata.normalize("NFKC", city).casefold()
+    s = re.sub(r"[^\w\s-]", " ", s)
+    return " ".join(s.split())
+
+
+class GeocodeCache:
+    """
+    Two-level cache of geocoding results.
+
+    lookup() returns (hit, result): hit is False when nothing usable is cached;
+    result is None for a cached negative answer.  Entries expire after `ttl`
+    (or `negative_ttl` for negatives); the on-disk table is trimmed to
+    `max_entries`, least recently used first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = DEFAULT_GEOCODE_CACHE_PATH,
+        ttl: float = _TTL,
+        negative_ttl: float = _NEGATIVE_TTL,
+        max_entries: int = _MAX_ENTRIES,
+    ) -> None:
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._memory: OrderedDict[str, tuple[Optional[GeocodeResult], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _open(path: Path) -> Optional[sqlite3.Connection]:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False)
+            db.execute(_SCHEMA)
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Geocode cache at %s unavailable, using memory only: %s", path, e)
+            return None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def lookup(self, city: str) -> tuple[bool, Optional[GeocodeResult]]:
+        key = normalize_city(city)
+        now = time.time()
+        with self._lock:
+            value = self._memory_get(key, now)
+            if value is _MISSING:
+                value = self._db_get(key, now)
+            if value is _MISSING:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, value
+
+    def store(self, city: str, result: Optional[GeocodeResult]) -> None:
+        """Cache `result` for `city`; pass None to record that it does not exist."""
+        key = normalize_city(city)
+        now = time.time()
+        expires = now + (self._ttl if result is not None else self._negative_ttl)
+        with self._lock:
+            self._memory_put(key, result, expires)
+            if self._db is None:
+                return
+            coords, tz, name = result if result is not None else (None, None, None)
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        coords.latitude if coords else None,
+                        coords.longitude if coords else None,
+                        tz.zone if tz else None,
+                        name,
+                        expires,
+                        now,
+                    ),
+                )
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Geocode cache write failed: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM geocode")
+                self._db.commit()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    # ── Internals (caller holds the lock) ─────────────────────────────────────
+
+    def _memory_get(self, key: str, now: float):
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires = entry
+        if expires <= now:
+            del self._memory[key]
+            return _MISSING
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Optional[GeocodeResult], expires: float) -> None:
+        self._memory[key] = (value, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str, now: float):
+        if self._db is None:
+            return _MISSING
+        try:
+            row = self._db.execute(
+                "SELECT latitude, longitude, timezone, name, expires FROM geocode WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            lat, lon, tz_name, name, expires = row
+            if expires <= now:
+                return _MISSING
+            self._db.execute("UPDATE geocode SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning("Geocode cache read failed: %s", e)
+            return _MISSING
+
+        value = None
+        if lat is not None:
+            value = (Coordinates(latitude=lat, longitude=lon), pytz.timezone(tz_name), name)
+        self._memory_put(key, value, expires)
+        return value
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM geocode WHERE expires <= ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()
+        excess = count - self._max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM geocode WHERE key IN "
+                "(SELECT key FROM geocode ORDER BY last_used, rowid LIMIT ?)",
+                (excess,),
+            )
@@ -6,14 +6,22 @@ and gui_clock.py. Now in one place.
 """
 from __future__ import annotations
 
+import json
 import logging
+import math
+import time
+from pathlib import Path
 from typing import Optional
 
 import pytz
 import requests
 from timezonefinder import TimezoneFinder
 
+from adhan.gazetteer import Gazetteer
+from adhan.config import DEFAULT_CACHE_DIR, atomic_write
+from adhan.geocache import GeocodeCache, GeocodeResult
 from adhan.models import Coordinates
+from utils.metrics import inc, timed
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +29,50 @@ _IP_API_URL = "http://ip-api.com/json/"
 _NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 _REQUEST_TIMEOUT = 5
 
+DEFAULT_LOCATION_PATH = DEFAULT_CACHE_DIR / "location.json"
+
 _tf = TimezoneFinder()
 
+_geocode_cache: Optional[GeocodeCache] = None
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_loaded = False
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """The process-wide geocoding cache, opened on first use."""
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = GeocodeCache()
+    return _geocode_cache
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The bundled offline gazetteer, or None if its index has not been built."""
+    global _gazetteer, _gazetteer_loaded
+    if not _gazetteer_loaded:
+        _gazetteer_loaded = True
+        try:
+            _gazetteer = Gazetteer.open()
+        except (OSError, ValueError) as e:
+            logger.warning("Offline gazetteer unavailable: %s", e)
+    return _gazetteer
+
+
+def _offline_lookup(city: str) -> Optional[GeocodeResult]:
+    """
+    Exact-name match in the offline gazetteer.  "City, CC" narrows by ISO
+    country code; any other qualifier ("Paris, Texas") is left to Nominatim.
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        return None
+    name, _, qualifier = city.partition(",")
+    qualifier = qualifier.strip()
+    if qualifier and not (len(qualifier) == 2 and qualifier.isascii() and qualifier.isalpha()):
+        return None
+    place = gazetteer.lookup(name, country=qualifier or None)
+    return place.as_geocode_result() if place else None
+
 
 def get_current_location() -> tuple[Coordinates, pytz.BaseTzInfo, str]:
     """
@@ -30,6 +80,11 @@ def get_current_location() -> tuple[Coordinates, pytz.BaseTzInfo, str]:
     Returns (coordinates, timezone, city_name).
     Falls back to (0, 0), UTC, "Offline" on any failure.
     """
+    return detect_location() or (Coordinates(0.0, 0.0), pytz.UTC, "Offline")
+
+
+def detect_location() -> Optional[GeocodeResult]:
+    """IP geolocation; None if the lookup failed (offline, rate-limited, ...)."""
     try:
         data = requests.get(_IP_API_URL, timeout=_REQUEST_TIMEOUT).json()
         if data.get("status") == "success":
@@ -41,37 +96,103 @@ def get_current_location() -> tuple[Coordinates, pytz.BaseTzInfo, str]:
         logger.warning("IP geolocation returned status=%s", data.get("status"))
     except Exception as e:
         logger.warning("IP geolocation failed: %s", e)
-    return Coordinates(0.0, 0.0), pytz.UTC, "Offline"
+    return None
+
+
+# ── Last known location ───────────────────────────────────────────────────────
+
+def load_last_location(path: Path = DEFAULT_LOCATION_PATH) -> Optional[tuple[GeocodeResult, float]]:
+    """The last saved IP fix and when it was taken (epoch seconds), or None."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        result = (
+            Coordinates(latitude=data["latitude"], longitude=data["longitude"]),
+            pytz.timezone(data["timezone"]),
+            data["city"],
+        )
+        return result, float(data["updated"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, pytz.UnknownTimeZoneError) as e:
+        logger.warning("Ignoring unreadable last location %s: %s", path, e)
+        return None
 
 
-def geocode_city(city: str) -> Optional[tuple[Coordinates, pytz.BaseTzInfo, str]]:
+def save_last_location(result: GeocodeResult, path: Path = DEFAULT_LOCATION_PATH) -> None:
+    coords, tz, city = result
+    data = {
+        "latitude": coords.latitude,
+        "longitude": coords.longitude,
+        "timezone": tz.zone,
+        "city": city,
+        "updated": time.time(),
+    }
+    try:
+        atomic_write(path, json.dumps(data))
+    except OSError as e:
+        logger.warning("Could not save last location to %s: %s", path, e)
+
+
+def distance_km(a: Coordinates, b: Coordinates) -> float:
+    """Great-circle (haversine) distance between two points."""
+    lat1, lat2 = math.radians(a.latitude), math.radians(b.latitude)
+    dlat = lat2 - lat1
+    dlon = math.radians(b.longitude - a.longitude)
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(h)))
+
+
+@timed("geocode")
+def geocode_city(city: str) -> Optional[GeocodeResult]:
     """
     Resolve a free-text city name to (coordinates, timezone, resolved_city_name).
     Returns None if the city cannot be geocoded.
 
-    Uses Nominatim (OpenStreetMap) for lat/lon and BigDataCloud for timezone
-    — both are free with no API key required.
+    Resolution order: the offline gazetteer (if built), then the persistent
+    geocode cache (which also remembers "not found"), then Nominatim
+    (OpenStreetMap) for lat/lon with timezonefinder resolving the timezone.
     """
+    result = _offline_lookup(city)
+    if result is not None:
+        inc("geocode_total", source="gazetteer")
+        return result
+
+    cache = get_geocode_cache()
+    hit, result = cache.lookup(city)
+    if hit:
+        inc("geocode_total", source="cache")
+        return result
+
     try:
-        results = requests.get(
-            _NOMINATIM_URL,
-            params={"q": city, "format": "json", "limit": 1},
-            headers={"User-Agent": "adhan-clock/1.0"},
-            timeout=_REQUEST_TIMEOUT,
-        ).json()
+        result = _nominatim_lookup(city)
+    except Exception as e:
+        # Network failures are not cached — the next call retries.
+        logger.warning("Geocoding failed for %r: %s", city, e)
+        inc("geocode_total", source="error")
+        return None
 
-        if not results:
-            logger.info("Nominatim returned no results for %r", city)
-            return None
+    inc("geocode_total", source="nominatim")
+    cache.store(city, result)
+    return result
 
-        lat = float(results[0]["lat"])
-        lon = float(results[0]["lon"])
-        coords = Coordinates(latitude=lat, longitude=lon)
 
-        tz_name = _tf.timezone_at(lat=lat, lng=lon) or "UTC"
-        resolved_city = results[0].get("display_name", city).split(",")[0].strip()
-        return coords, pytz.timezone(tz_name), resolved_city
+def _nominatim_lookup(city: str) -> Optional[GeocodeResult]:
+    """Query Nominatim; None means no match, exceptions mean the lookup failed."""
+    results = requests.get(
+        _NOMINATIM_URL,
+        params={"q": city, "format": "json", "limit": 1},
+        headers={"User-Agent": "adhan-clock/1.0"},
+        timeout=_REQUEST_TIMEOUT,
+    ).json()
 
-    except Exception as e:
-        logger.warning("Geocoding failed for %r: %s", city, e)
+    if not results:
+        logger.info("Nominatim returned no results for %r", city)
         return None
+
+    lat = float(results[0]["lat"])
+    lon = float(results[0]["lon"])
+    coords = Coordinates(latitude=lat, longitude=lon)
+
+    tz_name = _tf.timezone_at(lat=lat, lng=lon) or "UTC"
+    resolved_city = results[0].get("display_name", city).split(",")[0].strip()
+    return coords, pytz.timezone(tz_name), resolved_city
@@ -28,6 +28,7 @@ class Config:
     latitude: float = 0.0
     longitude: float = 0.0
     timezone: str = "UTC"
+    whisper_model: str = "large-v3"
 
     def to_dict(self) -> dict:
         return {
@@ -38,6 +39,7 @@ class Config:
             "latitude": self.latitude,
             "longitude": self.longitude,
             "timezone": self.timezone,
+            "whisper_model": self.whisper_model,
         }
 
 
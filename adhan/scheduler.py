@@ -0,0 +1,185 @@
+"""
+PrayerScheduler — event-driven prayer timer for the headless daemon.
+
+Instead of polling every few seconds, the scheduler computes the upcoming
+prayer events once, keeps them in a min-heap ordered by time, and sleeps until
+the earliest deadline.  It rebuilds the heap only when the local date changes,
+when config.json is modified, or when reschedule() is called (e.g. after a
+location change).  Events missed because the process stalled or the machine
+was suspended still fire on wake-up if they are no older than `grace`.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Optional
+
+from adhan.clock import PrayerClock
+
+logger = logging.getLogger(__name__)
+
+PRAYERS = ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha")
+
+_HORIZON_DAYS = 2                      # days of events kept in the heap
+_MISSED_GRACE = timedelta(minutes=10)  # how late a missed adhan may still play
+_MAX_SLEEP = 300.0                     # seconds — bounds oversleep across suspend
+
+
+@dataclass(frozen=True, order=True)
+class PrayerEvent:
+    time: datetime
+    name: str
+
+
+def _fired_key(event: PrayerEvent) -> tuple[str, date]:
+    """
+    Identity of a prayer for de-duplication.  Not the exact time: a location
+    change can move a prayer that already played by a minute or two, and it
+    must not play again.
+    """
+    return event.name, event.time.date()
+
+
+class PrayerScheduler:
+    """
+    Fires `on_prayer(event)` at each prayer time for the clock's location.
+
+    Usage:
+        scheduler = PrayerScheduler(clock, on_prayer=lambda e: clock.play_adhan(e.name))
+        scheduler.run()          # blocks; call stop() from another thread to exit
+
+    tick(now) does one unit of work and returns the seconds until the next
+    deadline, so the scheduler can also be driven by an external event loop.
+    """
+
+    def __init__(
+        self,
+        clock: PrayerClock,
+        on_prayer: Callable[[PrayerEvent], None],
+        on_new_day: Optional[Callable[[date], None]] = None,
+        horizon_days: int = _HORIZON_DAYS,
+        grace: timedelta = _MISSED_GRACE,
+        max_sleep: float = _MAX_SLEEP,
+    ) -> None:
+        self._clock = clock
+        self._on_prayer = on_prayer
+        self._on_new_day = on_new_day
+        self._horizon_days = horizon_days
+        self._grace = grace
+        self._max_sleep = max_sleep
+
+        self._heap: list[PrayerEvent] = []
+        self._fired: set[tuple[str, date]] = set()    # (prayer, local date) already handled
+        self._day: Optional[date] = None
+        self._started: Optional[datetime] = None
+        self._dirty = True
+        self._config_mtime = self._read_config_mtime()
+        self._wake = threading.Event()
+        self._stopped = False
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def upcoming(self) -> list[PrayerEvent]:
+        """Pending events, earliest first."""
+        return sorted(self._heap)
+
+    def reschedule(self) -> None:
+        """Rebuild the event heap on the next tick (thread-safe)."""
+        self._dirty = True
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Make run() return as soon as possible (thread-safe)."""
+        self._stopped = True
+        self._wake.set()
+
+    def run(self) -> None:
+        """Block, firing events as they fall due, until stop() is called."""
+        while not self._stopped:
+            delay = self.tick(self._clock.get_current_time())
+            self._wake.wait(timeout=min(delay, self._max_sleep))
+            self._wake.clear()
+
+    def tick(self, now: datetime) -> float:
+        """
+        Fire every event due at `now` and return the seconds until the next
+        deadline (the next event or local midnight, whichever is sooner).
+        """
+        if self._started is None:
+            self._started = now
+
+        today = now.date()
+        if self._day is not None and today != self._day:
+            logger.info("Date changed to %s — refreshing settings", today)
+            self._clock.refresh_settings()
+            self._dirty = True
+            if self._on_new_day:
+                self._on_new_day(today)
+
+        mtime = self._read_config_mtime()
+        if mtime != self._config_mtime:
+            logger.info("Config changed — rescheduling")
+            self._config_mtime = mtime
+            self._clock.refresh_settings()
+            self._dirty = True
+
+        if self._dirty:
+            self._rebuild(now)
+
+        while self._heap and self._heap[0].time <= now:
+            event = heapq.heappop(self._heap)
+            if _fired_key(event) in self._fired:
+                continue
+            self._fired.add(_fired_key(event))
+            late = now - event.time
+            if late > self._grace:
+                logger.warning("Missed %s at %s (%s late)", event.name, event.time, late)
+                continue
+            logger.info("Time for %s!", event.name)
+            try:
+                self._on_prayer(event)
+            except Exception as e:
+                logger.warning("Prayer callback failed for %s: %s", event.name, e)
+
+        midnight = self._next_midnight(today)
+        deadline = min(self._heap[0].time, midnight) if self._heap else midnight
+        return max(0.0, (deadline - now).total_seconds())
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _rebuild(self, now: datetime) -> None:
+        """Recompute the heap from yesterday through the horizon."""
+        self._day = now.date()
+        self._dirty = False
+        # Events a little in the past stay eligible so a rebuild after a stall
+        # still recovers them — but never anything before the scheduler started.
+        cutoff = max(now - self._grace, self._started)
+        self._fired = {k for k in self._fired if k[1] >= self._day - timedelta(days=2)}
+
+        events = []
+        for offset in range(-1, self._horizon_days):
+            schedule = self._clock.get_prayer_times(self._day + timedelta(days=offset))
+            for name in PRAYERS:
+                event = PrayerEvent(getattr(schedule, name.lower()), name)
+                if event.time >= cutoff and _fired_key(event) not in self._fired:
+                    events.append(event)
+        heapq.heapify(events)
+        self._heap = events
+        if events:
+            logger.debug("Scheduled %d events; next %s at %s",
+                         len(events), events[0].name, events[0].time)
+
+    def _next_midnight(self, today: date) -> datetime:
+        tz = self._clock.timezone
+        naive = datetime.combine(today + timedelta(days=1), time())
+        localize = getattr(tz, "localize", None)
+        return localize(naive) if localize else naive.replace(tzinfo=tz)
+
+    def _read_config_mtime(self) -> Optional[float]:
+        try:
+            return self._clock.config_path.stat().st_mtime
+        except (OSError, AttributeError):
+            return None
@@ -0,0 +1,208 @@
+"""
+Annual timetables — a full year of prayer times as CSV, JSON or iCalendar.
+
+A year is computed in one calculate_range() pass and rendered once; the
+rendered file is kept on disk keyed by (coordinates, timezone, method,
+angles, year, city name) — the name is printed in the file, so "Mecca" and
+"Makkah" get their own copies — so repeated downloads of the same timetable are just static
+files.  Prayer times for a past or future year never change for a given key,
+so cached files never expire; clear() drops them all.
+
+    cache = TimetableCache()
+    path = cache.get(coords, tz, "Toronto", config, 2027, "ics")
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import pytz
+
+from adhan.calculator import PrayerTimetable, build_params, calculate_range
+from adhan.config import DEFAULT_CACHE_DIR, atomic_write
+from adhan.models import Config, Coordinates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMETABLE_DIR = DEFAULT_CACHE_DIR / "timetables"
+
+FORMATS = ("csv", "json", "ics")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "ics": "text/calendar; charset=utf-8",
+}
+
+_CALENDAR_PRAYERS = ("fajr", "dhuhr", "asr", "maghrib", "isha")   # no Sunrise event
+
+
+def build_year(
+    coords: Coordinates, tz: pytz.BaseTzInfo, config: Config, year: int,
+) -> PrayerTimetable:
+    """Prayer times for every day of `year`.  Raises ValueError on polar days."""
+    return calculate_range(date(year, 1, 1), date(year, 12, 31), coords, build_params(config), tz)
+
+
+def timetable_key(
+    coords: Coordinates, tz: pytz.BaseTzInfo, config: Config, year: int, city: str = "",
+) -> str:
+    """
+    File-name-safe cache key, e.g.
+    43.6532_-79.3832_America-Toronto_ISNA_15_15_2027_3f1c9a2b, where the last
+    part is a hash of the displayed city name (any script, any length).
+    """
+    raw = (
+        f"{coords.latitude:.4f}_{coords.longitude:.4f}_{tz.zone}_"
+        f"{config.method}_{config.fajr_angle:g}_{config.isha_angle:g}_{year}"
+    )
+    city_hash = hashlib.sha256(city.encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^\w.+-]", "-", raw) + "_" + city_hash
+
+
+def download_name(city: str, year: int, fmt: str) -> str:
+    """Friendly file name for a download, e.g. "New_York-2027.ics"."""
+    name = re.sub(r"[^\w-]", "", city.split(",")[0].strip().replace(" ", "_")) or "timetable"
+    return f"{name}-{year}.{fmt}"
+
+
+# ── Renderers ─────────────────────────────────────────────────────────────────
+
+def render_csv(timetable: PrayerTimetable, city: str) -> str:
+    rows = timetable.as_rows()
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(rows[0]), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def render_json(timetable: PrayerTimetable, city: str, config: Config) -> str:
+    dates = timetable.dates
+    return json.dumps({
+        "city": city,
+        "timezone": timetable.timezone_name,
+        "method": config.method,
+        "fajr_angle": config.fajr_angle,
+        "isha_angle": config.isha_angle,
+        "start": dates[0].isoformat(),
+        "end": dates[-1].isoformat(),
+        "times": timetable.as_columns(),
+    }, ensure_ascii=False, separators=(",", ":"))
+
+
+def render_ics(timetable: PrayerTimetable, city: str, uid_prefix: str = "") -> str:
+    """RFC 5545 calendar with one event per prayer per day, in UTC."""
+    stamp = datetime.now(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Adhan Clock//Prayer Times//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        _ics_text("X-WR-CALNAME", f"Prayer times — {city}"),
+        f"X-WR-TIMEZONE:{timetable.timezone_name}",
+    ]
+    for name in _CALENDAR_PRAYERS:
+        for d, ts in zip(timetable.dates, timetable.columns[name].tolist()):
+            start = datetime.fromtimestamp(ts, pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{uid_prefix}{d.isoformat()}-{name}@adhan-clock",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{start}",
+                f"DTEND:{start}",
+                _ics_text("SUMMARY", name.capitalize()),
+                _ics_text("LOCATION", city),
+                "TRANSP:TRANSPARENT",
+                "END:VEVENT",
+            ]
+    lines.append("END:VCALENDAR")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def render(timetable: PrayerTimetable, fmt: str, city: str, config: Config, key: str = "") -> str:
+    if fmt == "csv":
+        return render_csv(timetable, city)
+    if fmt == "json":
+        return render_json(timetable, city, config)
+    if fmt == "ics":
+        return render_ics(timetable, city, uid_prefix=f"{key}-" if key else "")
+    raise ValueError(f"Unknown timetable format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+def _ics_text(prop: str, value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+    escaped = escaped.replace("\n", "\\n")
+    return f"{prop}:{escaped}"
+
+
+def _fold(line: str) -> str:
+    """Fold content lines longer than 75 octets (RFC 5545 §3.1)."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts, current = [], b""
+    for ch in line:
+        enc = ch.encode("utf-8")
+        if len(current) + len(enc) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += enc
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+# ── On-disk cache ─────────────────────────────────────────────────────────────
+
+class TimetableCache:
+    """Rendered annual timetables stored as plain files under `directory`."""
+
+    def __init__(self, directory: Path = DEFAULT_TIMETABLE_DIR) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    def get(
+        self,
+        coords: Coordinates,
+        tz: pytz.BaseTzInfo,
+        city: str,
+        config: Config,
+        year: int,
+        fmt: str,
+    ) -> Path:
+        """
+        Path to the rendered timetable, building and storing it first if it
+        is not cached.  Raises ValueError for an unknown format or a year
+        the sun does not rise and set on every day.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown timetable format {fmt!r}")
+        key = timetable_key(coords, tz, config, year, city)
+        path = self.path_for(key, fmt)
+        if path.exists():
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        timetable = build_year(coords, tz, config, year)
+        atomic_write(path, render(timetable, fmt, city, config, key))
+        logger.debug("Cached %s timetable %s", fmt, path)
+        return path
+
+    def clear(self) -> int:
+        removed = 0
+        for fmt in FORMATS:
+            for path in self.directory.glob(f"*.{fmt}"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
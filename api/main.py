@@ -3,6 +3,10 @@ FastAPI backend for the Adhan Clock web app.
 
   GET  /api/chat              — streams RAG answers as SSE (session-aware)
   GET  /api/status            — RAG index health
+  GET  /api/metrics           — Prometheus metrics (when ADHAN_METRICS=1)
+  GET  /api/times             — prayer times for a city and date range
+  POST /api/times/batch       — many cities / ranges per call, computed in parallel
+  GET  /api/timetable         — a year of times as CSV, JSON or iCalendar (cached file)
   DELETE /api/session/{id}    — clear a conversation session early
 
 Run:
@@ -10,36 +14,53 @@ Run:
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import sys
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime, timedelta
 from pathlib import Path
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 _ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(_ROOT))
 
+from api.sessions import make_session_store  # noqa: E402
+from api.times import TimesBatch, TimesQuery, cached_json, times_payload  # noqa: E402
+from adhan.timetable import FORMATS, MEDIA_TYPES, download_name  # noqa: E402
+from services.prayer_service import PrayerService  # noqa: E402
+from utils import metrics  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 # ── RAG state ────────────────────────────────────────────────────────────────
 
 _rag: dict = {}
 
+# Shared Ollama connection pool — one per process, opened in lifespan
+_OLLAMA_MAX_CONNECTIONS = 32
+_OLLAMA_KEEPALIVE_CONNECTIONS = 8
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    _sessions.start_sweeper()
     try:
-        from rag.query import INDEX_PATH, load_clients, load_index
-        if not INDEX_PATH.exists():
+        from rag.answer_cache import AnswerCache
+        from rag.query import INDEX_PATH, index_exists, load_clients, load_index, load_retriever
+        from rag.store import index_version
+        if not index_exists(INDEX_PATH):
             raise FileNotFoundError("Index not found — run: python rag/ingest.py")
-        _rag["records"], _rag["matrix"] = load_index(INDEX_PATH)
+        _rag["records"], matrix = load_index(INDEX_PATH)
+        _rag["matrix"] = load_retriever(INDEX_PATH, matrix)
         _rag["embedder"], _rag["model"] = load_clients()
+        _rag["client"] = _ollama_client()
+        _rag["answer_cache"] = AnswerCache(index_version(INDEX_PATH))
         _rag["ready"] = True
         _rag["chunks"] = len(_rag["records"])
         logger.info("RAG index loaded: %d chunks", _rag["chunks"])
@@ -48,30 +69,39 @@ async def lifespan(app: FastAPI):
         _rag["error"] = str(e)
         logger.warning("RAG unavailable: %s", e)
     yield
+    _sessions.stop_sweeper()
+    if "client" in _rag:
+        await _rag["client"].close()
     _rag.clear()
 
 
-# ── Session store (in-memory, 30-min TTL) ────────────────────────────────────
+def _ollama_client():
+    import httpx
+    import ollama
+    return ollama.AsyncClient(limits=httpx.Limits(
+        max_connections=_OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections=_OLLAMA_KEEPALIVE_CONNECTIONS,
+    ))
+
+
+# ── Session store (30-min TTL, LRU-bounded, token-trimmed; see api/sessions.py)
+
+_sessions = make_session_store()
 
-_SESSION_TTL = timedelta(minutes=30)
-_sessions: dict[str, dict] = {}
 
+# Every store call goes through the executor: the SQLite backend runs blocking
+# queries and commits that would otherwise stall the event loop.
 
-def _get_history(session_id: str) -> list[dict]:
-    s = _sessions.get(session_id)
-    if not s:
-        return []
-    if datetime.now() - s["last_active"] > _SESSION_TTL:
-        _sessions.pop(session_id, None)
-        return []
-    return list(s["messages"])
+async def _in_session_executor(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
 
 
-def _save_turn(session_id: str, user_msg: str, assistant_msg: str) -> None:
-    s = _sessions.setdefault(session_id, {"messages": [], "last_active": datetime.now()})
-    s["messages"].append({"role": "user",      "content": user_msg})
-    s["messages"].append({"role": "assistant", "content": assistant_msg})
-    s["last_active"] = datetime.now()
+async def _get_history(session_id: str) -> list[dict]:
+    return await _in_session_executor(_sessions.get_history, session_id)
+
+
+async def _save_turn(session_id: str, user_msg: str, assistant_msg: str) -> None:
+    await _in_session_executor(_sessions.save_turn, session_id, user_msg, assistant_msg)
 
 
 # ── App ───────────────────────────────────────────────────────────────────────
@@ -83,6 +113,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -90,46 +121,75 @@ app.add_middleware(
 
 @app.get("/api/status")
 async def status():
+    sessions = await _in_session_executor(lambda: _sessions.stats)
     return {
         "ready":  _rag.get("ready", False),
         "chunks": _rag.get("chunks", 0),
         "error":  _rag.get("error"),
+        "query_cache": getattr(_rag.get("embedder"), "stats", None),
+        "router": _router_stats() if _rag.get("ready") else None,
+        "answer_cache": _rag["answer_cache"].stats if "answer_cache" in _rag else None,
+        "sessions": sessions,
     }
 
 
+def _router_stats() -> dict:
+    from rag.chat import router
+    return router.stats
+
+
+@app.get("/api/metrics")
+async def metrics_endpoint():
+    if not metrics.enabled():
+        return JSONResponse({"error": "Metrics are disabled — set ADHAN_METRICS=1"}, status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/chat")
 async def chat(
     q:          str = Query(...,       description="User question"),
     language:   str = Query("English", description="Reply language"),
     session_id: str = Query("",        description="Session ID for conversation memory"),
+    timing:     bool = Query(False,    description="End with an SSE 'timing' event (needs metrics)"),
 ):
     if not _rag.get("ready"):
         err = _rag.get("error", "RAG index not loaded.")
         return JSONResponse({"error": err}, status_code=503)
 
-    history = _get_history(session_id) if session_id else []
+    history = await _get_history(session_id) if session_id else []
 
-    def generate():
-        from rag.chat import answer_stream_with_tools
+    async def generate():
+        from rag.chat import answer_stream_with_tools_async
         full: list[str] = []
-        try:
-            stream, _ = answer_stream_with_tools(
-                q,
-                _rag["records"],
-                _rag["matrix"],
-                _rag["embedder"],
-                _rag["model"],
-                language=language,
-                history=history,
-            )
-            for token in stream:
-                full.append(token)
-                yield f"data: {json.dumps(token)}\n\n"
-        except Exception as e:
-            yield f"data: {json.dumps(f'Error: {e}')}\n\n"
-        finally:
-            if session_id and full:
-                _save_turn(session_id, q, "".join(full))
+        with metrics.trace() as trace:
+            first_token_at = None
+            try:
+                stream, _ = await answer_stream_with_tools_async(
+                    q,
+                    _rag["records"],
+                    _rag["matrix"],
+                    _rag["embedder"],
+                    _rag["client"],
+                    _rag["model"],
+                    language=language,
+                    history=history,
+                    answer_cache=_rag["answer_cache"],
+                )
+                async for token in stream:
+                    if trace is not None and first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    full.append(token)
+                    yield f"data: {json.dumps(token)}\n\n"
+            except Exception as e:
+                metrics.inc("chat_errors_total")
+                yield f"data: {json.dumps(f'Error: {e}')}\n\n"
+            finally:
+                if session_id and full:
+                    await _save_turn(session_id, q, "".join(full))
+            if trace is not None:
+                summary = _record_stream(trace, first_token_at, len(full))
+                if timing:
+                    yield f"event: timing\ndata: {json.dumps(summary)}\n\n"
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(
@@ -139,9 +199,86 @@ async def chat(
     )
 
 
+def _record_stream(trace: metrics.Trace, first_token_at: float | None, tokens: int) -> dict:
+    """
+    Record time-to-first-token, generation time and token count for one
+    answer; return the request's timings (ms) for the SSE trailer.
+    Tokens/s in Prometheus: rate(chat_tokens_total) / rate(chat_generation_seconds_sum).
+    """
+    end = time.perf_counter()
+    metrics.inc("chat_requests_total")
+    metrics.inc("chat_tokens_total", tokens)
+    summary = trace.as_dict()
+    summary["tokens"] = tokens
+    if first_token_at is not None:
+        ttft, generation = first_token_at - trace.start, end - first_token_at
+        metrics.observe("chat_ttft_seconds", ttft)
+        metrics.observe("chat_generation_seconds", generation)
+        summary["ttft"] = round(ttft * 1000, 1)
+        summary["tokens_per_second"] = round(tokens / generation, 1) if generation > 0 else None
+    return summary
+
+
+@app.get("/api/times")
+async def times(
+    request: Request,
+    city: str | None = Query(None,    description="City name; omit for the server's location"),
+    date: str        = Query("today", description="today, tomorrow, yesterday or YYYY-MM-DD"),
+    end:  str | None = Query(None,    description="Last date of the range (inclusive)"),
+):
+    query = TimesQuery(city=city, date=date, end=end)
+    loop = asyncio.get_running_loop()
+    try:
+        payload, tz = await loop.run_in_executor(None, times_payload, PrayerService(), query)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return cached_json(payload, request, [tz])
+
+
+@app.post("/api/times/batch")
+async def times_batch(request: Request, batch: TimesBatch):
+    svc = PrayerService()
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *(loop.run_in_executor(None, times_payload, svc, q) for q in batch.queries),
+        return_exceptions=True,
+    )
+    results, timezones = [], []
+    for query, outcome in zip(batch.queries, outcomes):
+        if isinstance(outcome, ValueError):
+            results.append({"city": query.city, "error": str(outcome)})
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results.append(outcome[0])
+            timezones.append(outcome[1])
+    return cached_json({"results": results}, request, timezones)
+
+
+@app.get("/api/timetable")
+async def timetable(
+    city:   str | None = Query(None,  description="City name; omit for the server's location"),
+    year:   int        = Query(...,   ge=1900, le=2200),
+    format: str        = Query("csv", description=" | ".join(FORMATS)),
+):
+    if format not in FORMATS:
+        return JSONResponse({"error": f"format must be one of {', '.join(FORMATS)}"}, status_code=400)
+    loop = asyncio.get_running_loop()
+    try:
+        path, resolved = await loop.run_in_executor(
+            None, PrayerService().export_year, city, year, format,
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return FileResponse(
+        path, media_type=MEDIA_TYPES[format], filename=download_name(resolved, year, format),
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
+
 @app.delete("/api/session/{session_id}")
 async def reset_session(session_id: str):
-    _sessions.pop(session_id, None)
+    await _in_session_executor(_sessions.delete, session_id)
     return {"ok": True}
 
 
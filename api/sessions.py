@@ -0,0 +1,284 @@
+"""
+Conversation session store for the chat API.
+
+Sessions are bounded three ways so a long-running server cannot leak memory:
+
+  * TTL         — sessions idle for longer than `ttl` are dropped, both when
+                  read and by a background sweeper thread.
+  * LRU bound   — at most `max_sessions` are kept; the least recently active
+                  are evicted first.
+  * token budget — each session's history is trimmed, oldest turn first, to
+                  roughly `max_tokens` (estimated at ~4 characters per token).
+
+Two backends: MemorySessionStore (per process, the default) and
+SQLiteSessionStore (a file shared by several uvicorn workers).  Set
+ADHAN_SESSION_DB to a path to use the latter.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_TTL = 30 * 60              # seconds of inactivity before a session expires
+_MAX_SESSIONS = 1000
+_MAX_TOKENS = 2000          # per-session history budget
+_SWEEP_INTERVAL = 60        # seconds between background sweeps
+_CHARS_PER_TOKEN = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          TEXT PRIMARY KEY,
+    messages    TEXT NOT NULL,
+    last_active REAL NOT NULL
+)
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate — no tokenizer needed for a budget."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def trim_history(messages: list[dict], max_tokens: int) -> list[dict]:
+    """
+    Drop the oldest user/assistant pairs until `messages` fits `max_tokens`.
+    The most recent turn is always kept.
+    """
+    total = sum(estimate_tokens(m["content"]) for m in messages)
+    start = 0
+    while total > max_tokens and len(messages) - start > 2:
+        total -= sum(estimate_tokens(m["content"]) for m in messages[start:start + 2])
+        start += 2
+    return messages[start:]
+
+
+class SessionStore(ABC):
+    """
+    Base class: eviction policy and counters.  Backends implement the
+    _load / _save / _delete / _expire / _evict_lru / __len__ primitives.
+    """
+
+    def __init__(
+        self,
+        ttl: float = _TTL,
+        max_sessions: int = _MAX_SESSIONS,
+        max_tokens: int = _MAX_TOKENS,
+    ) -> None:
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self.expired = 0
+        self.evicted = 0
+        self.trimmed = 0
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def get_history(self, session_id: str) -> list[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._load(session_id)
+            if entry is None:
+                return []
+            messages, last_active = entry
+            if now - last_active > self.ttl:
+                self._delete(session_id)
+                self.expired += 1
+                return []
+            return list(messages)
+
+    def save_turn(self, session_id: str, user_msg: str, assistant_msg: str) -> None:
+        now = time.time()
+        with self._lock:
+            entry = self._load(session_id)
+            messages = entry[0] if entry and now - entry[1] <= self.ttl else []
+            messages = messages + [
+                {"role": "user",      "content": user_msg},
+                {"role": "assistant", "content": assistant_msg},
+            ]
+            kept = trim_history(messages, self.max_tokens)
+            self.trimmed += len(messages) - len(kept)
+            self._save(session_id, kept, now)
+            self.evicted += self._evict_lru(self.max_sessions)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._delete(session_id)
+
+    def sweep(self) -> int:
+        """Remove every expired session; returns how many were removed."""
+        with self._lock:
+            removed = self._expire(time.time() - self.ttl)
+            self.expired += removed
+        return removed
+
+    def start_sweeper(self, interval: float = _SWEEP_INTERVAL) -> None:
+        """Sweep expired sessions every `interval` seconds on a daemon thread."""
+        if self._sweeper is not None:
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(interval,), name="session-sweeper", daemon=True,
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def close(self) -> None:
+        self.stop_sweeper()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self),
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "trimmed_messages": self.trimmed,
+            }
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.debug("Swept %d expired session(s)", removed)
+            except Exception as e:
+                logger.warning("Session sweep failed: %s", e)
+
+    # ── Backend primitives (caller holds the lock) ────────────────────────────
+
+    @abstractmethod
+    def _load(self, session_id: str) -> Optional[tuple[list[dict], float]]:
+        ...
+
+    @abstractmethod
+    def _save(self, session_id: str, messages: list[dict], now: float) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def _expire(self, cutoff: float) -> int:
+        ...
+
+    @abstractmethod
+    def _evict_lru(self, max_sessions: int) -> int:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store: an OrderedDict kept in last-active order."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._sessions: OrderedDict[str, tuple[list[dict], float]] = OrderedDict()
+
+    def _load(self, session_id):
+        return self._sessions.get(session_id)
+
+    def _save(self, session_id, messages, now):
+        self._sessions[session_id] = (messages, now)
+        self._sessions.move_to_end(session_id)
+
+    def _delete(self, session_id):
+        self._sessions.pop(session_id, None)
+
+    def _expire(self, cutoff):
+        stale = [sid for sid, (_, last) in self._sessions.items() if last < cutoff]
+        for sid in stale:
+            del self._sessions[sid]
+        return len(stale)
+
+    def _evict_lru(self, max_sessions):
+        evicted = 0
+        while len(self._sessions) > max_sessions:
+            self._sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store backed by a SQLite file, so several worker processes share sessions."""
+
+    def __init__(self, path: Path, **kwargs) -> None:
+        super().__init__(**kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_last_active ON sessions (last_active)"
+        )
+        self._db.commit()
+
+    def _load(self, session_id):
+        row = self._db.execute(
+            "SELECT messages, last_active FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _save(self, session_id, messages, now):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+            (session_id, json.dumps(messages, ensure_ascii=False), now),
+        )
+        self._db.commit()
+
+    def _delete(self, session_id):
+        self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self._db.commit()
+
+    def _expire(self, cutoff):
+        removed = self._db.execute("DELETE FROM sessions WHERE last_active < ?", (cutoff,)).rowcount
+        self._db.commit()
+        return removed
+
+    def _evict_lru(self, max_sessions):
+        removed = self._db.execute(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions "
+            "ORDER BY last_active DESC LIMIT -1 OFFSET ?)",
+            (max_sessions,),
+        ).rowcount
+        self._db.commit()
+        return removed
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self) -> None:
+        super().close()
+        self._db.close()
+
+
+def make_session_store(**kwargs) -> SessionStore:
+    """SQLite store at $ADHAN_SESSION_DB if set, otherwise in-memory."""
+    path = os.environ.get("ADHAN_SESSION_DB")
+    if path:
+        return SQLiteSessionStore(Path(path), **kwargs)
+    return MemorySessionStore(**kwargs)
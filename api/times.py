@@ -0,0 +1,84 @@
+"""
+Prayer-times REST helpers: compact payloads and HTTP caching.
+
+Payloads are columnar — one list of HH:MM strings per prayer — so a year of
+times for one city is a few kilobytes:
+
+    {"city": "Toronto", "timezone": "America/Toronto",
+     "start": "2026-10-18", "end": "2026-10-19",
+     "times": {"Fajr": ["05:58", "05:59"], "Sunrise": [...], ...}}
+
+Responses carry a strong ETag (hash of the body) and a Cache-Control max-age
+that runs out at the next local midnight, when "today" changes meaning.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import pytz
+from fastapi import Request, Response
+from pydantic import BaseModel, Field
+
+from services.prayer_service import PrayerService
+
+MAX_BATCH = 50              # queries per POST /api/times/batch
+
+
+class TimesQuery(BaseModel):
+    city: Optional[str] = None
+    date: str = "today"
+    end: Optional[str] = None
+
+
+class TimesBatch(BaseModel):
+    queries: list[TimesQuery] = Field(..., min_length=1, max_length=MAX_BATCH)
+
+
+def times_payload(svc: PrayerService, query: TimesQuery) -> tuple[dict, pytz.BaseTzInfo]:
+    """Compute one query. Raises ValueError for unknown cities or bad dates."""
+    timetable, resolved_city = svc.get_range(query.city, query.date, query.end)
+    dates = timetable.dates
+    payload = {
+        "city": resolved_city,
+        "timezone": timetable.timezone_name,
+        "start": dates[0].isoformat(),
+        "end": dates[-1].isoformat(),
+        "times": timetable.as_columns(),
+    }
+    return payload, timetable.tz
+
+
+def seconds_until_midnight(tz: pytz.BaseTzInfo, now: Optional[datetime] = None) -> int:
+    """Seconds from `now` until the next local midnight in `tz` (at least 1)."""
+    local = (now or datetime.now(pytz.utc)).astimezone(tz)
+    midnight = tz.localize(datetime.combine(local.date() + timedelta(days=1), datetime.min.time()))
+    return max(1, int((midnight - local).total_seconds()))
+
+
+def cached_json(payload: dict, request: Request, timezones: Iterable[pytz.BaseTzInfo]) -> Response:
+    """
+    Serialise `payload` compactly with a strong ETag, valid until the
+    earliest local midnight among `timezones`.  Answers 304 when the client
+    already holds the same body.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    max_ages = [seconds_until_midnight(tz) for tz in timezones]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={min(max_ages)}" if max_ages else "no-store",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
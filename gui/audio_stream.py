@@ -0,0 +1,154 @@
+"""
+Streaming microphone helpers — a preallocated ring buffer and energy-based
+voice-activity detection (VAD) for endpointing.
+
+    ring = RingBuffer(30 * 16_000)
+    vad = EnergyVAD(16_000)
+    for frame in frames:                 # 30 ms float32 blocks
+        ring.write(frame)
+        event = vad.feed(frame)          # None, SPEECH, END or TIMEOUT
+
+No Qt or audio-device imports, so the logic is testable with synthetic audio;
+gui/voice.RecordWorker wires it to sounddevice.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+SPEECH = "speech"        # speech started
+END = "end"              # speech followed by enough silence — the utterance is over
+TIMEOUT = "timeout"      # nothing was said
+
+FRAME_MS = 30
+_THRESHOLD_RATIO = 3.0     # speech = this many times louder than the noise floor
+_MIN_RMS = 0.01            # ... and never quieter than this (full scale = 1.0)
+_CALIBRATE_MS = 150        # opening audio that only measures the noise floor
+_START_MS = 90             # loud frames needed to call it speech (ignores clicks)
+_HANGOVER_MS = 600         # trailing silence that ends an utterance
+_NO_SPEECH_MS = 8000       # give up if nobody speaks
+_NOISE_ADAPT = 0.05        # EMA weight of each silent frame in the noise floor
+
+
+class RingBuffer:
+    """Fixed-capacity float32 sample buffer; when full, the oldest samples are overwritten."""
+
+    def __init__(self, capacity: int) -> None:
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._end = 0          # next write position
+        self._size = 0
+        self.total_written = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._end = self._size = self.total_written = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        self.total_written += n
+        cap = self.capacity
+        if n >= cap:
+            self._buf[:] = samples[-cap:]
+            self._end, self._size = 0, cap
+            return
+        first = min(n, cap - self._end)
+        self._buf[self._end:self._end + first] = samples[:first]
+        self._buf[:n - first] = samples[first:]
+        self._end = (self._end + n) % cap
+        self._size = min(cap, self._size + n)
+
+    def latest(self, n: int | None = None) -> np.ndarray:
+        """A contiguous copy of the newest `n` samples (all of them by default), oldest first."""
+        n = self._size if n is None else max(0, min(n, self._size))
+        start = (self._end - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._buf[start:start + n].copy()
+        return np.concatenate((self._buf[start:], self._buf[:self._end]))
+
+
+class EnergyVAD:
+    """
+    Endpointing on frame RMS energy against an adaptive noise floor, which
+    is measured over the first `calibrate_ms` and then tracked through
+    silent frames.  feed() returns SPEECH once speech starts, END after
+    `hangover_ms` of silence following speech, TIMEOUT if no speech starts
+    within `no_speech_ms`, and None otherwise.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_ratio: float = _THRESHOLD_RATIO,
+        min_rms: float = _MIN_RMS,
+        calibrate_ms: int = _CALIBRATE_MS,
+        start_ms: int = _START_MS,
+        hangover_ms: int = _HANGOVER_MS,
+        no_speech_ms: int = _NO_SPEECH_MS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.calibrate_ms = calibrate_ms
+        self.start_ms = start_ms
+        self.hangover_ms = hangover_ms
+        self.no_speech_ms = no_speech_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self.in_speech = False
+        self.noise_floor: float | None = None
+        self._loud_ms = 0.0
+        self._quiet_ms = 0.0
+        self._elapsed_ms = 0.0
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_rms, (self.noise_floor or 0.0) * self.threshold_ratio)
+
+    def feed(self, frame: np.ndarray) -> str | None:
+        frame = np.asarray(frame, dtype=np.float32).reshape(-1)
+        if not len(frame):
+            return None
+        ms = 1000.0 * len(frame) / self.sample_rate
+        self._elapsed_ms += ms
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        if self._elapsed_ms <= self.calibrate_ms:
+            self._adapt(rms)
+            return None
+        loud = rms > self.threshold
+
+        if not self.in_speech:
+            if loud:
+                self._loud_ms += ms
+                if self._loud_ms >= self.start_ms:
+                    self.in_speech = True
+                    self._quiet_ms = 0.0
+                    return SPEECH
+            else:
+                self._loud_ms = 0.0
+                self._adapt(rms)
+                if self._elapsed_ms >= self.no_speech_ms:
+                    return TIMEOUT
+            return None
+
+        if loud:
+            self._quiet_ms = 0.0
+            return None
+        self._quiet_ms += ms
+        if self._quiet_ms >= self.hangover_ms:
+            self.in_speech = False
+            self._loud_ms = 0.0
+            return END
+        return None
+
+    def _adapt(self, rms: float) -> None:
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        else:
+            self.noise_floor += _NOISE_ADAPT * (rms - self.noise_floor)
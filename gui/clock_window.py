@@ -8,13 +8,14 @@ from __future__ import annotations
 
 import sys
 import threading
+from datetime import timedelta
 from pathlib import Path
 
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QGridLayout, QGroupBox, QPushButton,
                              QSizePolicy, QLineEdit, QTextEdit, QScrollArea,
                              QMenu, QComboBox)
-from PyQt5.QtCore import QTimer, Qt, QThread, pyqtSignal
+from PyQt5.QtCore import QEvent, QTimer, Qt, QThread, pyqtSignal
 
 from adhan import PrayerClock
 from adhan.config import save_config
@@ -22,7 +23,12 @@ from adhan.notifications import VOLUME_NORMAL, VOLUME_SUPPRESSED
 from gui.settings import SettingsDialog
 from utils.display_helper import format_date_display, format_countdown
 
-_ADHAN_TRIGGER_WINDOW = 30   # seconds after prayer time to auto-play adhan
+_PRAYERS = ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha")
+_ADHAN_TRIGGER_WINDOW = 30   # seconds — how late (e.g. after suspend) the adhan still plays
+_LOCATION_DEBOUNCE_MS = 500  # repeated refresh requests within this window coalesce
+_TICK_SLACK_MS = 5           # land just after the second boundary, never just before
+_PRAYER_TIMER_MAX_MS = 15 * 60 * 1000   # re-check the wall clock at least this often
+_TTS_STOP_WAIT_MS = 2000     # how long closing the window waits for speech to stop
 
 _BTN_STYLE = (
     "padding: 5px 10px; border-radius: 4px; font-size: 12px; color: white;"
@@ -77,11 +83,34 @@ class _RagWorker(QThread):
             self.error.emit(str(e))
 
 
+# ── Location refresh worker ───────────────────────────────────────────────────
+
+class _LocationWorker(QThread):
+    """
+    Reloads config and re-detects the location (an HTTP call) off the Qt main
+    thread, so the clock keeps ticking while it runs.
+    """
+    done = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, clock: PrayerClock) -> None:
+        super().__init__()
+        self._clock = clock
+
+    def run(self) -> None:
+        try:
+            self._clock.refresh_settings(wait=True)
+            self.done.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 # ── Main window ───────────────────────────────────────────────────────────────
 
 class AdhanClockUI(QWidget):
 
-    _adhan_ended = pyqtSignal()   # emitted from watcher thread when playback stops
+    _adhan_ended = pyqtSignal()        # emitted from watcher thread when playback stops
+    _location_changed = pyqtSignal()   # emitted from the clock's refresh thread on a move
 
     def __init__(self, clock: PrayerClock | None = None) -> None:
         super().__init__()
@@ -97,15 +126,26 @@ class AdhanClockUI(QWidget):
         self._rag_worker: _RagWorker | None = None
         self._adhan_played: set[str] = set()
         self._last_adhan_date = None
+        self._next_prayer_event: tuple | None = None   # (name, time) the prayer timer is for
+        self._display_day = None         # day the date labels and prayer grid show
+        self._day_schedule = None        # that day's PrayerSchedule
+        self._day_prayers: list[tuple] = []   # (name, time) in display order
         self._adhan_ended.connect(self._on_adhan_ended)
+        self._location_worker: _LocationWorker | None = None
+        self._location_busy = False      # a _LocationWorker is refreshing
+        self._location_pending = False   # another refresh was requested meanwhile
+        self._location_changed.connect(self._on_location_refreshed)
+        self.clock.add_location_listener(self._location_changed.emit)
         self._record_worker     = None   # RecordWorker when mic is active
         self._transcribe_worker = None   # TranscribeWorker keeping thread alive
         self._tts_worker        = None   # TtsWorker when speaking
 
         self._build_ui()
         self._setup_timer()
-        self.refresh_location()
+        self._on_location_refreshed()    # the clock already has the last known location
+        self._arm_display_timer()
         self._init_rag()
+        self._init_voice()
 
     # ── UI construction ───────────────────────────────────────────────────────
 
@@ -286,6 +326,8 @@ class AdhanClockUI(QWidget):
             "border-radius: 4px; padding: 4px 8px; font-size: 12px;"
         )
         self.whisper_combo.setToolTip("Whisper model: large-v3 = accurate, tiny = fast")
+        self.whisper_combo.setCurrentText(self.clock.config.whisper_model)
+        self.whisper_combo.currentTextChanged.connect(self._on_whisper_model_changed)
         lang_row.addWidget(self.whisper_combo)
         inner.addLayout(lang_row)
 
@@ -305,7 +347,7 @@ class AdhanClockUI(QWidget):
             "background-color: #2c3e50; color: white; padding: 6px 10px; "
             "border-radius: 4px; font-size: 14px;"
         )
-        self.mic_btn.setToolTip("Hold to record, click again to stop")
+        self.mic_btn.setToolTip("Speak — stops by itself when you pause (or click to stop)")
         self.mic_btn.clicked.connect(self._toggle_recording)
         input_row.addWidget(self.mic_btn)
 
@@ -350,9 +392,92 @@ class AdhanClockUI(QWidget):
         return group
 
     def _setup_timer(self) -> None:
+        """
+        Two single-shot timers, re-armed after every shot: the display timer
+        fires just after each wall-clock second (each minute while the window
+        is hidden or minimized), and the prayer timer fires at the next
+        prayer time.
+        """
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_display)
-        self.timer.start(1000)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+        self._prayer_timer = QTimer()
+        self._prayer_timer.setSingleShot(True)
+        self._prayer_timer.setTimerType(Qt.PreciseTimer)
+        self._prayer_timer.timeout.connect(self._on_prayer_timer)
+
+        self._location_debounce = QTimer()
+        self._location_debounce.setSingleShot(True)
+        self._location_debounce.setInterval(_LOCATION_DEBOUNCE_MS)
+        self._location_debounce.timeout.connect(self._start_location_refresh)
+
+    def _tick(self) -> None:
+        self.update_display()
+        self._arm_display_timer()
+
+    def _arm_display_timer(self) -> None:
+        now = self.clock.get_current_time()
+        ms = 1000 - now.microsecond // 1000
+        if self.isHidden() or self.isMinimized():
+            ms += (59 - now.second) * 1000
+        self.timer.start(ms + _TICK_SLACK_MS)
+
+    def _arm_prayer_timer(self) -> None:
+        """Aim the prayer timer at the next prayer, today or tomorrow."""
+        now = self.clock.get_current_time()
+        self._next_prayer_event = self._next_prayer_after(now)
+        ms = _PRAYER_TIMER_MAX_MS   # no schedule: try again later
+        if self._next_prayer_event is not None:
+            until = (self._next_prayer_event[1] - now).total_seconds() * 1000
+            ms = max(0, min(int(until), _PRAYER_TIMER_MAX_MS))
+        self._prayer_timer.start(ms)
+
+    def _next_prayer_after(self, now) -> tuple | None:
+        for offset in (0, 1):
+            day = now.date() + timedelta(days=offset)
+            if day == self._display_day:
+                pt = self._day_schedule
+            else:
+                pt = self.clock.get_prayer_times(day)
+            if not pt:
+                return None
+            for prayer in _PRAYERS:
+                p_time = getattr(pt, prayer.lower())
+                if p_time > now:
+                    return prayer, p_time
+        return None
+
+    def _on_prayer_timer(self) -> None:
+        # The timer may fire early (it is capped, and monotonic time drifts from
+        # the wall clock across suspend), so check before playing.
+        now = self.clock.get_current_time()
+        event = self._next_prayer_event
+        if event is not None and event[1] <= now:
+            self._play_scheduled_adhan(now, *event)
+        self._arm_prayer_timer()
+
+    # ── Window visibility ─────────────────────────────────────────────────────
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self._tick()   # catch up at once and go back to per-second updates
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._arm_display_timer()
+
+    def changeEvent(self, event) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._tick()
+
+    def closeEvent(self, event) -> None:
+        if self._tts_worker is not None and self._tts_worker.isRunning():
+            self._tts_worker.stop()
+            self._tts_worker.wait(_TTS_STOP_WAIT_MS)
+        super().closeEvent(event)
 
     # ── RAG initialisation ────────────────────────────────────────────────────
 
@@ -360,14 +485,15 @@ class AdhanClockUI(QWidget):
         self._rag_ready = False
         try:
             sys.path.insert(0, str(Path(__file__).parent.parent))
-            from rag.query import load_index, load_clients, INDEX_PATH
+            from rag.query import load_index, load_retriever, load_clients, index_exists, INDEX_PATH
             from rag.chat import answer_stream_with_tools
-            if not INDEX_PATH.exists():
+            if not index_exists(INDEX_PATH):
                 self.rag_answer.setPlaceholderText(
                     "RAG index not found. Run: python rag/ingest.py"
                 )
                 return
-            self._rag_records, self._rag_matrix = load_index(INDEX_PATH)
+            self._rag_records, matrix = load_index(INDEX_PATH)
+            self._rag_matrix = load_retriever(INDEX_PATH, matrix)
             self._rag_voyage, self._rag_claude = load_clients()
             self._answer_stream_fn = answer_stream_with_tools
             self._rag_ready = True
@@ -378,6 +504,11 @@ class AdhanClockUI(QWidget):
         except (Exception, SystemExit) as e:
             self.rag_answer.setPlaceholderText(f"RAG unavailable: {e}")
 
+    def _init_voice(self) -> None:
+        """Load the selected Whisper model in the background before the first utterance."""
+        from gui.voice import preload_model
+        preload_model(self.whisper_combo.currentText())
+
     # ── Slots ─────────────────────────────────────────────────────────────────
 
     def _play_adhan(self) -> None:
@@ -429,42 +560,58 @@ class AdhanClockUI(QWidget):
             self.refresh_location()
 
     def refresh_location(self) -> None:
+        """Reload settings and re-detect the location in the background (debounced)."""
         self.location_label.setText("Refreshing...")
-        self.clock.refresh_settings()
+        self._location_debounce.start()
+
+    def _start_location_refresh(self) -> None:
+        if self._location_busy:
+            self._location_pending = True
+            return
+        self._location_busy = True
+        self._location_pending = False
+        self._location_worker = _LocationWorker(self.clock)
+        self._location_worker.done.connect(self._on_location_worker_done)
+        self._location_worker.error.connect(self._on_location_worker_error)
+        self._location_worker.start()
+
+    def _on_location_worker_done(self) -> None:
+        self._location_busy = False
+        self._on_location_refreshed()
+        if self._location_pending:
+            self._start_location_refresh()
+
+    def _on_location_worker_error(self, msg: str) -> None:
+        self._location_busy = False
+        self.location_label.setText(
+            f"{self.clock.config.city} | {self.clock.timezone} (refresh failed)"
+        )
+        if self._location_pending:
+            self._start_location_refresh()
+
+    def _on_location_refreshed(self) -> None:
         self.location_label.setText(
             f"{self.clock.config.city} | {self.clock.timezone}"
         )
+        self._display_day = None         # settings or location changed: redo the day
         self.update_display()
 
     def update_display(self) -> None:
+        """
+        Per-second tick.  Only the clock and the countdown change every
+        second; the date labels and prayer grid are redone once per day
+        (or after a settings/location refresh).
+        """
         now = self.clock.get_current_time()
         self.time_label.setText(now.strftime("%H:%M:%S"))
-        self.date_label.setText(format_date_display(now.date()))
-        try:
-            import hijridate
-            h = hijridate.Gregorian(now.year, now.month, now.day).to_hijri()
-            self.hijri_label.setText(f"{h.day} {h.month_name()} {h.year}")
-        except Exception:
-            self.hijri_label.setText("")
+        if now.date() != self._display_day:
+            self._update_day(now.date())
 
-        pt = self.clock.get_prayer_times(now.date())
+        pt = self._day_schedule
         if not pt:
             return
 
-        self.sunrise_label.setText(pt.sunrise.strftime("%H:%M"))
-
-        next_prayer = None
-        for prayer, lbl in self.prayer_labels.items():
-            p_time = getattr(pt, prayer.lower())
-            new_text = p_time.strftime("%H:%M")
-            if lbl.text() != new_text:
-                lbl.setText(new_text)
-                lbl.repaint()
-            if p_time > now and next_prayer is None:
-                next_prayer = (prayer, p_time)
-
-        QApplication.processEvents()
-
+        next_prayer = next(((name, t) for name, t in self._day_prayers if t > now), None)
         if next_prayer:
             self.countdown_label.setText(
                 f"{next_prayer[0]} in {format_countdown(next_prayer[1] - now)}"
@@ -472,28 +619,46 @@ class AdhanClockUI(QWidget):
         elif not hasattr(sys.modules.get("__main__", object()), "_test_clock"):
             self.countdown_label.setText("All prayers done for today.")
 
-        self._check_adhan_trigger(now, pt)
+    def _update_day(self, day) -> None:
+        """Date, Hijri date and prayer grid for `day`."""
+        self.date_label.setText(format_date_display(day))
+        try:
+            import hijridate
+            h = hijridate.Gregorian(day.year, day.month, day.day).to_hijri()
+            self.hijri_label.setText(f"{h.day} {h.month_name()} {h.year}")
+        except Exception:
+            self.hijri_label.setText("")
 
-    def _check_adhan_trigger(self, now, pt) -> None:
-        """Play adhan automatically when a prayer time is reached (once per prayer per day)."""
-        today = now.date()
-        if today != self._last_adhan_date:
-            self._adhan_played.clear()
-            self._last_adhan_date = today
+        pt = self._day_schedule = self.clock.get_prayer_times(day)
+        if not pt:
+            return   # _display_day stays unset, so the next tick tries again
+        self._display_day = day
 
-        for prayer in ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"):
-            key = f"{prayer}_{today}"
-            if key in self._adhan_played:
-                continue
+        self.sunrise_label.setText(pt.sunrise.strftime("%H:%M"))
+        self._day_prayers = []
+        for prayer, lbl in self.prayer_labels.items():
             p_time = getattr(pt, prayer.lower())
-            delta = (now - p_time).total_seconds()
-            if 0 <= delta <= _ADHAN_TRIGGER_WINDOW:
-                self._adhan_played.add(key)
-                threading.Thread(
-                    target=lambda p=prayer: self.clock.play_adhan(p, VOLUME_NORMAL),
-                    daemon=True,
-                ).start()
-                break
+            lbl.setText(p_time.strftime("%H:%M"))
+            self._day_prayers.append((prayer, p_time))
+        self._arm_prayer_timer()
+
+    def _play_scheduled_adhan(self, now, prayer: str, p_time) -> None:
+        """Play the adhan for a prayer that just fell due (once per prayer per day)."""
+        day = p_time.date()
+        if day != self._last_adhan_date:
+            self._adhan_played.clear()
+            self._last_adhan_date = day
+
+        key = f"{prayer}_{day}"
+        if key in self._adhan_played:
+            return
+        self._adhan_played.add(key)
+        if (now - p_time).total_seconds() > _ADHAN_TRIGGER_WINDOW:
+            return   # woke up too late (suspend); don't play a stale adhan
+        threading.Thread(
+            target=lambda: self.clock.play_adhan(prayer, VOLUME_NORMAL),
+            daemon=True,
+        ).start()
 
     def _ask_question(self) -> None:
         if not self._rag_ready:
@@ -544,23 +709,28 @@ class AdhanClockUI(QWidget):
         }
         self.rag_input.setPlaceholderText(hints.get(language, hints["English"]))
 
+    def _on_whisper_model_changed(self, model_size: str) -> None:
+        """Remember the chosen size and start loading it (the old one is unloaded when idle)."""
+        from gui.voice import preload_model
+        self.clock.config.whisper_model = model_size
+        save_config(self.clock.config, self.clock.config_path)
+        preload_model(model_size)
+
     def _toggle_recording(self) -> None:
-        from gui.voice import RecordWorker, TranscribeWorker
+        from gui.voice import RecordWorker
         if self._record_worker and self._record_worker.isRunning():
             # Stop recording → transcribe
             self._record_worker.stop()
-            self.mic_btn.setStyleSheet(
-                "background-color: #2c3e50; color: white; padding: 6px 10px; "
-                "border-radius: 4px; font-size: 14px;"
-            )
-            self.mic_btn.setText("🎤")
+            self._set_mic_idle()
         else:
-            # Start recording
-            self._record_worker = RecordWorker()
-            self._record_worker.finished.connect(self._on_recording_done)
-            self._record_worker.error.connect(
-                lambda e: self.rag_answer.setPlainText(f"Mic error: {e}")
+            # Start recording; it also stops by itself at the end of speech
+            self._record_worker = RecordWorker(
+                language=self.lang_combo.currentText(),
+                model_size=self.whisper_combo.currentText(),
             )
+            self._record_worker.finished.connect(self._on_recording_done)
+            self._record_worker.partial.connect(self.rag_input.setText)
+            self._record_worker.error.connect(self._on_recording_error)
             self._record_worker.start()
             self.mic_btn.setStyleSheet(
                 "background-color: #c0392b; color: white; padding: 6px 10px; "
@@ -568,8 +738,20 @@ class AdhanClockUI(QWidget):
             )
             self.mic_btn.setText("⏹ Stop")
 
+    def _set_mic_idle(self) -> None:
+        self.mic_btn.setStyleSheet(
+            "background-color: #2c3e50; color: white; padding: 6px 10px; "
+            "border-radius: 4px; font-size: 14px;"
+        )
+        self.mic_btn.setText("🎤")
+
+    def _on_recording_error(self, msg: str) -> None:
+        self._set_mic_idle()
+        self.rag_answer.setPlainText(f"Mic error: {msg}")
+
     def _on_recording_done(self, audio, sample_rate: int) -> None:
         from gui.voice import TranscribeWorker
+        self._set_mic_idle()
         language = self.lang_combo.currentText()
         model = self.whisper_combo.currentText()
         self.rag_answer.setPlainText("Transcribing…")
@@ -589,21 +771,39 @@ class AdhanClockUI(QWidget):
             self._ask_question()
 
     def _speak_answer(self) -> None:
+        """Read the answer aloud; pressed again while speaking, stop."""
         from gui.voice import TtsWorker
+        if self._tts_worker is not None and self._tts_worker.isRunning():
+            self._stop_speaking()
+            return
         text = self.rag_answer.toPlainText().strip()
         if not text:
             return
         language = self.lang_combo.currentText()
-        self.speak_btn.setEnabled(False)
-        self._tts_worker = TtsWorker(text, language=language)
-        self._tts_worker.finished.connect(lambda: self.speak_btn.setEnabled(True))
-        self._tts_worker.error.connect(
-            lambda e: (
-                self.rag_answer.insertPlainText(f"\n[TTS error: {e}]"),
-                self.speak_btn.setEnabled(True),
-            )
-        )
-        self._tts_worker.start()
+        worker = TtsWorker(text, language=language)
+        # Bind the worker: a stopped one may still report back after the next has started
+        worker.finished.connect(lambda: self._on_tts_done(worker))
+        worker.error.connect(lambda e: self._on_tts_done(worker, e))
+        self._tts_worker = worker
+        worker.start()
+        self.speak_btn.setText("⏹ Stop")
+        self.speak_btn.setToolTip("Stop reading the answer")
+
+    def _stop_speaking(self) -> None:
+        """Cut off the current sentence; the queued ones are never played."""
+        if self._tts_worker is not None:
+            self._tts_worker.stop()
+        self._set_speak_idle()
+
+    def _set_speak_idle(self) -> None:
+        self.speak_btn.setText("🔊 Speak")
+        self.speak_btn.setToolTip("Read the answer aloud")
+
+    def _on_tts_done(self, worker, error: str = "") -> None:
+        if error:
+            self.rag_answer.insertPlainText(f"\n[TTS error: {error}]")
+        if worker is self._tts_worker:
+            self._set_speak_idle()
 
     # ── Resize ────────────────────────────────────────────────────────────────
 
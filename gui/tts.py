@@ -0,0 +1,236 @@
+"""
+Text-to-speech — pluggable engines, an on-disk phrase cache and
+sentence-level pipelined playback.
+
+    speak("Fajr is at 05:12. Dhuhr is at 13:04.", "en")
+
+The answer is split into sentences; a background thread synthesises them in
+order while the caller plays each one as soon as it is ready, so audio starts
+after the first sentence rather than after the whole answer.  Every clip is
+cached under ~/.cache/adhan-clock/tts (or $ADHAN_CACHE_DIR/tts), keyed by
+(engine, language, text), so repeated phrases — prayer-time readouts above
+all — are played straight from disk.
+
+Engines (ADHAN_TTS_ENGINE=auto|espeak|gtts; auto prefers espeak):
+  espeak — espeak-ng / espeak, offline, available on every Linux distro
+  gtts   — Google TTS, needs network
+Players: paplay / aplay / afplay / mpg123 / ffplay, whichever is installed.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Protocol
+
+from adhan.config import DEFAULT_CACHE_DIR, atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_DIR = DEFAULT_CACHE_DIR / "tts"
+
+_MAX_FILES = 2000          # cached clips kept, least recently played first out
+_SYNTH_TIMEOUT = 30        # seconds per sentence
+_ESPEAK_SPEED = 160        # words per minute
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?۔؟।])\s+|\n+")
+
+_PLAYERS = {
+    ".wav": (["paplay"], ["aplay", "-q"], ["afplay"]),
+    ".mp3": (["afplay"], ["mpg123", "-q"]),
+}
+_FFPLAY = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+
+
+def split_sentences(text: str) -> list[str]:
+    """Sentences and lines of `text`, without list bullets or empty pieces."""
+    parts = (p.strip().lstrip("-*• ").strip() for p in _SENTENCE_BREAK.split(text))
+    return [p for p in parts if any(ch.isalnum() for ch in p)]
+
+
+# ── Engines ───────────────────────────────────────────────────────────────────
+
+class TtsEngine(Protocol):
+    name: str
+    extension: str     # audio file suffix, e.g. ".wav"
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        """Audio file bytes for `text` in ISO 639-1 `language`."""
+        ...
+
+
+class EspeakEngine:
+    """espeak-ng (or classic espeak) — offline and tiny; WAV output."""
+
+    name = "espeak"
+    extension = ".wav"
+
+    def __init__(self, binary: Optional[str] = None, speed: int = _ESPEAK_SPEED) -> None:
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.speed = speed
+
+    @property
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        if self.binary is None:
+            raise RuntimeError("espeak-ng is not installed (apt install espeak-ng)")
+        result = subprocess.run(
+            [self.binary, "-v", language, "-s", str(self.speed), "--stdout", text],
+            capture_output=True, check=True, timeout=_SYNTH_TIMEOUT,
+        )
+        return result.stdout
+
+
+class GttsEngine:
+    """Google TTS via gTTS — natural voices, but needs network; MP3 output."""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=language, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+
+ENGINES: dict[str, Callable[[], TtsEngine]] = {
+    "espeak": EspeakEngine,
+    "gtts": GttsEngine,
+}
+
+
+def default_engine(choice: Optional[str] = None) -> TtsEngine:
+    """The engine named by `choice` or $ADHAN_TTS_ENGINE; "auto" prefers offline espeak."""
+    choice = choice or os.environ.get("ADHAN_TTS_ENGINE", "auto")
+    if choice == "auto":
+        espeak = EspeakEngine()
+        return espeak if espeak.available else GttsEngine()
+    if choice not in ENGINES:
+        raise ValueError(f"Unknown TTS engine {choice!r} (expected auto or {', '.join(ENGINES)})")
+    return ENGINES[choice]()
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class TtsCache:
+    """Synthesised clips stored as plain audio files under `directory`."""
+
+    def __init__(self, directory: Path = DEFAULT_TTS_DIR, max_files: int = _MAX_FILES) -> None:
+        self.directory = directory
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, text: str, language: str, engine: TtsEngine) -> Path:
+        normalized = " ".join(text.split())
+        key = hashlib.sha256(f"{engine.name}\0{language}\0{normalized}".encode()).hexdigest()[:32]
+        return self.directory / f"{key}{engine.extension}"
+
+    def get(self, text: str, language: str, engine: TtsEngine) -> Path:
+        """Path to the clip for `text`, synthesising and storing it first if needed."""
+        path = self.path_for(text, language, engine)
+        if path.exists():
+            self.hits += 1
+            try:
+                os.utime(path)          # mark as recently used for pruning
+            except OSError:
+                pass
+            return path
+
+        self.misses += 1
+        atomic_write(path, engine.synthesize(text, language))
+        self._prune()
+        return path
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob("*.*"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def _prune(self) -> None:
+        files = [p for p in self.directory.iterdir() if not p.name.endswith(".tmp")]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[: len(files) - self.max_files]:
+            path.unlink(missing_ok=True)
+
+
+# ── Playback ──────────────────────────────────────────────────────────────────
+
+def player_command(path: Path) -> Optional[list[str]]:
+    """Command line that plays `path` with the first installed player, or None."""
+    for cmd in (*_PLAYERS.get(path.suffix, ()), _FFPLAY):
+        if shutil.which(cmd[0]):
+            return [*cmd, str(path)]
+    return None
+
+
+def play_file(path: Path, stop: Optional[threading.Event] = None) -> None:
+    """Play `path` in a child process (no conflict with the adhan pygame mixer)."""
+    cmd = player_command(path)
+    if cmd is None:
+        raise RuntimeError("No audio player found (install pulseaudio-utils, alsa-utils or ffmpeg)")
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while True:
+        try:
+            proc.wait(timeout=0.1)
+            return
+        except subprocess.TimeoutExpired:
+            if stop is not None and stop.is_set():
+                proc.terminate()
+                proc.wait()
+                return
+
+
+def speak(
+    text: str,
+    language: str = "en",
+    engine: Optional[TtsEngine] = None,
+    cache: Optional[TtsCache] = None,
+    player: Callable[[Path, Optional[threading.Event]], None] = play_file,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    Speak `text`, playing each sentence as soon as it is synthesised while
+    the next ones are prepared.  Returns the number of sentences played;
+    setting `stop` ends playback early.  Synthesis errors are raised.
+    """
+    engine = engine or default_engine()
+    cache = cache or TtsCache()
+    stop = stop or threading.Event()
+    ready: queue.Queue = queue.Queue()
+
+    def synthesise() -> None:
+        try:
+            for sentence in split_sentences(text):
+                if stop.is_set():
+                    break
+                ready.put(cache.get(sentence, language, engine))
+        except Exception as e:
+            ready.put(e)
+        finally:
+            ready.put(None)
+
+    threading.Thread(target=synthesise, name="tts-synthesise", daemon=True).start()
+    played = 0
+    while (item := ready.get()) is not None:
+        if isinstance(item, Exception):
+            stop.set()
+            raise item
+        if not stop.is_set():
+            player(item, stop)
+            played += 1
+    return played
@@ -1,24 +1,36 @@
 """
-Voice I/O workers — microphone recording, Whisper transcription, gTTS/afplay TTS.
+Voice I/O workers — microphone recording, Whisper transcription, text-to-speech.
 
 Three QThread subclasses so all I/O stays off the Qt main thread:
-  RecordWorker      — streams mic until stop() is called
-  TranscribeWorker  — runs faster-whisper on the captured audio array
-  TtsWorker         — synthesises text via gTTS, plays via macOS afplay
-                      (separate process — no conflict with the adhan pygame mixer)
+  RecordWorker      — streams the mic into a ring buffer until the VAD hears
+                      the end of speech (or stop() is called), emitting
+                      partial transcripts while the user speaks
+  TranscribeWorker  — runs faster-whisper on the captured audio array, using
+                      the shared model registry (gui/whisper_models.py)
+  TtsWorker         — speaks text sentence by sentence through gui/tts.py
+                      (offline espeak-ng where installed, cached on disk)
 """
 from __future__ import annotations
 
 import logging
-import tempfile
-from pathlib import Path
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from gui.audio_stream import END, FRAME_MS, SPEECH, TIMEOUT, EnergyVAD, RingBuffer
+from gui.tts import speak
+from gui.whisper_models import get_registry
+
 logger = logging.getLogger(__name__)
 
 _SAMPLE_RATE = 16_000  # Hz — Whisper's native sample rate
+_FRAME = _SAMPLE_RATE * FRAME_MS // 1000
+_MAX_UTTERANCE_S = 30          # Whisper's window; recording stops here
+_PRE_ROLL_S = 0.3              # audio kept from just before speech was detected
+_PARTIAL_INTERVAL_S = 1.0      # how often to re-transcribe while the user speaks
+_PARTIAL_MODELS = ("tiny", "base")   # larger models are too slow for live partials
 
 SUPPORTED_LANGUAGES = ["English", "Urdu", "Hindi", "Turkish", "Arabic"]
 
@@ -36,43 +48,105 @@ def lang_code(language: str) -> str:
     return _LANG_CODE.get(language, "en")
 
 
+def preload_model(model_size: str) -> None:
+    """Start loading a Whisper model in the background so the first utterance is fast."""
+    get_registry().preload(model_size)
+
+
 class RecordWorker(QThread):
     """
-    Captures microphone audio in 100 ms chunks until stop() is called.
-    Emits finished(audio_array, sample_rate) when recording ends.
+    Streams microphone audio in 30 ms frames into a preallocated ring buffer.
+    Recording ends when stop() is called or, with auto_stop, when the VAD
+    hears the end of speech (error "No speech detected" if nobody speaks).
+    With a tiny/base model, partial(text) is emitted about once a second
+    while the user is speaking.
+    Emits finished(audio_array, sample_rate) with the utterance.
     """
     finished = pyqtSignal(object, int)
+    partial  = pyqtSignal(str)
     error    = pyqtSignal(str)
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        language: str = "English",
+        model_size: str = "tiny",
+        auto_stop: bool = True,
+    ) -> None:
         super().__init__()
         self._stop_flag = False
+        self._lang = lang_code(language)
+        self._model_size = model_size
+        self._auto_stop = auto_stop
 
     def stop(self) -> None:
         self._stop_flag = True
 
     def run(self) -> None:
         import sounddevice as sd
-        chunks: list[np.ndarray] = []
+        ring = RingBuffer(_SAMPLE_RATE * _MAX_UTTERANCE_S)
+        vad = EnergyVAD(_SAMPLE_RATE)
+        speech_start: int | None = None    # ring.total_written where the utterance starts
+        partials = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-partial")
+        pending: Future | None = None
+        next_partial = 0
+        event = None
         try:
             with sd.InputStream(
-                samplerate=_SAMPLE_RATE, channels=1, dtype="float32"
+                samplerate=_SAMPLE_RATE, channels=1, dtype="float32", blocksize=_FRAME,
             ) as stream:
                 while not self._stop_flag:
-                    chunk, _ = stream.read(_SAMPLE_RATE // 10)
-                    chunks.append(chunk.copy())
+                    frame, _ = stream.read(_FRAME)
+                    ring.write(frame)
+                    event = vad.feed(frame)
+                    if event == SPEECH and speech_start is None:
+                        onset = _PRE_ROLL_S + vad.start_ms / 1000
+                        speech_start = max(0, ring.total_written - int(_SAMPLE_RATE * onset))
+                        next_partial = ring.total_written + int(_SAMPLE_RATE * _PARTIAL_INTERVAL_S)
+                    elif event in (END, TIMEOUT) and self._auto_stop:
+                        break
+                    if speech_start is None:
+                        continue
+                    if ring.total_written - speech_start >= ring.capacity:
+                        break
+                    if (
+                        self._model_size in _PARTIAL_MODELS
+                        and ring.total_written >= next_partial
+                        and (pending is None or pending.done())
+                    ):
+                        audio = ring.latest(ring.total_written - speech_start)
+                        pending = partials.submit(self._emit_partial, audio)
+                        next_partial = ring.total_written + int(_SAMPLE_RATE * _PARTIAL_INTERVAL_S)
         except Exception as e:
             logger.warning("Recording error: %s", e)
             self.error.emit(str(e))
             return
-        if chunks:
-            audio = np.concatenate(chunks, axis=0).flatten()
-            self.finished.emit(audio, _SAMPLE_RATE)
+        finally:
+            partials.shutdown(wait=False, cancel_futures=True)
+
+        if speech_start is not None:
+            self._stop_flag = True          # late partials must not overwrite the final text
+            self.finished.emit(ring.latest(ring.total_written - speech_start), _SAMPLE_RATE)
+        elif event == TIMEOUT:
+            self.error.emit("No speech detected")
+        elif len(ring):
+            self.finished.emit(ring.latest(), _SAMPLE_RATE)
+
+    def _emit_partial(self, audio: np.ndarray) -> None:
+        try:
+            with get_registry().use(self._model_size) as model:
+                segments, _ = model.transcribe(audio, language=self._lang, beam_size=1)
+                text = " ".join(s.text.strip() for s in segments).strip()
+        except Exception as e:
+            logger.debug("Partial transcription failed: %s", e)
+            return
+        if text and not self._stop_flag:
+            self.partial.emit(text)
 
 
 class TranscribeWorker(QThread):
     """
-    Runs faster-whisper on a numpy float32 audio array.
+    Runs faster-whisper on a numpy float32 audio array.  The model comes from
+    the process-wide registry, so it is loaded once, not per utterance.
     Emits result(transcript_text) or error(message).
     """
     result = pyqtSignal(str)
@@ -93,14 +167,14 @@ class TranscribeWorker(QThread):
 
     def run(self) -> None:
         try:
-            from faster_whisper import WhisperModel
-            model = WhisperModel(self._model_size, device="cpu", compute_type="int8")
-            segments, _ = model.transcribe(
-                self._audio,
-                language=self._lang,
-                beam_size=5,
-            )
-            text = " ".join(s.text.strip() for s in segments).strip()
+            with get_registry().use(self._model_size) as model:
+                segments, _ = model.transcribe(
+                    self._audio,
+                    language=self._lang,
+                    beam_size=5,
+                )
+                # segments is lazy — decoding happens while iterating, so keep the lock
+                text = " ".join(s.text.strip() for s in segments).strip()
             self.result.emit(text)
         except Exception as e:
             logger.warning("Transcription error: %s", e)
@@ -109,9 +183,11 @@ class TranscribeWorker(QThread):
 
 class TtsWorker(QThread):
     """
-    Synthesises text via gTTS, saves to a temp mp3, then plays it with
-    macOS afplay (a separate process — no pygame conflict with the adhan mixer).
-    Emits finished() on completion or error(message) on failure.
+    Speaks text with gui.tts.speak(): the first sentence plays as soon as it
+    is synthesised while the rest are prepared, and clips come from the
+    on-disk cache when the same phrase was spoken before.  Playback runs in
+    a child process, so there is no conflict with the adhan pygame mixer.
+    Emits finished() on completion (or after stop()) or error(message).
     """
     finished = pyqtSignal()
     error    = pyqtSignal(str)
@@ -120,25 +196,15 @@ class TtsWorker(QThread):
         super().__init__()
         self._text = text
         self._lang = lang_code(language)
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
 
     def run(self) -> None:
-        import subprocess
-        tmp: Path | None = None
         try:
-            from gtts import gTTS
-            tts = gTTS(text=self._text, lang=self._lang, slow=False)
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-                tmp = Path(f.name)
-            tts.save(str(tmp))
-            # afplay is a macOS built-in — runs in a child process, no pygame contention
-            subprocess.run(["afplay", str(tmp)], check=True)
+            speak(self._text, self._lang, stop=self._stop)
             self.finished.emit()
         except Exception as e:
             logger.warning("TTS error: %s", e)
             self.error.emit(str(e))
-        finally:
-            if tmp and tmp.exists():
-                try:
-                    tmp.unlink()
-                except OSError:
-                    pass
@@ -0,0 +1,186 @@
+"""
+Process-wide registry of faster-whisper models.
+
+Loading large-v3 takes seconds to minutes, so each model size is loaded once
+and shared by every TranscribeWorker:
+
+    registry = get_registry()
+    registry.preload("large-v3")          # background thread at app start
+    with registry.use("tiny") as model:   # waits for the load; one user at a time
+        segments, _ = model.transcribe(audio, language="en")
+        text = " ".join(s.text for s in segments)   # decoding runs here
+
+At most `max_models` sizes stay resident (least recently used goes first),
+and idle models are unloaded when available memory drops below
+`min_available_mb`.  Models in use are never unloaded.
+
+No Qt imports: the registry is plain threading, so it is safe to share
+between QThreads.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large-v3")
+DEFAULT_MODEL_SIZE = "large-v3"
+
+_MAX_MODELS = 1              # large-v3 is ~1.5 GB; keep one size resident
+_MIN_AVAILABLE_MB = 512      # below this, idle models are unloaded
+_MEMINFO = "/proc/meminfo"
+
+
+def _load_whisper(size: str):
+    from faster_whisper import WhisperModel
+    return WhisperModel(size, device="cpu", compute_type="int8")
+
+
+def memory_available_mb() -> Optional[float]:
+    """MemAvailable from /proc/meminfo, or None where that is not available."""
+    try:
+        with open(_MEMINFO) as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class _Entry:
+    def __init__(self, model) -> None:
+        self.model = model
+        self.lock = threading.Lock()      # held while the model is transcribing
+        self.last_used = time.monotonic()
+
+
+class WhisperRegistry:
+    """Loads each model size once; serialises use of each loaded model."""
+
+    def __init__(
+        self,
+        loader: Callable[[str], object] = _load_whisper,
+        max_models: int = _MAX_MODELS,
+        min_available_mb: float = _MIN_AVAILABLE_MB,
+    ) -> None:
+        self._loader = loader
+        self.max_models = max_models
+        self.min_available_mb = min_available_mb
+        self._models: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()        # guards _models
+        self._load_lock = threading.Lock()   # one load at a time — they are huge
+        self.loads = 0
+        self.unloads = 0
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def preload(self, size: str) -> threading.Thread:
+        """Load `size` in a daemon thread (no-op if already loaded)."""
+        _check_size(size)
+
+        def _run() -> None:
+            try:
+                self._entry(size)
+            except Exception as e:
+                logger.warning("Preloading Whisper %s failed: %s", size, e)
+
+        thread = threading.Thread(target=_run, name=f"whisper-preload-{size}", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def use(self, size: str) -> Iterator[object]:
+        """
+        Exclusive use of the `size` model, loading it first if needed.
+        Raises ValueError for an unknown size; loader errors propagate.
+        """
+        _check_size(size)
+        entry = self._entry(size)
+        with entry.lock:
+            entry.last_used = time.monotonic()
+            yield entry.model
+        self.relieve_memory_pressure()
+
+    def unload(self, size: Optional[str] = None) -> int:
+        """Drop `size` (or every size) if idle; returns how many were unloaded."""
+        with self._lock:
+            names = [size] if size is not None else list(self._models)
+            return self._drop([n for n in names if n in self._models])
+
+    def relieve_memory_pressure(self) -> int:
+        """Unload idle models if available memory is below min_available_mb."""
+        available = memory_available_mb()
+        if available is None or available >= self.min_available_mb:
+            return 0
+        logger.info("Low memory (%.0f MB available) — unloading idle Whisper models", available)
+        return self.unload()
+
+    @property
+    def loaded(self) -> list[str]:
+        with self._lock:
+            return list(self._models)
+
+    @property
+    def stats(self) -> dict:
+        return {"loaded": self.loaded, "loads": self.loads, "unloads": self.unloads}
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _entry(self, size: str) -> _Entry:
+        with self._lock:
+            entry = self._models.get(size)
+            if entry is not None:
+                self._models.move_to_end(size)
+                return entry
+        with self._load_lock:
+            with self._lock:                  # loaded while we waited?
+                entry = self._models.get(size)
+                if entry is not None:
+                    return entry
+                # Make room first so two large models are never resident at once
+                self._drop(list(self._models)[: max(0, len(self._models) - self.max_models + 1)])
+            self.relieve_memory_pressure()
+            start = time.perf_counter()
+            entry = _Entry(self._loader(size))
+            logger.info("Loaded Whisper %s in %.1fs", size, time.perf_counter() - start)
+            with self._lock:
+                self._models[size] = entry
+                self.loads += 1
+            return entry
+
+    def _drop(self, names: list[str]) -> int:
+        """Remove the idle ones of `names` (caller holds _lock)."""
+        dropped = 0
+        for name in names:
+            if not self._models[name].lock.locked():
+                del self._models[name]
+                dropped += 1
+                logger.info("Unloaded Whisper %s", name)
+        self.unloads += dropped
+        return dropped
+
+
+def _check_size(size: str) -> None:
+    if size not in MODEL_SIZES:
+        raise ValueError(
+            f"Unknown Whisper model {size!r} (expected one of {', '.join(MODEL_SIZES)})"
+        )
+
+
+_registry: Optional[WhisperRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> WhisperRegistry:
+    """The process-wide registry, created on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WhisperRegistry()
+        return _registry
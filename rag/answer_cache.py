@@ -0,0 +1,148 @@
+"""
+Semantic Answer Cache
+=====================
+Remembers finished chatbot answers so a near-duplicate question is answered
+instantly instead of spending seconds generating on the CPU.
+
+An answer is reused only when all of these match:
+  * the question embedding is within SIMILARITY_THRESHOLD (cosine) of a
+    cached question's,
+  * the reply language,
+  * the route — and for RAG, the exact retrieved chunks and the index
+    version, so an answer is never replayed against different context,
+  * for TOOL answers, today's date and the question's date, place and
+    prayer words (rag.router.tool_slots) — "Fajr in Toronto today" and
+    "... tomorrow" are near-identical embeddings with different answers.
+    Prayer times are date-dependent, so those entries also expire after
+    TOOL_TTL, and never outlive local midnight (the prayer tool resolves
+    "today" on the server's clock, as does the key).
+
+Only stand-alone questions are cached; follow-ups depend on the conversation.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from rag.router import tool_slots
+
+SIMILARITY_THRESHOLD = 0.95
+MAX_ENTRIES = 512
+RAG_TTL = 24 * 3600         # seconds — RAG answers only change with the index
+TOOL_TTL = 5 * 60           # seconds — prayer-time answers are date-dependent
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    tokens: tuple[str, ...]
+    seconds: float          # how long the original answer took to produce
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    answer: CachedAnswer
+    expires: float
+
+
+class AnswerCache:
+    """
+    LRU of answers grouped by exact key (language, route, chunks, index
+    version, date and question slots); within a group, lookup() picks the most similar question.
+    """
+
+    def __init__(self, index_version: str = "", threshold: float = SIMILARITY_THRESHOLD,
+                 max_entries: int = MAX_ENTRIES, rag_ttl: float = RAG_TTL,
+                 tool_ttl: float = TOOL_TTL) -> None:
+        self.index_version = index_version
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.rag_ttl = rag_ttl
+        self.tool_ttl = tool_ttl
+        self._groups: OrderedDict[tuple, list[_Entry]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def key(self, language: str, route: str, chunks: list[dict] = (), question: str = "") -> tuple:
+        """Exact-match part of the cache key for an answer."""
+        if route == "TOOL":
+            return (language, route, date.today().isoformat(), tool_slots(question))
+        chunk_ids = tuple((c["source"], c["chunk_id"]) for c in chunks)
+        return (language, route, chunk_ids, self.index_version)
+
+    def lookup(self, q_vec: np.ndarray, key: tuple) -> CachedAnswer | None:
+        now = time.time()
+        with self._lock:
+            entries = self._groups.get(key)
+            best = None
+            if entries:
+                self._drop_expired(key, entries, now)
+                if entries:
+                    scores = np.stack([e.vector for e in entries]) @ q_vec
+                    i = int(np.argmax(scores))
+                    if scores[i] >= self.threshold:
+                        best = entries[i].answer
+                        self._groups.move_to_end(key)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += best.seconds
+            return best
+
+    def store(self, q_vec: np.ndarray, key: tuple, tokens: list[str], seconds: float) -> None:
+        if not tokens:
+            return
+        now = time.time()
+        if key[1] == "TOOL":
+            expires = min(now + self.tool_ttl, _next_local_midnight(now))
+        else:
+            expires = now + self.rag_ttl
+        entry = _Entry(np.asarray(q_vec, dtype=np.float32), CachedAnswer(tuple(tokens), seconds),
+                       expires)
+        with self._lock:
+            self._groups.setdefault(key, []).append(entry)
+            self._groups.move_to_end(key)
+            self._size += 1
+            while self._size > self.max_entries:
+                _, evicted = self._groups.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups.clear()
+            self._size = 0
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 2),
+                "entries": self._size,
+            }
+
+    def _drop_expired(self, key: tuple, entries: list[_Entry], now: float) -> None:
+        live = [e for e in entries if e.expires > now]
+        self._size -= len(entries) - len(live)
+        entries[:] = live
+        if not live:
+            del self._groups[key]
+
+
+def _next_local_midnight(now: float) -> float:
+    """Epoch seconds of the server's next local midnight after `now`."""
+    tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).timestamp()
@@ -8,7 +8,8 @@ Answers two kinds of questions:
 
   2. Live calculation questions ("When is Fajr in Toronto tomorrow?")
      → tool use: Ollama calls get_prayer_times(city, date) → PrayerService
-       calculates using adhanpy → Ollama formulates the answer
+       calculates using adhanpy → the formatted times are shown as-is, or
+       Ollama streams a rephrased answer (other languages, RAG_TOOL_ANSWER=llm)
 
 No API keys required — all inference runs locally via Ollama.
 
@@ -19,7 +20,14 @@ Usage:
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
+import os
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 _root = Path(__file__).parent.parent
@@ -27,8 +35,12 @@ sys.path.insert(0, str(_root))
 
 import ollama
 from rag.query import (  # noqa: E402
-    INDEX_PATH, OLLAMA_MODEL, answer, answer_stream, load_clients, load_index,
+    INDEX_PATH, OLLAMA_MODEL, answer, answer_stream, index_exists, load_clients, load_index,
+    load_retriever, retrieve,
 )
+from rag.answer_cache import AnswerCache  # noqa: E402
+from rag.router import RouteDecision, Router  # noqa: E402
+from utils.metrics import timed, timer  # noqa: E402
 
 # ── Prayer-time tool definition (OpenAI / Ollama format) ─────────────────────
 
@@ -61,6 +73,7 @@ PRAYER_TOOL = {
 }
 
 
+@timed("prayer_tool")
 def _run_prayer_tool(city: str | None, date_str: str) -> str:
     from services.prayer_service import PrayerService
     svc = PrayerService()
@@ -74,6 +87,10 @@ _CLASSIFIER_SYSTEM = (
     "Reply RAG for everything else (concepts, methods, app usage, how-to)."
 )
 
+# "template": show the tool's formatted times directly when no translation is
+# needed, skipping the second LLM call.  "llm": always let the model present them.
+TOOL_ANSWER_MODE = os.environ.get("RAG_TOOL_ANSWER", "template")
+
 _TOOL_SYSTEM = (
     "You are a prayer times assistant. "
     "The user wants to know prayer times for a specific location or date. "
@@ -83,54 +100,60 @@ _TOOL_SYSTEM = (
 )
 
 
+@timed("classify")
 def _classify(question: str, model: str, history: list[dict] | None = None) -> str:
     """Returns 'TOOL' or 'RAG'. Includes recent history so follow-ups are routed correctly."""
-    messages = [{"role": "system", "content": _CLASSIFIER_SYSTEM}]
-    if history:
-        messages.extend(history[-4:])  # last 2 turns for context
-    messages.append({"role": "user", "content": question})
-    resp = ollama.chat(model=model, messages=messages)
-    return "TOOL" if "TOOL" in resp["message"]["content"].upper() else "RAG"
+    resp = ollama.chat(model=model, messages=_classifier_messages(question, history))
+    return _parse_route(resp["message"]["content"])
 
 
-def _answer_via_tool(question: str, model: str, history: list[dict] | None = None) -> str:
-    """Call the prayer tool and return a formatted answer."""
-    messages = [{"role": "system", "content": _TOOL_SYSTEM}]
-    if history:
-        messages.extend(history[-4:])  # include prior turns so city can be inferred
-    messages.append({"role": "user", "content": question})
-    resp = ollama.chat(
-        model=model,
-        messages=messages,
-        tools=[PRAYER_TOOL],
-    )
+# Local TOOL/RAG router; _classify() is only its fallback (see rag/router.py)
+router = Router()
+
+# Retrieval started while the LLM classifier is still deciding the route
+_speculation_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-speculate")
+
+
+def _answer_via_tool(question: str, model: str, history: list[dict] | None = None,
+                     template: bool = False):
+    """
+    Call the prayer tool and yield the answer as it streams.  With
+    template=True the tool's own formatted text is the answer and the second
+    (presentation) LLM call is skipped.
+    """
+    with timer("tool_call"):
+        resp = ollama.chat(
+            model=model,
+            messages=_tool_messages(question, history),
+            tools=[PRAYER_TOOL],
+        )
 
     tool_calls = resp["message"].get("tool_calls") or []
     if not tool_calls:
         # Model didn't call the tool — fall back to plain answer
-        return resp["message"]["content"]
+        yield resp["message"]["content"]
+        return
 
     tool_call = tool_calls[0]
-    args = tool_call["function"]["arguments"]
-    if isinstance(args, str):
-        import json
-        args = json.loads(args)
-
-    city = args.get("city")
-    date_str = args.get("date", "today")
-    tool_result = _run_prayer_tool(city, date_str)
+    tool_result = _run_prayer_tool(*_tool_call_args(tool_call))
+    if template:
+        yield tool_result
+        return
 
     # Ask the model to present the result naturally
-    final = ollama.chat(
+    yield from _stream_text(ollama.chat(
         model=model,
-        messages=[
-            {"role": "system", "content": _TOOL_SYSTEM},
-            {"role": "user", "content": question},
-            {"role": "assistant", "content": "", "tool_calls": [tool_call]},
-            {"role": "tool", "content": tool_result},
-        ],
-    )
-    return final["message"]["content"]
+        messages=_presentation_messages(question, tool_call, tool_result),
+        stream=True,
+    ))
+
+
+def _stream_text(stream):
+    """Yield the non-empty content pieces of an ollama chat stream."""
+    for chunk in stream:
+        text = chunk["message"]["content"]
+        if text:
+            yield text
 
 
 _LANGUAGE_INSTRUCTIONS: dict[str, str] = {
@@ -152,22 +175,43 @@ def answer_stream_with_tools(
     history: list[dict] | None = None,
 ):
     """
-    Main entry point for the web API and GUI.
+    Main entry point for the GUI and CLI (the web API uses the async twin below).
     Routes TOOL questions to prayer service, RAG questions to Ollama + retrieval.
     Returns (token_generator, chunks).
     """
     if history is None:
         history = []
 
-    lang_instr = _LANGUAGE_INSTRUCTIONS.get(language, "")
-    q = f"{lang_instr}\n\n{question}".strip() if lang_instr else question
+    q = _with_language(question, language)
+
+    # If routing needs the LLM, retrieve speculatively while it thinks so the
+    # RAG context is ready the moment the route comes back.
+    speculative: Future | None = None
+
+    def _classify_and_speculate() -> str:
+        nonlocal speculative
+        speculative = _speculation_pool.submit(retrieve, q, records, matrix, embedder)
+        return _classify(q, model, history=history)
+
+    decision = router.route(question, _classify_and_speculate, embedder=embedder, history=history)
+    if decision.route == "TOOL":
+        if speculative is not None:
+            speculative.cancel()   # no-op if already running; the result is just dropped
+        template = _use_template(language)
+        return _answer_via_tool(q, model, history=history, template=template), []
 
-    route = _classify(q, model, history=history)
-    if route == "TOOL":
-        text = _answer_via_tool(q, model, history=history)
-        return iter([text]), []
+    chunks = _speculation_result(speculative)
+    return _answer_stream_with_history(q, records, matrix, embedder, model, history, chunks)
 
-    return _answer_stream_with_history(q, records, matrix, embedder, model, history)
+
+def _speculation_result(future: Future | None) -> list[dict] | None:
+    """Chunks from a speculative retrieval, or None if it never ran (retrieve inline)."""
+    if future is None or future.cancel():
+        return None
+    try:
+        return future.result()
+    except Exception:
+        return None
 
 
 def _answer_stream_with_history(
@@ -177,36 +221,230 @@ def _answer_stream_with_history(
     embedder,
     model: str,
     history: list[dict],
+    chunks: list[dict] | None = None,
 ):
-    """RAG pipeline that includes conversation history in the Ollama prompt."""
-    from rag.query import SYSTEM_PROMPT, build_context, retrieve
+    """
+    RAG pipeline that includes conversation history in the Ollama prompt.
+    Pass `chunks` if retrieval has already been done.
+    """
+    if chunks is None:
+        chunks = retrieve(question, records, matrix, embedder)
+    messages = _rag_messages(question, chunks, history)
 
-    chunks = retrieve(question, records, matrix, embedder)
-    context = build_context(chunks)
+    def _tokens():
+        yield from _stream_text(ollama.chat(model=model, messages=messages, stream=True))
+
+    return _tokens(), chunks
+
+
+# ── Async pipeline (web API) ──────────────────────────────────────────────────
+
+async def answer_stream_with_tools_async(
+    question: str,
+    records: list[dict],
+    matrix,
+    embedder,
+    client: ollama.AsyncClient,
+    model: str,
+    language: str = "English",
+    history: list[dict] | None = None,
+    answer_cache: AnswerCache | None = None,
+):
+    """
+    Async twin of answer_stream_with_tools for the web API.
+    Ollama calls go through the shared `client` (one keep-alive connection
+    pool per process); embedding, search and the prayer tool run in the
+    default executor so the event loop is never blocked.  With an
+    `answer_cache`, a near-duplicate stand-alone question replays the
+    earlier answer instead of generating (see rag/answer_cache.py).
+    Returns (async token generator, chunks).
+    """
+    if history is None:
+        history = []
+    q = _with_language(question, language)
+
+    start = time.perf_counter()
+    decision = await _in_executor(router.local_route, question, embedder, history)
+    speculative = None
+    if decision is None:
+        speculative = _in_executor(retrieve, q, records, matrix, embedder)
+        decision = RouteDecision(await _classify_async(client, q, model, history), "llm", 1.0)
+    router.record(decision, time.perf_counter() - start)
+
+    if decision.route == "TOOL":
+        if speculative is not None:
+            speculative.cancel()
+        template = _use_template(language)
+        stream = _answer_via_tool_async(client, q, model, history, template=template)
+        return await _through_answer_cache(
+            answer_cache, stream, question, language, "TOOL", [], embedder, history, start,
+        ), []
+
+    if speculative is None:
+        speculative = _in_executor(retrieve, q, records, matrix, embedder)
+    chunks = await speculative
+    messages = _rag_messages(q, chunks, history)
+
+    async def _tokens():
+        stream = await client.chat(model=model, messages=messages, stream=True)
+        async for text in _astream_text(stream):
+            yield text
+
+    return await _through_answer_cache(
+        answer_cache, _tokens(), question, language, "RAG", chunks, embedder, history, start,
+    ), chunks
+
+
+async def _through_answer_cache(cache: AnswerCache | None, stream, question: str, language: str,
+                                route: str, chunks: list[dict], embedder, history: list[dict],
+                                start: float):
+    """
+    A replay of the cached answer on a hit; otherwise `stream`, recording its
+    tokens so the finished answer is cached.  (`stream` is lazy, so on a hit
+    no LLM call is ever made.)
+    """
+    if cache is None or history:
+        return stream
+    q_vec = await _in_executor(partial(embedder.encode, question, normalize_embeddings=True))
+    key = cache.key(language, route, chunks, question)
+    hit = cache.lookup(q_vec, key)
+    if hit is not None:
+        return _replay(hit.tokens)
+    return _record_answer(stream, cache, q_vec, key, start)
+
+
+async def _replay(tokens):
+    for text in tokens:
+        yield text
+
+
+async def _record_answer(stream, cache: AnswerCache, q_vec, key: tuple, start: float):
+    tokens = []
+    async for text in stream:
+        tokens.append(text)
+        yield text
+    # Only reached if the stream ran to completion (not on error or disconnect)
+    cache.store(q_vec, key, tokens, time.perf_counter() - start)
+
+
+@timed("classify")
+async def _classify_async(client: ollama.AsyncClient, question: str, model: str,
+                          history: list[dict] | None = None) -> str:
+    resp = await client.chat(model=model, messages=_classifier_messages(question, history))
+    return _parse_route(resp["message"]["content"])
+
+
+async def _answer_via_tool_async(client: ollama.AsyncClient, question: str, model: str,
+                                 history: list[dict] | None = None, template: bool = False):
+    """Async version of _answer_via_tool."""
+    with timer("tool_call"):
+        resp = await client.chat(
+            model=model, messages=_tool_messages(question, history), tools=[PRAYER_TOOL],
+        )
+
+    tool_calls = resp["message"].get("tool_calls") or []
+    if not tool_calls:
+        yield resp["message"]["content"]
+        return
+
+    tool_call = tool_calls[0]
+    tool_result = await _in_executor(_run_prayer_tool, *_tool_call_args(tool_call))
+    if template:
+        yield tool_result
+        return
+
+    stream = await client.chat(
+        model=model, messages=_presentation_messages(question, tool_call, tool_result), stream=True,
+    )
+    async for text in _astream_text(stream):
+        yield text
+
+
+async def _astream_text(stream):
+    async for chunk in stream:
+        text = chunk["message"]["content"]
+        if text:
+            yield text
+
+
+def _in_executor(fn, *args) -> asyncio.Future:
+    """
+    Run `fn` in the default executor inside a copy of the caller's context,
+    so its metrics spans land on the current request's trace.
+    """
+    ctx = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(None, partial(ctx.run, fn, *args))
+
+
+# ── Prompt helpers (shared by the sync and async pipelines) ──────────────────
+
+def _with_language(question: str, language: str) -> str:
+    lang_instr = _LANGUAGE_INSTRUCTIONS.get(language, "")
+    return f"{lang_instr}\n\n{question}".strip() if lang_instr else question
+
+
+def _use_template(language: str) -> bool:
+    """Show the tool output verbatim unless it needs translating (see TOOL_ANSWER_MODE)."""
+    return TOOL_ANSWER_MODE == "template" and not _LANGUAGE_INSTRUCTIONS.get(language, "")
+
+
+def _classifier_messages(question: str, history: list[dict] | None) -> list[dict]:
+    messages = [{"role": "system", "content": _CLASSIFIER_SYSTEM}]
+    if history:
+        messages.extend(history[-4:])  # last 2 turns for context
+    messages.append({"role": "user", "content": question})
+    return messages
+
+
+def _parse_route(content: str) -> str:
+    return "TOOL" if "TOOL" in content.upper() else "RAG"
+
+
+def _tool_messages(question: str, history: list[dict] | None) -> list[dict]:
+    messages = [{"role": "system", "content": _TOOL_SYSTEM}]
+    if history:
+        messages.extend(history[-4:])  # include prior turns so city can be inferred
+    messages.append({"role": "user", "content": question})
+    return messages
+
+
+def _tool_call_args(tool_call) -> tuple[str | None, str]:
+    """(city, date_str) from a get_prayer_times tool call."""
+    args = tool_call["function"]["arguments"]
+    if isinstance(args, str):
+        args = json.loads(args)
+    return args.get("city"), args.get("date", "today")
+
+
+def _presentation_messages(question: str, tool_call, tool_result: str) -> list[dict]:
+    return [
+        {"role": "system", "content": _TOOL_SYSTEM},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": "", "tool_calls": [tool_call]},
+        {"role": "tool", "content": tool_result},
+    ]
+
+
+def _rag_messages(question: str, chunks: list[dict], history: list[dict]) -> list[dict]:
+    """System + prior turns + current question (with fresh context)."""
+    from rag.query import SYSTEM_PROMPT, build_context
 
-    # System + prior turns + current question (with fresh context)
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
     messages.extend(history)
+    context = build_context(chunks)
     messages.append({"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"})
-
-    def _tokens():
-        stream = ollama.chat(model=model, messages=messages, stream=True)
-        for chunk in stream:
-            text = chunk["message"]["content"]
-            if text:
-                yield text
-
-    return _tokens(), chunks
+    return messages
 
 
 # ── Interactive loop ──────────────────────────────────────────────────────────
 
 def main():
-    if not INDEX_PATH.exists():
+    if not index_exists(INDEX_PATH):
         sys.exit(f"Index not found at {INDEX_PATH}.\nRun `python rag/ingest.py` first.")
 
     print("Loading index...")
     records, matrix = load_index(INDEX_PATH)
+    matrix = load_retriever(INDEX_PATH, matrix)
     print(f"Index loaded: {len(records)} chunks\n")
 
     embedder, model = load_clients()
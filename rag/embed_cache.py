@@ -0,0 +1,158 @@
+"""
+Query Embedding Cache
+=====================
+Wraps the sentence-transformers model so repeated questions skip the encoder.
+
+Web users ask the same handful of questions over and over ("when is fajr",
+"what is the isha angle"), and each one used to cost a full CPU forward pass
+before retrieval could start.  CachedEmbedder keys single-string encodes on
+the normalised question text and keeps the vectors in an LRU dict.  Batch
+encodes (lists — used by ingest) pass straight through.
+
+load_clients() in rag/query.py returns a CachedEmbedder, so the web API, the
+GUI worker and the CLI chat all get it without changes of their own.
+
+PERSISTENCE:
+  Set RAG_QUERY_CACHE_PATH to a .npz file and the cache is loaded from it at
+  startup and written back at exit, so a restart keeps the warm entries.
+  Entries are tagged with the model name; a different model starts cold.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+QUERY_CACHE_SIZE = 1024     # distinct questions kept in memory
+
+_TRAILING_PUNCT = re.compile(r"[\s?!.,;:؟۔]+$")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Cache key for a question: Unicode-normalised, case-folded, single-spaced,
+    trailing punctuation dropped.  "When is Fajr?" and "when is  fajr" match.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _TRAILING_PUNCT.sub("", " ".join(text.split()))
+
+
+class CachedEmbedder:
+    """
+    Drop-in replacement for a SentenceTransformer in the query path.
+
+    encode(str) is served from the cache when possible; anything else is
+    forwarded to the wrapped model, as are unknown attributes.  A miss
+    encodes the caller's text exactly as given, so the first encode of a
+    question returns what the bare model would; later spellings that
+    normalise to the same key ("when is fajr") reuse that vector.
+    """
+
+    def __init__(self, model, model_name: str = "", maxsize: int = QUERY_CACHE_SIZE,
+                 path: Path | None = None) -> None:
+        self.model = model
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.path = path
+        self._cache: OrderedDict[tuple[str, bool], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._encode_seconds = 0.0
+        if path is not None:
+            self.load(path)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        if not isinstance(sentences, str) or kwargs:
+            return self.model.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        key = (normalize_query(sentences), normalize_embeddings)
+        with self._lock:
+            vec = self._cache.get(key)
+            if vec is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vec
+            self.misses += 1
+
+        start = time.perf_counter()
+        vec = np.asarray(self.model.encode(sentences, normalize_embeddings=normalize_embeddings))
+        vec.setflags(write=False)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._encode_seconds += elapsed
+            self._cache[key] = vec
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return vec
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters plus the encoder time the hits are estimated to have saved."""
+        with self._lock:
+            avg = self._encode_seconds / self.misses if self.misses else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "encode_seconds": round(self._encode_seconds, 3),
+                "saved_seconds": round(self.hits * avg, 3),
+            }
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: Path | None = None) -> None:
+        path = path or self.path
+        if path is None:
+            return
+        with self._lock:
+            items = list(self._cache.items())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                model=np.array(self.model_name),
+                texts=np.array([k[0] for k, _ in items], dtype=str),
+                normalized=np.array([k[1] for k, _ in items], dtype=bool),
+                vectors=np.stack([v for _, v in items]) if items else np.zeros((0, 0)),
+            )
+        tmp.replace(path)
+
+    def load(self, path: Path) -> int:
+        """Warm the cache from `path`; returns the number of entries loaded."""
+        try:
+            with np.load(path) as data:
+                if str(data["model"]) != self.model_name:
+                    return 0
+                entries = list(zip(data["texts"].tolist(), data["normalized"].tolist(), data["vectors"]))
+        except (OSError, KeyError, ValueError):
+            return 0
+        with self._lock:
+            for text, normalized, vec in entries[-self.maxsize:]:
+                vec.setflags(write=False)
+                self._cache[(text, normalized)] = vec
+        return len(entries)
+
+
+def default_cache_path() -> Path | None:
+    """The persistence path from RAG_QUERY_CACHE_PATH, or None to keep the cache in memory."""
+    path = os.environ.get("RAG_QUERY_CACHE_PATH")
+    return Path(path) if path else None
@@ -36,7 +36,7 @@ import anthropic
 
 _root = Path(__file__).parent.parent
 sys.path.insert(0, str(_root))
-from rag.query import INDEX_PATH, answer, load_clients, load_index
+from rag.query import INDEX_PATH, answer, index_exists, load_clients, load_index
 
 CLAUDE_JUDGE_MODEL = "claude-haiku-4-5"
 
@@ -239,7 +239,7 @@ def main():
                         help="Print each candidate answer alongside scores")
     args = parser.parse_args()
 
-    if not INDEX_PATH.exists():
+    if not index_exists(INDEX_PATH):
         sys.exit(f"Index not found at {INDEX_PATH}.\nRun `python rag/ingest.py` first.")
 
     print("Loading index...")
@@ -2,8 +2,9 @@
 RAG Ingestion Pipeline
 ======================
 Reads markdown docs, splits them into overlapping chunks, embeds each chunk
-with sentence-transformers (all-MiniLM-L6-v2), and saves the index to a JSON
-file.  No API keys required — model runs entirely locally.
+with sentence-transformers (all-MiniLM-L6-v2), and saves the index as a
+memory-mappable embedding matrix plus metadata (see rag/store.py).  No API
+keys required — model runs entirely locally.
 
 WHY CHUNKS?
   A language model has a limited context window.  You can't paste 20 pages of
@@ -14,18 +15,36 @@ WHY OVERLAP?
   A sentence at the boundary of a chunk loses context.  Overlapping by ~50
   tokens means important sentences always have their surrounding context, even
   if they land near a chunk edge.
+
+INCREMENTAL RE-INDEXING:
+  Every chunk is stored with a hash of its text.  On the next run, chunks
+  whose hash is already in the index reuse the stored vector; only new or
+  edited chunks go through the model (which isn't even loaded if nothing
+  changed).  Chunks from deleted docs simply aren't carried over.
+  Pass --full to re-embed everything.
+
+APPROXIMATE SEARCH:
+  --ivf also clusters the embeddings into an inverted-file index (see
+  rag/retriever.py) so queries only score the nearest clusters.  Corpora of
+  IVF_MIN_CHUNKS chunks or more get one automatically; --nlist sets the
+  cluster count.  Any IVF index left from a previous build is discarded when
+  it is not rebuilt, since it would no longer match the embeddings.
 """
 
-import json
+import hashlib
 import re
+import sys
 from pathlib import Path
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from rag.retriever import IVF_FILE, IVF_MIN_CHUNKS, IVFRetriever  # noqa: E402
+from rag.store import INDEX_PATH, index_exists, load_index, read_meta, write_index  # noqa: E402
+
 # ── Config ────────────────────────────────────────────────────────────────────
 DOCS_DIR   = Path(__file__).parent.parent / "docs"
-INDEX_PATH = Path(__file__).parent / "index.json"
 EMBED_MODEL = "all-MiniLM-L6-v2"   # 384-dim, ~90 MB, fast on CPU
 CHUNK_SIZE  = 400                   # target characters per chunk
 OVERLAP     = 80                    # characters of overlap between chunks
@@ -62,44 +81,123 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = OVERLAP)
     return chunks
 
 
-def build_index(docs: list[dict], model: SentenceTransformer) -> list[dict]:
-    records = []
-    all_chunks = []
-    chunk_meta = []
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
 
+
+def chunk_docs(docs: list[dict]) -> list[dict]:
+    """Split every doc into chunk records: source, chunk_id, text, hash."""
+    chunk_meta = []
     for doc in docs:
         chunks = chunk_text(doc["text"])
         print(f"  {doc['source']}: {len(chunks)} chunks")
         for i, chunk in enumerate(chunks):
-            all_chunks.append(chunk)
-            chunk_meta.append({"source": doc["source"], "chunk_id": i, "text": chunk})
-
-    print(f"\nEmbedding {len(all_chunks)} chunks with {EMBED_MODEL}...")
-    embeddings = model.encode(all_chunks, normalize_embeddings=True, show_progress_bar=True)
-
-    for meta, vec in zip(chunk_meta, embeddings):
-        records.append({**meta, "embedding": vec.tolist()})
-
-    return records
-
-
-def save_index(records: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(records, f)
-    print(f"Saved {len(records)} records to {path}")
+            chunk_meta.append({
+                "source": doc["source"], "chunk_id": i, "text": chunk, "hash": chunk_hash(chunk),
+            })
+    return chunk_meta
+
+
+def load_cached_embeddings(path: Path = INDEX_PATH) -> dict[str, np.ndarray]:
+    """
+    Map chunk hash → stored embedding from an existing index, or {} if there
+    is none or it was built with a different embedding model.
+    """
+    if not index_exists(path):
+        return {}
+    try:
+        records, matrix = load_index(path)
+        if read_meta(path).get("embed_model") != EMBED_MODEL:
+            print("Existing index uses a different embedding model — re-embedding all chunks")
+            return {}
+    except Exception as e:
+        print(f"Existing index unreadable ({e}) — re-embedding all chunks")
+        return {}
+    return {
+        r["hash"]: np.array(matrix[i], dtype=np.float32)
+        for i, r in enumerate(records) if "hash" in r
+    }
+
+
+def embed_chunks(chunks: list[dict], cached: dict[str, np.ndarray], model_loader) -> np.ndarray:
+    """
+    Return the (N, dim) embedding matrix for `chunks`, reusing `cached`
+    vectors and calling model_loader() for a model only if something is new.
+    """
+    missing = [i for i, c in enumerate(chunks) if c["hash"] not in cached]
+    print(f"\nReusing {len(chunks) - len(missing)} cached embedding(s), "
+          f"embedding {len(missing)} new chunk(s)")
+
+    fresh: dict[int, np.ndarray] = {}
+    if missing:
+        model = model_loader()
+        print(f"Embedding {len(missing)} chunks with {EMBED_MODEL}...")
+        vectors = model.encode(
+            [chunks[i]["text"] for i in missing],
+            normalize_embeddings=True, show_progress_bar=True,
+        )
+        fresh = dict(zip(missing, vectors))
+
+    if not chunks:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([
+        fresh[i] if i in fresh else cached[c["hash"]] for i, c in enumerate(chunks)
+    ]).astype(np.float32)
+
+
+def build_index(docs: list[dict], model_loader,
+                cached: dict[str, np.ndarray] | None = None) -> tuple[list[dict], np.ndarray]:
+    """Chunk `docs` and embed them, returning (chunk records, embedding matrix)."""
+    chunks = chunk_docs(docs)
+    return chunks, embed_chunks(chunks, cached or {}, model_loader)
+
+
+def write_ivf(matrix: np.ndarray, path: Path = INDEX_PATH, nlist: int | None = None) -> IVFRetriever:
+    """Cluster the freshly written embeddings and persist the IVF index beside them."""
+    print(f"Building IVF index over {len(matrix)} chunks...")
+    ivf = IVFRetriever.build(matrix, nlist=nlist)
+    ivf.save(path)
+    print(f"Saved IVF index with {len(ivf.centroids)} lists to {path / IVF_FILE}")
+    return ivf
 
 
 def main():
-    import sys
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the RAG index from docs/")
+    parser.add_argument("--float16", action="store_true",
+                        help="Store embeddings as float16 (half the size, ~no recall loss)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the existing index and re-embed every chunk")
+    parser.add_argument("--ivf", action="store_true",
+                        help=f"Build an IVF approximate-search index (automatic at {IVF_MIN_CHUNKS}+ chunks)")
+    parser.add_argument("--nlist", type=int, default=None,
+                        help="Number of IVF clusters (default 4·sqrt(chunks))")
+    args = parser.parse_args()
+
     docs = load_docs(DOCS_DIR)
     if not docs:
         sys.exit(f"No .md files found in {DOCS_DIR}")
 
-    print(f"Loading embedding model {EMBED_MODEL}...")
-    model = SentenceTransformer(EMBED_MODEL)
-    records = build_index(docs, model)
-    save_index(records, INDEX_PATH)
+    def model_loader() -> SentenceTransformer:
+        print(f"Loading embedding model {EMBED_MODEL}...")
+        return SentenceTransformer(EMBED_MODEL)
+
+    cached = {} if args.full else load_cached_embeddings(INDEX_PATH)
+    chunks, matrix = build_index(docs, model_loader, cached)
+    removed = len(set(cached) - {c["hash"] for c in chunks})
+    if removed:
+        print(f"Dropped {removed} stale chunk(s)")
+
+    meta = write_index(
+        chunks, matrix, INDEX_PATH,
+        dtype="float16" if args.float16 else "float32", embed_model=EMBED_MODEL,
+    )
+    print(f"Saved {len(chunks)} records to {INDEX_PATH} ({meta['dtype']})")
+
+    if chunks and (args.ivf or len(chunks) >= IVF_MIN_CHUNKS):
+        write_ivf(matrix, INDEX_PATH, nlist=args.nlist)
+    else:
+        (INDEX_PATH / IVF_FILE).unlink(missing_ok=True)
     print("Done.")
 
 
@@ -3,7 +3,8 @@ RAG Query Pipeline
 ==================
 Given a user question:
   1. Embed the question with the SAME model used at index time.
-  2. Compute cosine similarity between the question vector and every stored chunk.
+  2. Score stored chunks by cosine similarity (every chunk, or only nearby
+     IVF clusters — see rag/retriever.py).
   3. Return the top-k most similar chunks.
   4. Build a prompt: system instructions + retrieved context + question.
   5. Call Ollama (local LLM) and return the answer.
@@ -11,14 +12,20 @@ Given a user question:
 No API keys required — all inference runs locally via Ollama.
 """
 
-import json
+import atexit
+import sys
 from pathlib import Path
 
 import numpy as np
 import ollama
 from sentence_transformers import SentenceTransformer
 
-INDEX_PATH  = Path(__file__).parent / "index.json"
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from rag.embed_cache import CachedEmbedder, default_cache_path  # noqa: E402
+from rag.retriever import Retriever, as_retriever, load_retriever  # noqa: E402,F401
+from rag.store import INDEX_PATH, index_exists, load_index  # noqa: E402,F401
+from utils.metrics import timed, timer  # noqa: E402
+
 EMBED_MODEL = "all-MiniLM-L6-v2"
 OLLAMA_MODEL = "llama3.2:3b"
 TOP_K = 4
@@ -29,23 +36,19 @@ If the context doesn't contain enough information to answer, say so clearly.
 Be concise and accurate. Do not invent details not present in the context."""
 
 
-def load_index(path: Path) -> tuple[list[dict], np.ndarray]:
-    """Return (records, matrix) where matrix[i] is the normalised embedding of records[i]."""
-    with open(path) as f:
-        records = json.load(f)
-    matrix = np.array([r["embedding"] for r in records], dtype=np.float32)
-    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
-    matrix = matrix / np.where(norms == 0, 1, norms)
-    return records, matrix
-
-
-def retrieve(question: str, records: list[dict], matrix: np.ndarray,
+@timed("retrieve")
+def retrieve(question: str, records: list[dict], matrix: "np.ndarray | Retriever",
              embedder: SentenceTransformer, top_k: int = TOP_K) -> list[dict]:
-    """Embed the question and return the top-k most similar records."""
-    q_vec = embedder.encode(question, normalize_embeddings=True)
-    scores = matrix @ q_vec
-    top_indices = np.argsort(scores)[::-1][:top_k]
-    return [{**records[i], "score": float(scores[i])} for i in top_indices]
+    """
+    Embed the question and return the top-k most similar records.
+    `matrix` is the embedding matrix (searched exhaustively) or any retriever
+    from rag.retriever, e.g. the one load_retriever() picks for the index.
+    """
+    with timer("embed"):
+        q_vec = embedder.encode(question, normalize_embeddings=True)
+    with timer("search"):
+        indices, scores = as_retriever(matrix).search(q_vec, top_k)
+    return [{**records[i], "score": float(s)} for i, s in zip(indices, scores)]
 
 
 def build_context(chunks: list[dict]) -> str:
@@ -92,8 +95,14 @@ def answer_stream(question: str, records: list[dict], matrix: np.ndarray,
     return _tokens(), chunks
 
 
-def load_clients() -> tuple[SentenceTransformer, str]:
-    """Load the embedding model and return (embedder, ollama_model_name)."""
+def load_clients() -> tuple[CachedEmbedder, str]:
+    """
+    Load the embedding model and return (embedder, ollama_model_name).
+    The embedder caches question vectors (see rag/embed_cache.py).
+    """
     print(f"Loading embedding model {EMBED_MODEL}...")
-    embedder = SentenceTransformer(EMBED_MODEL)
+    cache_path = default_cache_path()
+    embedder = CachedEmbedder(SentenceTransformer(EMBED_MODEL), EMBED_MODEL, path=cache_path)
+    if cache_path is not None:
+        atexit.register(embedder.save)
     return embedder, OLLAMA_MODEL
@@ -0,0 +1,190 @@
+"""
+RAG Retrievers
+==============
+Nearest-neighbour search over the normalised embedding matrix.
+
+Anything with a `search(q_vec, top_k) -> (indices, scores)` method is a
+retriever; rag.query.retrieve() accepts one wherever it accepts the raw
+matrix, so the backend can be swapped without touching the chat pipeline.
+
+  ExactRetriever  brute-force cosine similarity.  One matrix-vector product
+                  plus an O(N) argpartition for the top-k — the default, and
+                  perfectly fine up to tens of thousands of chunks.
+
+  IVFRetriever    inverted-file index: the corpus is clustered with spherical
+                  k-means at ingest time; a query scores only the `nprobe`
+                  clusters whose centroids are closest.  Trades a little
+                  recall for sub-linear search once whole books are ingested.
+                  Built by `python rag/ingest.py --ivf` (or automatically for
+                  large corpora) and stored next to the embeddings.
+
+KNOBS (environment variables, read by load_retriever):
+  RAG_RETRIEVER   "auto" (IVF if built, else exact) | "exact" | "ivf"
+  RAG_IVF_NPROBE  clusters probed per query — higher = better recall, slower
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+from rag.store import INDEX_PATH, read_meta
+
+IVF_FILE = "ivf.npz"
+IVF_MIN_CHUNKS = 5000       # ingest builds an IVF index automatically above this
+DEFAULT_NPROBE = 8
+
+
+class Retriever(Protocol):
+    def search(self, q_vec: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        ...
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the `top_k` highest scores, best first, in O(N + k log k)."""
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k >= len(scores):
+        return np.argsort(scores)[::-1]
+    part = np.argpartition(scores, -top_k)[-top_k:]
+    return part[np.argsort(scores[part])[::-1]]
+
+
+class ExactRetriever:
+    """Brute-force cosine similarity over every row of the matrix."""
+
+    def __init__(self, matrix: np.ndarray) -> None:
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def search(self, q_vec: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = self.matrix @ q_vec
+        idx = top_k_indices(scores, top_k)
+        return idx, scores[idx]
+
+
+class IVFRetriever:
+    """
+    Inverted-file approximate search.
+
+    `centroids` is (nlist, dim); `list_ids` holds row indices grouped by
+    cluster, with cluster c occupying list_ids[offsets[c]:offsets[c + 1]].
+    """
+
+    def __init__(self, matrix: np.ndarray, centroids: np.ndarray,
+                 offsets: np.ndarray, list_ids: np.ndarray,
+                 nprobe: int = DEFAULT_NPROBE) -> None:
+        self.matrix = matrix
+        self.centroids = centroids
+        self.offsets = offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, nlist: int | None = None, iterations: int = 20,
+              seed: int = 0, nprobe: int = DEFAULT_NPROBE) -> "IVFRetriever":
+        """Cluster `matrix` with spherical k-means into `nlist` lists (default 4·√N)."""
+        data = np.asarray(matrix, dtype=np.float32)
+        n = len(data)
+        nlist = max(1, min(n, nlist or int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(n, nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = _assign(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty clusters with random points so every list is used
+            sums[empty] = data[rng.choice(n, int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = sums / norms
+
+        assign = _assign(data, centroids)
+        list_ids = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        return cls(matrix, centroids.astype(np.float32), offsets, list_ids, nprobe)
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        """Persist next to the embeddings, tagged with the index checksum."""
+        np.savez(
+            path / IVF_FILE,
+            centroids=self.centroids, offsets=self.offsets, list_ids=self.list_ids,
+            sha256=np.array(read_meta(path)["sha256"]),
+        )
+
+    @classmethod
+    def load(cls, path: Path, matrix: np.ndarray,
+             nprobe: int = DEFAULT_NPROBE) -> "IVFRetriever | None":
+        """Load the persisted index, or None if missing or built for other embeddings."""
+        ivf_path = path / IVF_FILE
+        if not ivf_path.exists():
+            return None
+        with np.load(ivf_path) as data:
+            if str(data["sha256"]) != read_meta(path)["sha256"]:
+                return None
+            return cls(matrix, data["centroids"], data["offsets"], data["list_ids"], nprobe)
+
+    def search(self, q_vec: np.ndarray, top_k: int,
+               nprobe: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = top_k_indices(self.centroids @ q_vec, nprobe)
+        candidates = np.concatenate([
+            self.list_ids[self.offsets[c]:self.offsets[c + 1]] for c in probes
+        ])
+        if len(candidates) < top_k:
+            return ExactRetriever(self.matrix).search(q_vec, top_k)
+        scores = self.matrix[candidates] @ q_vec
+        best = top_k_indices(scores, top_k)
+        return candidates[best], scores[best]
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each row, in memory-bounded batches."""
+    return np.concatenate([
+        np.argmax(data[i:i + batch] @ centroids.T, axis=1)
+        for i in range(0, len(data), batch)
+    ]) if len(data) else np.zeros(0, dtype=np.int64)
+
+
+def as_retriever(matrix_or_retriever) -> Retriever:
+    """Wrap a bare embedding matrix in an ExactRetriever; pass retrievers through."""
+    if hasattr(matrix_or_retriever, "search"):
+        return matrix_or_retriever
+    return ExactRetriever(matrix_or_retriever)
+
+
+def load_retriever(path: Path, matrix: np.ndarray, kind: str | None = None,
+                   nprobe: int | None = None) -> Retriever:
+    """
+    Pick the retrieval backend for a loaded index (see KNOBS above).
+    Falls back to exact search when no usable IVF index has been built.
+    """
+    kind = kind or os.environ.get("RAG_RETRIEVER", "auto")
+    nprobe = nprobe or int(os.environ.get("RAG_IVF_NPROBE", DEFAULT_NPROBE))
+    if kind != "exact":
+        ivf = IVFRetriever.load(path, matrix, nprobe=nprobe)
+        if ivf is not None:
+            return ivf
+        if kind == "ivf":
+            print(f"No IVF index at {path} — run `python rag/ingest.py --ivf`; using exact search")
+    return ExactRetriever(matrix)
+
+
+def recall_at_k(approx: Retriever, exact: Retriever, queries: np.ndarray, top_k: int) -> float:
+    """Fraction of the exact top-k found by `approx`, averaged over `queries`."""
+    hits = 0
+    for q in queries:
+        truth = set(exact.search(q, top_k)[0].tolist())
+        hits += len(truth & set(approx.search(q, top_k)[0].tolist()))
+    return hits / (len(queries) * top_k)
@@ -0,0 +1,231 @@
+"""
+Question Router
+===============
+Decides whether a question needs the live prayer-time tool (TOOL) or the
+knowledge base (RAG) without an LLM round-trip whenever it can.
+
+The LLM classifier in rag/chat.py is a full blocking ollama.chat call made
+before anything streams; on a CPU-only box it roughly doubles time-to-first-
+token.  Most questions are obvious, so the Router tries cheap stages first:
+
+  1. keywords   prayer name / "prayer times" asked with a time word, date or
+                place → TOOL;  method, angle, how/why, app questions with no
+                date or place → RAG.  Microseconds.
+  2. exemplars  cosine similarity of the question embedding against labelled
+                example questions.  One (usually cached) encode plus a tiny
+                matrix product.  Skipped for follow-ups, where the meaning
+                depends on the conversation.
+  3. llm        the original classifier, only when both stages abstain.
+
+Every decision is counted per stage together with its latency; see
+Router.stats (reported by /api/status).  Set RAG_ROUTER=llm to always use
+the LLM classifier.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+TOOL, RAG = "TOOL", "RAG"
+
+EXEMPLAR_THRESHOLD = 0.55   # minimum similarity to the best-matching label
+EXEMPLAR_MARGIN = 0.08      # … and how far it must beat the other label
+
+EXEMPLARS: dict[str, list[str]] = {
+    TOOL: [
+        "When is Fajr today?",
+        "What time is Maghrib in London?",
+        "Prayer times in Toronto tomorrow",
+        "When is Isha tonight?",
+        "What time is Asr in Karachi on Friday?",
+        "Show me today's prayer timings",
+        "When is the next prayer?",
+        "Dhuhr time in Dubai",
+        "What time is sunrise tomorrow?",
+        "How long until Maghrib?",
+    ],
+    RAG: [
+        "What is the ISNA calculation method?",
+        "What angle is used for Isha?",
+        "How are prayer times calculated?",
+        "What is the difference between Hanafi and Shafi Asr?",
+        "How do I change the calculation method in the app?",
+        "Why is Fajr so early in summer?",
+        "What does the high latitude rule do?",
+        "Which calculation method should I use?",
+        "How does the app find my location?",
+        "Explain the Muslim World League method",
+    ],
+}
+
+_PRAYER = re.compile(
+    r"\b(fajr|fajar|sunrise|shuruq|dhuhr|duhr|zuhr|zohr|asr|maghrib|magrib|isha|esha"
+    r"|prayers?|salah|salat|namaz|adhan|azan)\b", re.I,
+)
+_TIME_ASK = re.compile(
+    r"\b(when|what time|timings?|times?|schedule|how long until|how long till|next)\b", re.I,
+)
+_DATE = re.compile(
+    r"\b(today|tomorrow|yesterday|tonight|now|this (?:morning|evening|week)"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|\d{4}-\d{2}-\d{2})\b", re.I,
+)
+_PLACE = re.compile(r"\b(?:in|for|at)\s+([A-Z][\w'-]+)")
+# For cache keys: everything after in/for/at up to punctuation, a date word or
+# the next connector, so "in New York today" → "new york" (any case).  The
+# lookahead lets "for Isha in Karachi" yield both "isha" and "karachi".
+_PLACE_SPAN = re.compile(r"\b(?:in|for|at)\s+(?=([^?.!,;]+))", re.I)
+_PLACE_END = re.compile(_DATE.pattern + r"|\b(?:in|for|at|on)\b", re.I)
+_HERE = re.compile(r"\b(here|near me|my (?:city|location))\b", re.I)
+_CONCEPT = re.compile(
+    r"\b(why|explain|how (?:does|do|is|are|to|can)|what does|method|convention|angle|degrees?"
+    r"|calculat\w*|madh+ab|hanafi|shafi\w*|juristic|high latitude|setting|settings"
+    r"|configur\w*|install\w*|app|difference|mean\w*)\b", re.I,
+)
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    route: str      # TOOL or RAG
+    source: str     # keywords, exemplars or llm
+    score: float    # stage-specific confidence (similarity for exemplars)
+
+
+def _mentions_place(question: str) -> bool:
+    """True for "in Toronto", "for London", "here" — but not "for Isha" or "in ISNA"."""
+    if _HERE.search(question):
+        return True
+    return any(
+        not _PRAYER.fullmatch(word) and not word.isupper()
+        for word in _PLACE.findall(question)
+    )
+
+
+def tool_slots(question: str) -> tuple[tuple[str, ...], ...]:
+    """
+    The words that change a prayer-time answer — dates, places and prayer
+    names — lower-cased and sorted, so two questions get the same slots only
+    when they ask about the same prayers, day and place.
+    """
+    dates = {m.group(0).lower() for m in _DATE.finditer(question)}
+    places = {m.group(0).lower() for m in _HERE.finditer(question)}
+    for span in _PLACE_SPAN.findall(question):
+        end = _PLACE_END.search(span)
+        place = " ".join(span[:end.start() if end else None].split()).lower()
+        if place and not _PRAYER.fullmatch(place):
+            places.add(place)
+    prayers = {m.group(0).lower() for m in _PRAYER.finditer(question)}
+    return tuple(sorted(dates)), tuple(sorted(places)), tuple(sorted(prayers))
+
+
+def keyword_route(question: str) -> str | None:
+    """TOOL or RAG for clear-cut questions, None when the keywords disagree or are absent."""
+    concept = bool(_CONCEPT.search(question))
+    date_or_place = bool(_DATE.search(question)) or _mentions_place(question)
+    if concept and not date_or_place:
+        return RAG
+    if not concept and _PRAYER.search(question) and (date_or_place or _TIME_ASK.search(question)):
+        return TOOL
+    return None
+
+
+class Router:
+    """
+    Staged TOOL/RAG router with per-stage counters.  Thread-safe; one
+    instance is shared by every caller of rag.chat.answer_stream_with_tools.
+    """
+
+    def __init__(self, exemplars: dict[str, list[str]] = EXEMPLARS,
+                 threshold: float = EXEMPLAR_THRESHOLD, margin: float = EXEMPLAR_MARGIN,
+                 mode: str | None = None) -> None:
+        self.exemplars = exemplars
+        self.threshold = threshold
+        self.margin = margin
+        self.mode = mode or os.environ.get("RAG_ROUTER", "auto")
+        self._labels = list(exemplars)
+        self._matrices: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+        self._seconds: dict[str, float] = {}
+
+    def route(self, question: str, fallback: Callable[[], str], embedder=None,
+              history: list[dict] | None = None) -> RouteDecision:
+        """
+        Route `question`; `fallback()` is the LLM classifier, called only if
+        the local stages abstain.
+        """
+        start = time.perf_counter()
+        decision = self.local_route(question, embedder, history)
+        if decision is None:
+            decision = RouteDecision(fallback(), "llm", 1.0)
+        self.record(decision, time.perf_counter() - start)
+        return decision
+
+    def local_route(self, question: str, embedder=None,
+                    history: list[dict] | None = None) -> RouteDecision | None:
+        """
+        The keyword and exemplar stages only: a decision, or None if the LLM
+        must decide.  Callers that run the LLM themselves (the async API
+        path) pair this with record().
+        """
+        if self.mode == "llm":
+            return None
+        route = keyword_route(question)
+        if route is not None:
+            return RouteDecision(route, "keywords", 1.0)
+        if embedder is not None and not history:
+            return self._exemplar_route(question, embedder)
+        return None
+
+    def record(self, decision: RouteDecision, seconds: float) -> None:
+        """Count `decision` and the time it took in the stats."""
+        with self._lock:
+            counts = self._counts.setdefault(decision.source, {})
+            counts[decision.route] = counts.get(decision.route, 0) + 1
+            self._seconds[decision.source] = self._seconds.get(decision.source, 0.0) + seconds
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(sum(c.values()) for c in self._counts.values())
+            return {
+                "decisions": {s: dict(c) for s, c in self._counts.items()},
+                "llm_fallback_rate": round(sum(self._counts.get("llm", {}).values()) / total, 3)
+                                     if total else 0.0,
+                "avg_ms": {
+                    s: round(1000 * self._seconds[s] / sum(self._counts[s].values()), 2)
+                    for s in self._counts
+                },
+            }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _exemplar_route(self, question: str, embedder) -> RouteDecision | None:
+        q_vec = embedder.encode(question, normalize_embeddings=True)
+        best = [float(np.max(m @ q_vec)) for m in self._exemplar_matrices(embedder)]
+        order = np.argsort(best)[::-1]
+        top, runner_up = best[order[0]], best[order[1]] if len(best) > 1 else -1.0
+        if top >= self.threshold and top - runner_up >= self.margin:
+            return RouteDecision(self._labels[order[0]], "exemplars", round(top, 3))
+        return None
+
+    def _exemplar_matrices(self, embedder) -> list[np.ndarray]:
+        """Exemplar embeddings per label, computed once per embedder."""
+        with self._lock:
+            matrices = self._matrices.get(embedder)
+        if matrices is None:
+            matrices = [
+                np.asarray(embedder.encode(self.exemplars[label], normalize_embeddings=True))
+                for label in self._labels
+            ]
+            with self._lock:
+                self._matrices[embedder] = matrices
+        return matrices
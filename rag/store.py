@@ -0,0 +1,188 @@
+"""
+RAG Index Store
+===============
+On-disk format for the retrieval index, shared by ingest (writer) and
+query (reader).
+
+    rag/index/
+        embeddings-<hash>.npy   (N, dim) float32 or float16, rows L2-normalised
+        meta.json               format version, name, dtype, shape and sha256
+                                of the embeddings file, embedding model name,
+                                and the chunk records (no vectors)
+
+The embeddings file is named after its content hash and written first;
+meta.json is replaced last and is the only thing that points at it, so a
+crash mid-write leaves the previous index intact rather than a new matrix
+next to old metadata.  (Version 1 indexes used a fixed embeddings.npy and
+are still readable.)
+
+WHY NOT JSON?
+  The original index.json stored every embedding as a list of floats.  Loading
+  it meant parsing ~400 floats per chunk into Python objects and copying them
+  into a NumPy matrix.  A .npy file opened with mmap_mode="r" is zero-copy:
+  the OS pages vectors in on first use, so loading is near-instant regardless
+  of corpus size and several processes share the same physical memory.
+
+MIGRATION:
+  If rag/index/ does not exist but the legacy rag/index.json does,
+  load_index() converts it once and then uses the new format.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+
+from adhan.config import atomic_write
+
+INDEX_PATH = Path(__file__).parent / "index"
+FORMAT_VERSION = 2
+
+_META = "meta.json"
+_EMBEDDINGS = "embeddings.npy"          # format version 1
+
+
+class IndexFormatError(ValueError):
+    """Raised when an index on disk is missing pieces, corrupt, or too new."""
+
+
+def index_exists(path: Path = INDEX_PATH) -> bool:
+    """True if a new-format index or a migratable legacy index.json exists."""
+    return (path / _META).exists() or _legacy_path(path).exists()
+
+
+def save_index(records: list[dict], path: Path = INDEX_PATH, dtype: str = "float32") -> dict:
+    """
+    Write `records` (each with an "embedding" key) as a binary index.
+    Returns the metadata that was written.
+    """
+    matrix = _normalise(np.array([r["embedding"] for r in records], dtype=np.float32))
+    chunks = [{k: v for k, v in r.items() if k != "embedding"} for r in records]
+    return write_index(chunks, matrix, path, dtype=dtype)
+
+
+def write_index(chunks: list[dict], matrix: np.ndarray, path: Path = INDEX_PATH,
+                dtype: str = "float32", embed_model: str | None = None) -> dict:
+    """Write chunk metadata plus an (N, dim) embedding matrix to `path`."""
+    if len(chunks) != len(matrix):
+        raise ValueError(f"{len(chunks)} chunks but {len(matrix)} embeddings")
+    matrix = np.ascontiguousarray(matrix, dtype=np.dtype(dtype))
+    buf = io.BytesIO()
+    np.save(buf, matrix)
+    data = buf.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    embeddings = f"embeddings-{digest[:12]}.npy"
+    atomic_write(path / embeddings, data)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "embeddings": embeddings,
+        "dtype": matrix.dtype.name,
+        "shape": list(matrix.shape),
+        "sha256": digest,
+        "embed_model": embed_model,
+        "records": chunks,
+    }
+    atomic_write(path / _META, json.dumps(meta, ensure_ascii=False))   # commit point
+    _remove_stale_embeddings(path, keep=embeddings)
+    return meta
+
+
+def load_index(path: Path = INDEX_PATH, verify: bool = False) -> tuple[list[dict], np.ndarray]:
+    """
+    Return (records, matrix) where matrix[i] is the normalised embedding of
+    records[i].  The matrix is a read-only np.memmap.  With verify=True the
+    embeddings file is checked against the stored sha256 first.
+
+    A legacy index.json path is accepted too (parsed the old, slow way), and a
+    missing rag/index/ is migrated from index.json if that exists.
+    """
+    if path.suffix == ".json":
+        return _load_legacy(path)
+    if not (path / _META).exists() and _legacy_path(path).exists():
+        migrate_index(_legacy_path(path), path)
+
+    meta = read_meta(path)
+    embeddings = path / meta.get("embeddings", _EMBEDDINGS)
+    if verify:
+        digest = _sha256(embeddings)
+        if digest != meta["sha256"]:
+            raise IndexFormatError(
+                f"Checksum mismatch for {embeddings} — re-run rag/ingest.py"
+            )
+
+    try:
+        matrix = np.load(embeddings, mmap_mode="r")
+    except FileNotFoundError:
+        raise IndexFormatError(f"{embeddings} is missing — re-run rag/ingest.py") from None
+    if list(matrix.shape) != meta["shape"] or matrix.dtype.name != meta["dtype"]:
+        raise IndexFormatError(f"{embeddings} does not match {path / _META}")
+    return meta["records"], matrix
+
+
+def read_meta(path: Path = INDEX_PATH) -> dict:
+    try:
+        meta = json.loads((path / _META).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise IndexFormatError(f"Index not found at {path} — run: python rag/ingest.py") from None
+    if meta.get("format_version", 0) > FORMAT_VERSION:
+        raise IndexFormatError(
+            f"Index format v{meta['format_version']} is newer than supported v{FORMAT_VERSION}"
+        )
+    return meta
+
+
+def index_version(path: Path = INDEX_PATH) -> str:
+    """Short content hash identifying the current index build."""
+    return read_meta(path)["sha256"][:12]
+
+
+def migrate_index(legacy: Path, path: Path = INDEX_PATH, dtype: str = "float32") -> dict:
+    """Convert a legacy index.json into the binary format at `path`."""
+    with open(legacy) as f:
+        records = json.load(f)
+    meta = save_index(records, path, dtype=dtype)
+    print(f"Migrated {len(records)} records from {legacy} to {path}")
+    return meta
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _legacy_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def _load_legacy(path: Path) -> tuple[list[dict], np.ndarray]:
+    with open(path) as f:
+        records = json.load(f)
+    matrix = _normalise(np.array([r["embedding"] for r in records], dtype=np.float32))
+    return records, matrix
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    if matrix.size == 0:
+        return matrix.reshape(len(matrix), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _remove_stale_embeddings(path: Path, keep: str) -> None:
+    """Delete embedding files of earlier builds (open memmaps keep their data on POSIX)."""
+    for old in (path / _EMBEDDINGS, *path.glob("embeddings-*.npy")):
+        if old.name != keep:
+            try:
+                old.unlink(missing_ok=True)
+            except OSError:
+                pass            # still mapped on Windows; removed by the next build
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
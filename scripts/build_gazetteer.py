@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the offline gazetteer index used by adhan.location.geocode_city.
+
+Downloads the GeoNames cities dump (CC BY 4.0, https://www.geonames.org/)
+and packs it into adhan/data/gazetteer.bin.  Once built, city lookups for
+prayer times no longer need the network.
+
+    python3 scripts/build_gazetteer.py                    # cities15000 (~26k places)
+    python3 scripts/build_gazetteer.py --dataset cities5000
+    python3 scripts/build_gazetteer.py --source cities15000.txt
+"""
+import argparse
+import io
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from adhan.gazetteer import DEFAULT_GAZETTEER_PATH, build_gazetteer  # noqa: E402
+
+_GEONAMES_URL = "https://download.geonames.org/export/dump/{}.zip"
+
+parser = argparse.ArgumentParser(description="Build the offline gazetteer index")
+parser.add_argument("--dataset", default="cities15000",
+                    help="GeoNames dump name (cities500/1000/5000/15000)")
+parser.add_argument("--source", type=Path, help="Use a local cities*.txt instead of downloading")
+parser.add_argument("--min-population", type=int, default=0)
+parser.add_argument("--out", type=Path, default=DEFAULT_GAZETTEER_PATH)
+args = parser.parse_args()
+
+if args.source:
+    text = args.source.read_text(encoding="utf-8")
+else:
+    url = _GEONAMES_URL.format(args.dataset)
+    print(f"Downloading {url}...", flush=True)
+    resp = requests.get(url, timeout=120)
+    resp.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
+        text = zf.read(f"{args.dataset}.txt").decode("utf-8")
+
+t0 = time.time()
+rows = (line.split("\t") for line in text.splitlines() if line)
+count = build_gazetteer(rows, args.out, min_population=args.min_population)
+size_mb = args.out.stat().st_size / 1e6
+print(f"Wrote {count} places to {args.out} ({size_mb:.1f} MB, {time.time() - t0:.1f}s)")
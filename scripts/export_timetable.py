@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export a full year of prayer times for a city as CSV, JSON or iCalendar.
+
+The method and angles come from config.json unless overridden.  Rendered
+timetables are cached under ~/.cache/adhan-clock/timetables (or
+$ADHAN_CACHE_DIR/timetables), so exporting the same city/method/year again
+just copies the cached file.
+
+    python3 scripts/export_timetable.py --city Toronto --year 2027 --format ics
+    python3 scripts/export_timetable.py --city "Makkah" --method UMM_AL_QURA -o makkah.csv
+    python3 scripts/export_timetable.py --city London --format json -o -      # stdout
+"""
+import argparse
+import dataclasses
+import shutil
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from adhan.config import load_config  # noqa: E402
+from adhan.timetable import FORMATS, TimetableCache, download_name  # noqa: E402
+from services.prayer_service import PrayerService  # noqa: E402
+
+parser = argparse.ArgumentParser(description="Export an annual prayer timetable")
+parser.add_argument("--city", help="City name (default: this machine's location)")
+parser.add_argument("--year", type=int, default=date.today().year)
+parser.add_argument("--format", choices=FORMATS, default="csv")
+parser.add_argument("--method", help="Calculation method, e.g. MUSLIM_WORLD_LEAGUE")
+parser.add_argument("--fajr-angle", type=float)
+parser.add_argument("--isha-angle", type=float)
+parser.add_argument("--cache-dir", type=Path, help="Timetable cache directory")
+parser.add_argument("-o", "--out", help="Output file, or - for stdout (default: <city>-<year>.<format>)")
+args = parser.parse_args()
+
+overrides = {
+    k: v for k, v in {
+        "method": args.method, "fajr_angle": args.fajr_angle, "isha_angle": args.isha_angle,
+    }.items() if v is not None
+}
+config = dataclasses.replace(load_config(), **overrides)
+cache = TimetableCache(args.cache_dir) if args.cache_dir else TimetableCache()
+
+try:
+    path, city = PrayerService(config).export_year(args.city, args.year, args.format, cache=cache)
+except ValueError as e:
+    sys.exit(str(e))
+
+if args.out == "-":
+    sys.stdout.write(path.read_text(encoding="utf-8"))
+else:
+    out = Path(args.out or download_name(city, args.year, args.format))
+    shutil.copyfile(path, out)
+    print(f"Wrote {out} ({'cached' if cache.hits else 'computed'}: {path})")
@@ -10,17 +10,21 @@ from __future__ import annotations
 
 import logging
 from datetime import date, datetime, timedelta
+from pathlib import Path
 from typing import Optional
 
 import pytz
 
-from adhan.calculator import build_params, calculate
+from adhan.calculator import PrayerTimetable, build_params, calculate, calculate_range
 from adhan.config import load_config
 from adhan.location import geocode_city, get_current_location
 from adhan.models import Config, Coordinates, PrayerSchedule
+from adhan.timetable import TimetableCache
 
 logger = logging.getLogger(__name__)
 
+MAX_RANGE_DAYS = 366
+
 
 def _resolve_date(date_str: str) -> date:
     """
@@ -63,18 +67,58 @@ class PrayerService:
         Raises ValueError if the city cannot be geocoded.
         """
         target_date = _resolve_date(date_str)
+        coords, tz, resolved_city = self._resolve_location(city)
+        params = build_params(self._config)
+        schedule = calculate(target_date, coords, params, tz)
+        return schedule, resolved_city
+
+    def get_range(
+        self,
+        city: Optional[str] = None,
+        start_str: str = "today",
+        end_str: Optional[str] = None,
+    ) -> tuple[PrayerTimetable, str]:
+        """
+        Calculate prayer times for every day from start to end inclusive
+        (end defaults to start), in one vectorised pass.
+
+        Returns (PrayerTimetable, resolved_city_name).
+        Raises ValueError for an unknown city, a bad or reversed range, or
+        one longer than MAX_RANGE_DAYS.
+        """
+        start = _resolve_date(start_str)
+        end = _resolve_date(end_str) if end_str else start
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise ValueError(f"Date range is longer than {MAX_RANGE_DAYS} days")
+        coords, tz, resolved_city = self._resolve_location(city)
+        params = build_params(self._config)
+        return calculate_range(start, end, coords, params, tz), resolved_city
 
+    def export_year(
+        self,
+        city: Optional[str],
+        year: int,
+        fmt: str = "csv",
+        cache: Optional[TimetableCache] = None,
+    ) -> tuple[Path, str]:
+        """
+        Render a full year's timetable as csv, json or ics, reusing the
+        on-disk copy if this location/method/year was exported before.
+
+        Returns (path_to_file, resolved_city_name).
+        """
+        coords, tz, resolved_city = self._resolve_location(city)
+        cache = cache or TimetableCache()
+        return cache.get(coords, tz, resolved_city, self._config, year, fmt), resolved_city
+
+    @staticmethod
+    def _resolve_location(city: Optional[str]):
         if city:
             result = geocode_city(city)
             if result is None:
                 raise ValueError(f"Could not geocode city: {city!r}")
-            coords, tz, resolved_city = result
-        else:
-            coords, tz, resolved_city = get_current_location()
-
-        params = build_params(self._config)
-        schedule = calculate(target_date, coords, params, tz)
-        return schedule, resolved_city
+            return result
+        return get_current_location()
 
     def format_answer(
         self,
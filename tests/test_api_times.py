@@ -0,0 +1,96 @@
+"""Tests for the /api/times REST endpoints (geocoding is monkeypatched)."""
+from datetime import datetime
+
+import pytest
+import pytz
+from fastapi.testclient import TestClient
+
+import services.prayer_service as prayer_service
+from adhan.models import Coordinates
+from adhan.timetable import TimetableCache
+from api.main import app
+from api.times import seconds_until_midnight
+
+_CITIES = {
+    "london": (Coordinates(51.5074, -0.1278), pytz.timezone("Europe/London"), "London"),
+    "toronto": (Coordinates(43.6532, -79.3832), pytz.timezone("America/Toronto"), "Toronto"),
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(prayer_service, "geocode_city", lambda city: _CITIES.get(city.lower()))
+    return TestClient(app)
+
+
+def test_times_for_a_range_is_columnar(client):
+    resp = client.get("/api/times", params={"city": "London", "date": "2026-01-01", "end": "2026-01-31"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["city"] == "London"
+    assert body["timezone"] == "Europe/London"
+    assert (body["start"], body["end"]) == ("2026-01-01", "2026-01-31")
+    assert list(body["times"]) == ["Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha"]
+    assert all(len(col) == 31 for col in body["times"].values())
+
+
+def test_times_matches_prayer_service(client):
+    schedule, _ = prayer_service.PrayerService().get_times("London", "2026-06-21")
+    body = client.get("/api/times", params={"city": "London", "date": "2026-06-21"}).json()
+    assert {k: v[0] for k, v in body["times"].items()} == schedule.as_dict()
+
+
+def test_times_etag_and_cache_control(client):
+    params = {"city": "Toronto", "date": "2026-03-08"}
+    first = client.get("/api/times", params=params)
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    again = client.get("/api/times", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+def test_times_rejects_bad_input(client):
+    assert client.get("/api/times", params={"city": "Atlantis"}).status_code == 400
+    assert client.get("/api/times", params={"city": "London", "date": "2026-02-30"}).status_code == 400
+    resp = client.get("/api/times", params={"city": "London", "date": "2026-01-01", "end": "2027-06-01"})
+    assert resp.status_code == 400
+
+
+def test_batch_returns_results_in_order_with_per_item_errors(client):
+    resp = client.post("/api/times/batch", json={"queries": [
+        {"city": "Toronto", "date": "2026-01-01", "end": "2026-12-31"},
+        {"city": "Atlantis"},
+        {"city": "London", "date": "2026-07-01"},
+    ]})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["city"] for r in results] == ["Toronto", "Atlantis", "London"]
+    assert len(results[0]["times"]["Isha"]) == 365
+    assert "error" in results[1]
+    assert "etag" in resp.headers
+
+
+def test_batch_size_is_limited(client):
+    resp = client.post("/api/times/batch", json={"queries": [{"city": "London"}] * 51})
+    assert resp.status_code == 422
+
+
+def test_seconds_until_midnight_uses_local_time():
+    tz = pytz.timezone("America/Toronto")
+    now = tz.localize(datetime(2026, 3, 7, 23, 0)).astimezone(pytz.utc)
+    assert seconds_until_midnight(tz, now) == 3600
+
+
+def test_timetable_download_is_served_from_the_cache(client, monkeypatch, tmp_path):
+    cache = TimetableCache(tmp_path)
+    monkeypatch.setattr(prayer_service, "TimetableCache", lambda: cache)
+
+    resp = client.get("/api/timetable", params={"city": "London", "year": 2027, "format": "ics"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/calendar")
+    assert 'filename="London-2027.ics"' in resp.headers["content-disposition"]
+    client.get("/api/timetable", params={"city": "London", "year": 2027, "format": "ics"})
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert client.get("/api/timetable", params={"year": 2027, "format": "pdf"}).status_code == 400
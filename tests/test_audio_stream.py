@@ -0,0 +1,64 @@
+"""Tests for gui.audio_stream — ring buffer and energy VAD on synthetic audio."""
+import numpy as np
+
+from gui.audio_stream import END, SPEECH, TIMEOUT, EnergyVAD, RingBuffer
+
+_SR = 16_000
+_FRAME = _SR * 30 // 1000
+
+
+def _frames(seconds, amplitude, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * _SR) // _FRAME
+    return [(amplitude * rng.standard_normal(_FRAME)).astype(np.float32) for _ in range(n)]
+
+
+def _events(vad, frames):
+    return [(i, e) for i, f in enumerate(frames) if (e := vad.feed(f)) is not None]
+
+
+def test_ring_buffer_keeps_the_newest_samples_in_order():
+    ring = RingBuffer(10)
+    ring.write(np.arange(4))
+    assert ring.latest().tolist() == [0, 1, 2, 3]
+    ring.write(np.arange(4, 13))
+    assert len(ring) == 10
+    assert ring.total_written == 13
+    assert ring.latest().tolist() == list(range(3, 13))
+    assert ring.latest(3).tolist() == [10, 11, 12]
+    ring.write(np.arange(100, 125))
+    assert ring.latest().tolist() == list(range(115, 125))
+
+
+def test_ring_buffer_does_not_reallocate():
+    ring = RingBuffer(_SR)
+    buf = ring._buf
+    for frame in _frames(3, 0.1):
+        ring.write(frame)
+    assert ring._buf is buf
+    assert ring.latest().dtype == np.float32
+
+
+def test_vad_detects_speech_then_endpoint():
+    frames = _frames(0.5, 0.002) + _frames(1.0, 0.2, seed=1) + _frames(1.0, 0.002, seed=2)
+    vad = EnergyVAD(_SR)
+    events = _events(vad, frames)
+    assert [e for _, e in events] == [SPEECH, END]
+    speech_at, end_at = (i * 30 for i, _ in events)
+    assert 500 <= speech_at <= 650
+    assert 1500 + 600 - 60 <= end_at <= 1500 + 600 + 60
+
+
+def test_vad_ignores_short_clicks_and_adapts_to_noise():
+    frames = _frames(0.5, 0.02)
+    frames[5] = frames[5] * 20                  # one 30 ms click
+    vad = EnergyVAD(_SR)
+    assert _events(vad, frames) == []
+    assert 0.015 < vad.noise_floor < 0.025
+    assert vad.threshold > 0.045                # steady fan noise is not speech
+
+
+def test_vad_times_out_without_speech():
+    vad = EnergyVAD(_SR, no_speech_ms=1000)
+    events = _events(vad, _frames(1.5, 0.002))
+    assert events[0][1] == TIMEOUT
@@ -0,0 +1,97 @@
+"""Tests for adhan.gazetteer — builds a tiny index from GeoNames-format rows."""
+import pytest
+import pytz
+
+import adhan.location
+from adhan.gazetteer import Gazetteer, build_gazetteer, fold_name
+from adhan.location import geocode_city
+
+
+def _row(name, ascii_name, alternates, lat, lon, country, population, tz):
+    row = [""] * 19
+    row[1], row[2], row[3] = name, ascii_name, alternates
+    row[4], row[5], row[8] = str(lat), str(lon), country
+    row[14], row[17] = str(population), tz
+    return row
+
+
+_ROWS = [
+    _row("Toronto", "Toronto", "Torontas,تورونتو", 43.70011, -79.4163, "CA", 2600000, "America/Toronto"),
+    _row("London", "London", "Londres,Londra", 51.50853, -0.12574, "GB", 8961989, "Europe/London"),
+    _row("London", "London", "", 42.98339, -81.23304, "CA", 346765, "America/Toronto"),
+    _row("Mecca", "Mecca", "Makkah,Makkah al Mukarramah,مكة المكرمة", 21.42664, 39.82563, "SA", 1323624, "Asia/Riyadh"),
+    _row("São Paulo", "Sao Paulo", "", -23.5475, -46.63611, "BR", 10021295, "America/Sao_Paulo"),
+    _row("Torrance", "Torrance", "", 33.83585, -118.34063, "US", 145438, "America/Los_Angeles"),
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "gazetteer.bin"
+    assert build_gazetteer(_ROWS, path) == len(_ROWS)
+    return Gazetteer(path)
+
+
+def test_fold_name_strips_accents_and_case():
+    assert fold_name("  São Paulo ") == "sao paulo"
+
+
+def test_lookup_prefers_most_populous(gazetteer):
+    place = gazetteer.lookup("london")
+    assert place.country == "GB"
+    assert place.timezone == "Europe/London"
+
+
+def test_lookup_country_filter(gazetteer):
+    assert gazetteer.lookup("London", country="ca").coords.latitude == pytest.approx(42.98339)
+
+
+def test_lookup_by_alternate_name(gazetteer):
+    assert gazetteer.lookup("Makkah").name == "Mecca"
+    assert gazetteer.lookup("مكة المكرمة").name == "Mecca"
+    assert gazetteer.lookup("sao paulo").name == "São Paulo"
+
+
+def test_lookup_miss_returns_none(gazetteer):
+    assert gazetteer.lookup("Atlantis") is None
+
+
+def test_complete_ranks_prefix_matches_by_population(gazetteer):
+    assert [p.name for p in gazetteer.complete("tor")] == ["Toronto", "Torrance"]
+
+
+def test_fuzzy_tolerates_typos(gazetteer):
+    assert gazetteer.fuzzy("Torontto")[0].name == "Toronto"
+
+
+def test_open_returns_none_when_not_built(tmp_path):
+    assert Gazetteer.open(tmp_path / "missing.bin") is None
+
+
+def test_open_rejects_foreign_file(tmp_path):
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        Gazetteer(bad)
+
+
+def test_geocode_city_uses_gazetteer_before_network(gazetteer, monkeypatch):
+    monkeypatch.setattr(adhan.location, "_gazetteer", gazetteer)
+    monkeypatch.setattr(adhan.location, "_gazetteer_loaded", True)
+
+    def _no_network(*a, **kw):
+        raise AssertionError("network should not be used")
+
+    monkeypatch.setattr("requests.get", _no_network)
+    coords, tz, name = geocode_city("Toronto")
+    assert name == "Toronto"
+    assert tz == pytz.timezone("America/Toronto")
+    assert geocode_city("London, CA")[0].latitude == pytest.approx(42.98339)
+
+
+def test_geocode_city_non_country_qualifier_falls_back(gazetteer, monkeypatch):
+    monkeypatch.setattr(adhan.location, "_gazetteer", gazetteer)
+    monkeypatch.setattr(adhan.location, "_gazetteer_loaded", True)
+    assert adhan.location._offline_lookup("کراچی, پا") is None
+    assert adhan.location._offline_lookup("London, Ontario") is None
+    assert gazetteer.lookup("London", country="پا") is None
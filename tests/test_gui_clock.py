@@ -26,6 +26,12 @@ class _W:
     def setToolTip(self, *a): pass
     def width(self): return 450
     def resizeEvent(self, e): pass
+    def isHidden(self): return getattr(self, "_hidden", False)
+    def isMinimized(self): return False
+    def showEvent(self, e): pass
+    def hideEvent(self, e): pass
+    def changeEvent(self, e): pass
+    def closeEvent(self, e): pass
 
 
 class _Label(_W):
@@ -41,7 +47,11 @@ class _Label(_W):
 
 class _Timer:
     timeout = MagicMock()
-    def start(self, *a): pass
+    interval = None
+    def start(self, ms=None): self.interval = ms
+    def setSingleShot(self, *a): pass
+    def setInterval(self, *a): pass
+    def setTimerType(self, *a): pass
 
 
 class _Layout:
@@ -63,6 +73,7 @@ class _GroupBox(_W):
 
 class _Button(_W):
     clicked = MagicMock()
+    def setText(self, t): self._text = t
 
 
 class _LineEdit(_W):
@@ -91,6 +102,7 @@ class _TextEdit(_W):
     def insertPlainText(self, t): self._text += t
     def ensureCursorVisible(self): pass
     def text(self): return self._text
+    def toPlainText(self): return self._text
 
 
 class _SizePolicy:
@@ -108,11 +120,14 @@ class _Qt:
     AlignTop = 20
     ScrollBarAlwaysOff = 1
     ScrollBarAsNeeded = 0
+    PreciseTimer = 0
 
 
 class _Thread:
+    started = 0
+
     def __init__(self, *a, **kw): pass
-    def start(self, *a): pass
+    def start(self, *a): _Thread.started += 1
     def isRunning(self): return False
 
 
@@ -270,16 +285,158 @@ def test_update_display_sunrise_label_updated(widget):
     assert widget.sunrise_label.text() == "06:00"
 
 
+def test_update_display_computes_day_values_once_per_day(widget):
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, tzinfo=UTC)
+    widget.clock.get_prayer_times.return_value = _make_pt(now, -5, -3, 2, 4, 6)
+    widget.clock.get_prayer_times.reset_mock()
+    for seconds in range(3):
+        widget.clock.get_current_time.return_value = now + timedelta(seconds=seconds)
+        widget.update_display()
+    assert widget.clock.get_prayer_times.call_count == 1
+    assert widget.time_label.text() == "10:00:02"
+    assert widget.countdown_label._text == "Asr in 1h 59m 58s"
+
+    widget.clock.get_current_time.return_value = now + timedelta(days=1)
+    widget.update_display()
+    widget.clock.get_prayer_times.assert_any_call((now + timedelta(days=1)).date())
+
+
+def test_location_refresh_recomputes_the_day(widget):
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, tzinfo=UTC)
+    widget.clock.get_current_time.return_value = now
+    widget.clock.get_prayer_times.return_value = _make_pt(now, -5, -3, 2, 4, 6)
+    widget.update_display()
+    widget.clock.get_prayer_times.return_value = _make_pt(now, -5, -3, 3, 4, 6)
+    widget._on_location_refreshed()
+    assert widget.prayer_labels["Asr"].text() == "13:00"
+
+
+# ── Timers ────────────────────────────────────────────────────────────────────
+
+def test_display_timer_is_aligned_to_the_next_second(widget):
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, 250000, tzinfo=UTC)
+    widget.clock.get_current_time.return_value = now
+    widget._arm_display_timer()
+    assert widget.timer.interval == 750 + 5
+
+
+def test_display_timer_drops_to_minutes_when_hidden(widget):
+    widget._hidden = True
+    now = _RealDatetime(2023, 10, 27, 10, 0, 30, 250000, tzinfo=UTC)
+    widget.clock.get_current_time.return_value = now
+    widget._arm_display_timer()
+    assert widget.timer.interval == 29750 + 5
+
+
+def test_prayer_timer_is_armed_for_the_next_prayer(widget):
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, tzinfo=UTC)
+    widget.clock.get_current_time.return_value = now
+    widget.clock.get_prayer_times.return_value = _make_pt(now, -5, -3, 5 / 60, 4, 6)
+    widget.update_display()
+    assert widget._next_prayer_event[0] == "Asr"
+    assert widget._prayer_timer.interval == 5 * 60 * 1000
+
+
+def test_prayer_timer_plays_adhan_once_and_rearms(widget, monkeypatch):
+    import gui.clock_window as clock_window
+
+    class _SyncThread:
+        def __init__(self, target, daemon=False):
+            self._target = target
+        def start(self):
+            self._target()
+
+    monkeypatch.setattr(clock_window.threading, "Thread", _SyncThread)
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, tzinfo=UTC)
+    widget.clock.get_current_time.return_value = now
+    widget.clock.get_prayer_times.return_value = _make_pt(now, -5, -3, 1 / 3600, 4, 6)
+    widget.update_display()
+    assert widget._next_prayer_event[0] == "Asr"
+
+    widget.clock.get_current_time.return_value = now + timedelta(seconds=1)
+    widget._on_prayer_timer()
+    widget._play_scheduled_adhan(now + timedelta(seconds=2), "Asr", now + timedelta(seconds=1))
+    assert widget.clock.play_adhan.call_count == 1
+    assert widget.clock.play_adhan.call_args[0][0] == "Asr"
+    assert widget._next_prayer_event[0] == "Maghrib"
+
+
+def test_stale_prayer_is_not_played_after_suspend(widget):
+    now = _RealDatetime(2023, 10, 27, 10, 0, 0, tzinfo=UTC)
+    widget._play_scheduled_adhan(now + timedelta(minutes=10), "Asr", now)
+    widget.clock.play_adhan.assert_not_called()
+
+
 # ── refresh_location ──────────────────────────────────────────────────────────
 
 def test_refresh_location_updates_location_label(widget):
     widget.clock.config = Config(city="Cairo")
     widget.clock.timezone = pytz.timezone("Africa/Cairo")
     widget.refresh_location()
+    assert widget.location_label._text == "Refreshing..."
+    widget._start_location_refresh()          # debounce timer fired
+    widget._on_location_worker_done()         # worker finished
     assert "Cairo" in widget.location_label._text
     assert "Africa/Cairo" in widget.location_label._text
 
 
+def test_refresh_location_does_not_block_on_the_clock(widget):
+    widget.refresh_location()
+    widget.clock.refresh_settings.assert_not_called()
+
+
+def test_refresh_requests_coalesce_while_worker_runs(widget):
+    before = _Thread.started
+    widget._start_location_refresh()
+    widget._start_location_refresh()
+    widget._start_location_refresh()
+    assert _Thread.started == before + 1
+    widget._on_location_worker_done()         # one queued follow-up refresh
+    assert _Thread.started == before + 2
+    widget._on_location_worker_done()
+    assert _Thread.started == before + 2
+
+
+def test_location_worker_error_keeps_last_location(widget):
+    widget._start_location_refresh()
+    widget._on_location_worker_error("offline")
+    assert widget.location_label._text.startswith("TestCity |")
+    assert "refresh failed" in widget.location_label._text
+
+
+# ── Text-to-speech ────────────────────────────────────────────────────────────
+
+def test_second_speak_press_stops_and_close_waits(widget):
+    worker = MagicMock()
+    _voice_stub.TtsWorker.return_value = worker
+    widget.rag_answer.setPlainText("Fajr is at 05:12. Dhuhr is at 13:04.")
+
+    worker.isRunning.return_value = False
+    widget._speak_answer()
+    worker.start.assert_called_once()
+    assert widget.speak_btn._text == "⏹ Stop"
+
+    worker.isRunning.return_value = True
+    widget._speak_answer()
+    worker.stop.assert_called_once()
+    assert widget.speak_btn._text == "🔊 Speak"
+
+    widget.closeEvent(MagicMock())
+    assert worker.stop.call_count == 2
+    worker.wait.assert_called_once()
+
+
+def test_finished_stale_tts_worker_does_not_reset_button(widget):
+    old, new = MagicMock(), MagicMock()
+    widget._tts_worker = new
+    widget.speak_btn.setText("⏹ Stop")
+    widget._on_tts_done(old)
+    assert widget.speak_btn._text == "⏹ Stop"
+    widget._on_tts_done(new, "no player")
+    assert widget.speak_btn._text == "🔊 Speak"
+    assert "[TTS error: no player]" in widget.rag_answer.text()
+
+
 # ── resizeEvent ───────────────────────────────────────────────────────────────
 
 def test_resize_event_applies_correct_font_sizes(widget):
@@ -1,9 +1,15 @@
 """Tests for adhan.location — no Qt or adhan stubs needed."""
 from unittest.mock import MagicMock, patch
 
+import pytest
 import pytz
 
-from adhan.location import get_current_location
+import adhan.location
+from adhan.geocache import GeocodeCache, normalize_city
+from adhan.location import (
+    distance_km, geocode_city, get_current_location, load_last_location, save_last_location,
+)
+from adhan.models import Coordinates
 
 
 def _mock_response(data):
@@ -46,3 +52,104 @@ def test_get_current_location_network_error(monkeypatch):
     coords, tz, city = get_current_location()
     assert city == "Offline"
     assert tz == pytz.UTC
+
+
+# ── geocode_city + GeocodeCache ───────────────────────────────────────────────
+
+_TORONTO = [{"lat": "43.65", "lon": "-79.38", "display_name": "Toronto, Ontario, Canada"}]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = GeocodeCache(tmp_path / "geocode.sqlite3")
+    monkeypatch.setattr(adhan.location, "_geocode_cache", c)
+    return c
+
+
+def _counting_get(payload):
+    calls = []
+
+    def _get(*a, **kw):
+        calls.append(kw.get("params", {}).get("q"))
+        return _mock_response(payload)
+
+    return _get, calls
+
+
+def test_normalize_city_folds_case_space_and_punctuation():
+    assert normalize_city("  São  Paulo, ") == normalize_city("são paulo")
+
+
+def test_geocode_city_hits_network_once(cache, monkeypatch):
+    get, calls = _counting_get(_TORONTO)
+    monkeypatch.setattr("requests.get", get)
+    first = geocode_city("Toronto")
+    second = geocode_city(" toronto ")
+    assert first == second
+    assert first[2] == "Toronto"
+    assert first[1] == pytz.timezone("America/Toronto")
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_geocode_city_caches_negative_results(cache, monkeypatch):
+    get, calls = _counting_get([])
+    monkeypatch.setattr("requests.get", get)
+    assert geocode_city("Atlantis") is None
+    assert geocode_city("Atlantis") is None
+    assert len(calls) == 1
+
+
+def test_geocode_city_does_not_cache_network_errors(cache, monkeypatch):
+    def _raise(*a, **kw):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr("requests.get", _raise)
+    assert geocode_city("Toronto") is None
+    hit, _ = cache.lookup("Toronto")
+    assert not hit
+
+
+def test_geocode_cache_survives_restart(tmp_path):
+    path = tmp_path / "geocode.sqlite3"
+    GeocodeCache(path).store("Cairo", (Coordinates(30.04, 31.24), pytz.timezone("Africa/Cairo"), "Cairo"))
+    hit, result = GeocodeCache(path).lookup("cairo")
+    assert hit
+    assert result[0].latitude == 30.04
+    assert result[1].zone == "Africa/Cairo"
+
+
+def test_geocode_cache_entries_expire(tmp_path):
+    c = GeocodeCache(tmp_path / "g.sqlite3", negative_ttl=-1)
+    c.store("Nowhere", None)
+    assert c.lookup("Nowhere") == (False, None)
+
+
+def test_geocode_cache_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "g.sqlite3"
+    c = GeocodeCache(path, max_entries=2)
+    for name in ("A", "B", "C"):
+        c.store(name, (Coordinates(0, 0), pytz.UTC, name))
+    reopened = GeocodeCache(path, max_entries=2)
+    assert reopened.lookup("A") == (False, None)
+    assert reopened.lookup("C")[0]
+
+
+# ── Last known location ───────────────────────────────────────────────────────
+
+def test_last_location_round_trips(tmp_path):
+    path = tmp_path / "location.json"
+    assert load_last_location(path) is None
+    toronto = (Coordinates(43.65, -79.38), pytz.timezone("America/Toronto"), "Toronto")
+    save_last_location(toronto, path)
+    result, updated = load_last_location(path)
+    assert result == toronto
+    assert updated > 0
+    path.write_text("{not json")
+    assert load_last_location(path) is None
+
+
+def test_distance_km():
+    london, paris = Coordinates(51.5074, -0.1278), Coordinates(48.8566, 2.3522)
+    assert distance_km(london, london) == 0
+    assert 340 < distance_km(london, paris) < 345
@@ -3,6 +3,7 @@ Tests for the adhan domain package — config, models, and calculator.
 These are pure unit tests: no network, no GUI, no audio.
 """
 import json
+import threading
 from datetime import date
 from pathlib import Path
 
@@ -11,8 +12,8 @@ import pytest
 from unittest.mock import patch
 
 from adhan.models import Config, Coordinates, PrayerSchedule
-from adhan.config import load_config, save_config
-from adhan.calculator import build_params, calculate
+from adhan.config import atomic_write, load_config, save_config
+from adhan.calculator import build_params, calculate, calculate_range
 
 
 # ── adhan.models ──────────────────────────────────────────────────────────────
@@ -117,6 +118,14 @@ def test_load_config_malformed_json_returns_defaults(tmp_path):
     assert c.method == "NORTH_AMERICA"
 
 
+def test_atomic_write_creates_parents_and_leaves_no_temp_files(tmp_path):
+    p = tmp_path / "nested" / "file.json"
+    atomic_write(p, "{}")
+    atomic_write(p, b"[]")
+    assert p.read_bytes() == b"[]"
+    assert [f.name for f in p.parent.iterdir()] == ["file.json"]
+
+
 def test_save_and_reload_config(tmp_path):
     p = tmp_path / "config.json"
     original = Config(method="MWL", fajr_angle=18.0, isha_angle=17.0, city="London")
@@ -170,3 +179,149 @@ def test_build_params_unknown_method_falls_back_to_north_america():
     from adhanpy.calculation.CalculationMethod import CalculationMethod
     params = build_params(Config(method="NONEXISTENT_METHOD"))
     assert params.method == CalculationMethod.NORTH_AMERICA
+
+
+# ── adhan.calculator.calculate_range ──────────────────────────────────────────
+
+@pytest.mark.parametrize("method", ["NORTH_AMERICA", "UMM_AL_QURA", "MOON_SIGHTING_COMMITTEE"])
+def test_calculate_range_matches_calculate_for_a_year(london_coords, method):
+    from datetime import timedelta
+    tz = pytz.timezone("Europe/London")
+    params = build_params(Config(method=method))
+    table = calculate_range(date(2024, 1, 1), date(2024, 12, 31), london_coords, params, tz)
+    assert len(table) == 366
+    for i, d in enumerate(table.dates):
+        assert table[i] == calculate(d, london_coords, params, tz), d
+    assert table.dates[-1] == date(2024, 1, 1) + timedelta(days=365)
+
+
+def test_calculate_range_as_rows_match_schedule_as_dict(london_coords, london_params):
+    tz = pytz.timezone("Europe/London")
+    # Spans the spring DST change
+    table = calculate_range(date(2024, 3, 28), date(2024, 4, 3), london_coords, london_params, tz)
+    for row, d in zip(table.as_rows(), table.dates):
+        assert row.pop("Date") == d.isoformat()
+        assert row == calculate(d, london_coords, london_params, tz).as_dict()
+
+
+def test_calculate_range_negative_and_out_of_range_indices(london_coords, london_params):
+    tz = pytz.timezone("Europe/London")
+    table = calculate_range(date(2024, 1, 1), date(2024, 1, 7), london_coords, london_params, tz)
+    assert table[-1] == calculate(date(2024, 1, 7), london_coords, london_params, tz)
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+def test_calculate_range_rejects_reversed_range(london_coords, london_params):
+    with pytest.raises(ValueError):
+        calculate_range(date(2024, 2, 1), date(2024, 1, 1), london_coords, london_params, pytz.UTC)
+
+
+def test_calculate_range_raises_when_sun_never_sets(london_params):
+    tromso = Coordinates(latitude=69.65, longitude=18.96)
+    with pytest.raises(ValueError):
+        calculate_range(date(2024, 6, 20), date(2024, 6, 22), tromso, london_params, pytz.UTC)
+
+
+# ── adhan.clock.PrayerClock schedule cache ────────────────────────────────────
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch, london_coords):
+    import adhan.clock
+    monkeypatch.setattr(
+        adhan.clock, "detect_location",
+        lambda: (london_coords, pytz.timezone("Europe/London"), "London"),
+    )
+    return adhan.clock.PrayerClock(
+        config_path=tmp_path / "config.json", cache_size=2, location_path=tmp_path / "location.json",
+    )
+
+
+def test_get_prayer_times_is_memoised(clock):
+    first = clock.get_prayer_times(date(2024, 6, 1))
+    second = clock.get_prayer_times(date(2024, 6, 1))
+    assert first is second
+    assert clock.cache_stats["hits"] == 1
+    assert clock.cache_stats["misses"] == 1
+
+
+def test_prayer_times_cache_is_bounded(clock):
+    for day in (1, 2, 3):
+        clock.get_prayer_times(date(2024, 6, day))
+    assert clock.cache_stats["size"] == 2
+    clock.get_prayer_times(date(2024, 6, 1))   # evicted → recalculated
+    assert clock.cache_stats["misses"] == 4
+
+
+def test_prayer_times_cache_sees_config_changes(clock):
+    before = clock.get_prayer_times(date(2024, 6, 1))
+    clock.config.method = "MUSLIM_WORLD_LEAGUE"
+    after = clock.get_prayer_times(date(2024, 6, 1))
+    assert after.fajr != before.fajr
+
+
+def test_refresh_settings_invalidates_cache(clock):
+    clock.get_prayer_times(date(2024, 6, 1))
+    clock.refresh_settings()
+    assert clock.cache_stats["size"] == 0
+
+
+# ── adhan.clock.PrayerClock last known location ───────────────────────────────
+
+def _clock_at(tmp_path, monkeypatch, detect, saved=None):
+    import adhan.clock
+    from adhan.location import save_last_location
+    if saved is not None:
+        save_last_location(saved, tmp_path / "location.json")
+    monkeypatch.setattr(adhan.clock, "detect_location", detect)
+    return adhan.clock.PrayerClock(
+        config_path=tmp_path / "config.json", location_path=tmp_path / "location.json",
+    )
+
+
+_LONDON = (Coordinates(51.5074, -0.1278), pytz.timezone("Europe/London"), "London")
+_CAIRO = (Coordinates(30.0444, 31.2357), pytz.timezone("Africa/Cairo"), "Cairo")
+
+
+def test_startup_uses_saved_location_without_waiting(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def slow_detect():
+        release.wait(5)
+        return _CAIRO
+
+    clock = _clock_at(tmp_path, monkeypatch, slow_detect, saved=_LONDON)
+    assert clock.config.city == "London"
+    assert clock.timezone.zone == "Europe/London"
+    moved = []
+    clock.add_location_listener(lambda: moved.append(clock.config.city))
+    release.set()
+    clock.refresh_location().join(5)
+    assert moved == ["Cairo"]
+    assert clock.timezone.zone == "Africa/Cairo"
+
+
+def test_small_moves_do_not_fire_listeners(tmp_path, monkeypatch):
+    nearby = (Coordinates(51.51, -0.13), pytz.timezone("Europe/London"), "City of London")
+    clock = _clock_at(tmp_path, monkeypatch, lambda: nearby, saved=_LONDON)
+    clock.refresh_location().join(5)
+    moved = []
+    clock.add_location_listener(lambda: moved.append(True))
+    clock.refresh_location().join(5)
+    assert moved == []
+    assert clock.config.city == "London"
+    assert clock.location_age < 5
+
+
+def test_offline_keeps_last_good_fix(tmp_path, monkeypatch):
+    clock = _clock_at(tmp_path, monkeypatch, lambda: None, saved=_LONDON)
+    clock.refresh_settings(wait=True)
+    assert clock.config.city == "London"
+    assert clock.config.latitude == 51.5074
+
+
+def test_first_run_offline_falls_back_to_utc(tmp_path, monkeypatch):
+    clock = _clock_at(tmp_path, monkeypatch, lambda: None)
+    assert clock.config.city == "Offline"
+    assert clock.timezone == pytz.UTC
+    assert clock.location_age is None
@@ -0,0 +1,99 @@
+"""Tests for utils.metrics and the /api/metrics endpoint (Ollama is monkeypatched)."""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+import rag.chat as chat
+from utils import metrics
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_records_nothing():
+    metrics.disable()
+    metrics.reset()
+
+    @metrics.timed("work")
+    def work():
+        return 42
+
+    with metrics.trace() as trace, metrics.timer("block"):
+        assert work() == 42
+        metrics.inc("calls_total")
+    assert trace is None
+    assert metrics.render() == "\n"
+
+
+def test_render_prometheus_text(enabled):
+    metrics.inc("geocode_total", source="cache")
+    metrics.inc("geocode_total", source="cache")
+    metrics.observe("chat_ttft_seconds", 0.3)
+    metrics.observe("chat_ttft_seconds", 60)
+    text = metrics.render()
+    assert "# TYPE adhan_geocode_total counter" in text
+    assert 'adhan_geocode_total{source="cache"} 2' in text
+    assert "# TYPE adhan_chat_ttft_seconds histogram" in text
+    assert 'adhan_chat_ttft_seconds_bucket{le="0.25"} 0' in text
+    assert 'adhan_chat_ttft_seconds_bucket{le="0.5"} 1' in text
+    assert 'adhan_chat_ttft_seconds_bucket{le="30.0"} 1' in text
+    assert 'adhan_chat_ttft_seconds_bucket{le="+Inf"} 2' in text
+    assert "adhan_chat_ttft_seconds_count 2" in text
+
+
+def test_spans_reach_the_trace_across_executor_calls(enabled):
+    @metrics.timed("classify")
+    async def classify():
+        return "RAG"
+
+    @metrics.timed("retrieve")
+    def retrieve():
+        return []
+
+    async def request():
+        with metrics.trace() as trace:
+            await classify()
+            await chat._in_executor(retrieve)
+            return trace.as_dict()
+
+    spans = asyncio.run(request())
+    assert {"classify", "retrieve", "total"} <= set(spans)
+    assert 'adhan_span_seconds_count{span="retrieve"} 1' in metrics.render()
+
+
+def test_chat_sends_timing_trailer_and_metrics_endpoint(enabled, monkeypatch):
+    async def fake_answer(*args, **kwargs):
+        async def tokens():
+            for t in ("Fajr ", "is ", "at 05:12"):
+                yield t
+        return tokens(), []
+
+    monkeypatch.setattr(chat, "answer_stream_with_tools_async", fake_answer)
+    for key, value in {"ready": True, "records": [], "matrix": None, "embedder": None,
+                       "client": None, "model": "m", "answer_cache": None}.items():
+        monkeypatch.setitem(api_main._rag, key, value)
+    client = TestClient(api_main.app)
+
+    body = client.get("/api/chat", params={"q": "Fajr?", "timing": "true"}).text
+    events = body.strip().split("\n\n")
+    assert events[-1] == "data: [DONE]"
+    assert events[-2].startswith("event: timing\n")
+    timing = json.loads(events[-2].split("data: ", 1)[1])
+    assert timing["tokens"] == 3
+    assert {"ttft", "total", "tokens_per_second"} <= set(timing)
+
+    text = client.get("/api/metrics").text
+    assert "adhan_chat_tokens_total 3" in text
+    assert "adhan_chat_ttft_seconds_count 1" in text
+
+    metrics.disable()
+    assert client.get("/api/metrics").status_code == 404
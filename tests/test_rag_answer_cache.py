@@ -0,0 +1,100 @@
+"""Tests for the semantic answer cache."""
+import time
+from datetime import date, datetime, time as datetime_time
+
+import numpy as np
+
+from rag.answer_cache import AnswerCache
+
+_CHUNKS = [{"source": "methods.md", "chunk_id": 3}, {"source": "faq.md", "chunk_id": 0}]
+
+
+def _unit(*v):
+    v = np.array(v, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_near_duplicate_question_hits():
+    cache = AnswerCache("v1", threshold=0.95)
+    key = cache.key("English", "RAG", _CHUNKS)
+    cache.store(_unit(1, 0, 0), key, ["ISNA ", "uses 15°"], seconds=4.0)
+    hit = cache.lookup(_unit(1, 0.1, 0), key)
+    assert hit is not None and "".join(hit.tokens) == "ISNA uses 15°"
+    assert cache.lookup(_unit(0, 1, 0), key) is None
+    assert cache.stats == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "saved_seconds": 4.0, "entries": 1}
+
+
+def test_key_separates_language_chunks_and_index_version():
+    cache = AnswerCache("v1")
+    q = _unit(1, 0, 0)
+    cache.store(q, cache.key("English", "RAG", _CHUNKS), ["answer"], 1.0)
+    assert cache.lookup(q, cache.key("Urdu", "RAG", _CHUNKS)) is None
+    assert cache.lookup(q, cache.key("English", "RAG", _CHUNKS[:1])) is None
+    assert cache.lookup(q, AnswerCache("v2").key("English", "RAG", _CHUNKS)) is None
+    assert cache.lookup(q, cache.key("English", "RAG", _CHUNKS)) is not None
+
+
+def test_tool_answers_expire_quickly(monkeypatch):
+    cache = AnswerCache(tool_ttl=60)
+    q = _unit(1, 0, 0)
+    cache.store(q, cache.key("English", "TOOL"), ["Fajr 05:12"], 2.0)
+    cache.store(q, cache.key("English", "RAG", _CHUNKS), ["RAG answer"], 2.0)
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.lookup(q, cache.key("English", "TOOL")) is None
+    assert cache.lookup(q, cache.key("English", "RAG", _CHUNKS)) is not None
+    assert cache.stats["entries"] == 1
+
+
+def test_size_is_bounded():
+    cache = AnswerCache(max_entries=2)
+    for i in range(4):
+        cache.store(_unit(1, i, 0), cache.key("English", "RAG", [{"source": "d", "chunk_id": i}]), ["x"], 1)
+    assert cache.stats["entries"] == 2
+
+
+def test_empty_answers_are_not_cached():
+    cache = AnswerCache()
+    cache.store(_unit(1, 0, 0), cache.key("English", "TOOL"), [], 1.0)
+    assert cache.stats["entries"] == 0
+
+
+def test_tool_key_separates_city_and_day():
+    cache = AnswerCache()
+    q = _unit(1, 0, 0)                      # same embedding: only the key can tell them apart
+
+    def tool(question):
+        return cache.key("English", "TOOL", question=question)
+
+    cache.store(q, tool("When is Fajr in Toronto today?"), ["Fajr 05:12"], 2.0)
+    assert cache.lookup(q, tool("When is Fajr in Toronto tomorrow?")) is None
+    assert cache.lookup(q, tool("when is fajr in toronto today")) is not None
+
+    cache.store(q, tool("Isha in Lahore"), ["Isha 19:40"], 2.0)
+    assert cache.lookup(q, tool("Isha in Karachi")) is None
+    assert cache.lookup(q, tool("isha in lahore")) is not None
+
+
+def test_tool_key_separates_multi_word_cities():
+    cache = AnswerCache()
+    q = _unit(1, 0, 0)
+
+    def tool(question):
+        return cache.key("English", "TOOL", question=question)
+
+    cache.store(q, tool("When is Isha in New York today?"), ["Isha 21:40"], 2.0)
+    assert cache.lookup(q, tool("When is Isha in New Delhi today?")) is None
+    assert cache.lookup(q, tool("When is Isha in new orleans today?")) is None
+    assert cache.lookup(q, tool("when is isha in new york today")) is not None
+
+
+def test_tool_answers_expire_at_local_midnight(monkeypatch):
+    cache = AnswerCache(tool_ttl=300)
+    q = _unit(1, 0, 0)
+    key = cache.key("English", "TOOL", question="Fajr today")
+    before_midnight = datetime.combine(date(2027, 3, 1), datetime_time(23, 59)).timestamp()
+    monkeypatch.setattr(time, "time", lambda: before_midnight)
+    cache.store(q, key, ["Fajr 05:12"], 2.0)
+    assert cache.lookup(q, key) is not None
+    monkeypatch.setattr(time, "time", lambda: before_midnight + 61)   # 00:00:01, TTL not over
+    assert cache.lookup(q, key) is None
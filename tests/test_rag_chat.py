@@ -0,0 +1,198 @@
+"""Tests for routing and speculative retrieval in rag.chat (Ollama is monkeypatched)."""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+import rag.chat as chat
+from rag.router import Router
+
+
+class _Embedder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, text, normalize_embeddings=True):
+        self.calls.append((text, threading.current_thread().name))
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+
+_RECORDS = [{"source": "doc.md", "chunk_id": i, "text": f"chunk {i}"} for i in range(3)]
+_MATRIX = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]], dtype=np.float32)
+
+
+@pytest.fixture
+def llm_router(monkeypatch):
+    """Force every question through the LLM classifier so speculation kicks in."""
+    monkeypatch.setattr(chat, "router", Router(mode="llm"))
+
+
+def test_rag_route_uses_speculative_retrieval(monkeypatch, llm_router):
+    embedder = _Embedder()
+    started = threading.Event()
+
+    def slow_classify(question, model, history=None):
+        # Retrieval runs while the classifier is "thinking"
+        assert started.wait(2)
+        return "RAG"
+
+    real_retrieve = chat.retrieve
+
+    def spy_retrieve(*args, **kwargs):
+        started.set()
+        return real_retrieve(*args, **kwargs)
+
+    monkeypatch.setattr(chat, "_classify", slow_classify)
+    monkeypatch.setattr(chat, "retrieve", spy_retrieve)
+
+    _, chunks = chat.answer_stream_with_tools("What is ISNA?", _RECORDS, _MATRIX, embedder, "m")
+    assert [c["chunk_id"] for c in chunks][:1] == [0]
+    assert len(embedder.calls) == 1
+    assert embedder.calls[0][1].startswith("rag-speculate")
+
+
+def test_tool_route_discards_speculation(monkeypatch, llm_router):
+    monkeypatch.setattr(chat, "_classify", lambda q, m, history=None: "TOOL")
+    monkeypatch.setattr(
+        chat, "_answer_via_tool", lambda q, m, history=None, template=False: iter(["Fajr 05:12"]),
+    )
+
+    stream, chunks = chat.answer_stream_with_tools("When is Fajr?", _RECORDS, _MATRIX, _Embedder(), "m")
+    assert list(stream) == ["Fajr 05:12"]
+    assert chunks == []
+
+
+def test_local_route_retrieves_inline(monkeypatch):
+    monkeypatch.setattr(chat, "router", Router())
+    monkeypatch.setattr(chat, "_classify", lambda *a, **k: pytest.fail("LLM classifier called"))
+    embedder = _Embedder()
+
+    _, chunks = chat.answer_stream_with_tools(
+        "What is the Isha angle?", _RECORDS, _MATRIX, embedder, "m",
+    )
+    assert len(chunks) == 3
+    assert embedder.calls[0][1] == threading.current_thread().name
+
+
+class _FakeOllama:
+    """Stands in for ollama.chat: one tool call, then a streamed presentation."""
+
+    def __init__(self):
+        self.calls = []
+
+    def chat(self, model, messages, tools=None, stream=False):
+        self.calls.append({"tools": tools, "stream": stream})
+        if tools:
+            call = {"function": {"name": "get_prayer_times",
+                                 "arguments": {"city": "Toronto", "date": "today"}}}
+            return {"message": {"content": "", "tool_calls": [call]}}
+        return iter([{"message": {"content": t}} for t in ("Fajr ", "", "is at 05:12")])
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    fake = _FakeOllama()
+    monkeypatch.setattr(chat.ollama, "chat", fake.chat)
+    monkeypatch.setattr(chat, "_run_prayer_tool", lambda city, date: f"Prayer times for {city}:")
+    monkeypatch.setattr(chat, "router", Router())
+    return fake
+
+
+def test_tool_answer_template_skips_second_llm_call(fake_ollama, monkeypatch):
+    monkeypatch.setattr(chat, "TOOL_ANSWER_MODE", "template")
+    stream, _ = chat.answer_stream_with_tools("When is Fajr in Toronto?", _RECORDS, _MATRIX, _Embedder(), "m")
+    assert list(stream) == ["Prayer times for Toronto:"]
+    assert len(fake_ollama.calls) == 1
+
+
+def test_tool_answer_streams_when_rephrasing(fake_ollama, monkeypatch):
+    monkeypatch.setattr(chat, "TOOL_ANSWER_MODE", "template")
+    stream, _ = chat.answer_stream_with_tools(
+        "When is Fajr in Toronto?", _RECORDS, _MATRIX, _Embedder(), "m", language="Urdu",
+    )
+    assert fake_ollama.calls == []   # nothing runs until the stream is consumed
+    assert list(stream) == ["Fajr ", "is at 05:12"]
+    assert fake_ollama.calls[-1]["stream"] is True
+
+
+class _FakeAsyncClient:
+    """Stands in for ollama.AsyncClient."""
+
+    def __init__(self, route="RAG"):
+        self.route = route
+        self.calls = []
+
+    async def chat(self, model, messages, tools=None, stream=False):
+        self.calls.append({"tools": tools, "stream": stream})
+        if stream:
+            return self._stream(["Isha ", "", "is at 21:40"])
+        if tools:
+            call = {"function": {"name": "get_prayer_times", "arguments": '{"date": "today"}'}}
+            return {"message": {"content": "", "tool_calls": [call]}}
+        return {"message": {"content": self.route}}
+
+    @staticmethod
+    async def _stream(parts):
+        for p in parts:
+            yield {"message": {"content": p}}
+
+
+async def _collect(stream):
+    return [t async for t in stream]
+
+
+def test_async_rag_route_streams_tokens(monkeypatch, llm_router):
+    client = _FakeAsyncClient(route="RAG")
+
+    async def run():
+        stream, chunks = await chat.answer_stream_with_tools_async(
+            "hello", _RECORDS, _MATRIX, _Embedder(), client, "m",
+        )
+        return await _collect(stream), chunks
+
+    tokens, chunks = asyncio.run(run())
+    assert tokens == ["Isha ", "is at 21:40"]
+    assert len(chunks) == 3
+    assert chat.router.stats["decisions"] == {"llm": {"RAG": 1}}
+
+
+def test_async_tool_route_uses_template(monkeypatch):
+    monkeypatch.setattr(chat, "router", Router())
+    monkeypatch.setattr(chat, "TOOL_ANSWER_MODE", "template")
+    monkeypatch.setattr(chat, "_run_prayer_tool", lambda city, date: f"Prayer times for {city} {date}")
+    client = _FakeAsyncClient()
+
+    async def run():
+        stream, chunks = await chat.answer_stream_with_tools_async(
+            "When is Isha tonight?", _RECORDS, _MATRIX, _Embedder(), client, "m",
+        )
+        return await _collect(stream), chunks
+
+    tokens, chunks = asyncio.run(run())
+    assert tokens == ["Prayer times for None today"]
+    assert chunks == []
+    assert [c["tools"] is not None for c in client.calls] == [True]
+
+
+def test_async_answer_cache_replays_without_calling_ollama(monkeypatch, llm_router):
+    from rag.answer_cache import AnswerCache
+
+    cache = AnswerCache("v1")
+    client = _FakeAsyncClient(route="RAG")
+
+    async def ask(history=None):
+        stream, _ = await chat.answer_stream_with_tools_async(
+            "hello", _RECORDS, _MATRIX, _Embedder(), client, "m",
+            history=history, answer_cache=cache,
+        )
+        return await _collect(stream)
+
+    first = asyncio.run(ask())
+    calls = len(client.calls)
+    assert asyncio.run(ask()) == first
+    assert len(client.calls) == calls + 1          # classifier only, no generation
+    assert cache.stats["hits"] == 1
+
+    asyncio.run(ask(history=[{"role": "user", "content": "hi"}]))
+    assert cache.stats["hits"] == 1                # follow-ups bypass the cache
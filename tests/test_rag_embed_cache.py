@@ -0,0 +1,71 @@
+"""Tests for the query-embedding cache (no embedding model needed)."""
+import numpy as np
+
+from rag.embed_cache import CachedEmbedder, normalize_query
+
+
+class _CountingModel:
+    def __init__(self):
+        self.calls = []
+        self.max_seq_length = 256
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        self.calls.append(sentences)
+        if isinstance(sentences, list):
+            return np.stack([self.encode(s) for s in sentences])
+        return np.full(4, float(len(sentences)), dtype=np.float32)
+
+
+def test_normalize_query():
+    assert normalize_query("  When is   FAJR? ") == "when is fajr"
+    assert normalize_query("what is the isha angle") == normalize_query("What is the Isha angle?!")
+
+
+def test_repeated_questions_hit_the_cache():
+    model = _CountingModel()
+    emb = CachedEmbedder(model, "fake")
+    first = emb.encode("When is Fajr?", normalize_embeddings=True)
+    again = emb.encode("when is fajr", normalize_embeddings=True)
+    assert again is first
+    assert model.calls == ["When is Fajr?"]
+    assert emb.stats["hits"] == 1 and emb.stats["misses"] == 1
+
+
+def test_miss_encodes_the_original_text():
+    model = _CountingModel()
+    emb = CachedEmbedder(model, "fake")
+    question = "  When is   FAJR?! "
+    np.testing.assert_array_equal(emb.encode(question), _CountingModel().encode(question))
+    assert model.calls == [question]
+
+
+def test_batches_and_attributes_pass_through():
+    model = _CountingModel()
+    emb = CachedEmbedder(model, "fake")
+    assert emb.encode(["a", "bb"]).shape == (2, 4)
+    assert emb.max_seq_length == 256
+    assert emb.stats["misses"] == 0
+
+
+def test_lru_eviction():
+    model = _CountingModel()
+    emb = CachedEmbedder(model, "fake", maxsize=2)
+    for q in ("a", "b", "a", "c", "b"):
+        emb.encode(q)
+    assert model.calls == ["a", "b", "c", "b"]
+    assert emb.stats["size"] == 2
+
+
+def test_persistence_round_trip(tmp_path):
+    path = tmp_path / "queries.npz"
+    emb = CachedEmbedder(_CountingModel(), "fake", path=path)
+    vec = emb.encode("isha angle", normalize_embeddings=True)
+    emb.save()
+
+    model = _CountingModel()
+    warm = CachedEmbedder(model, "fake", path=path)
+    np.testing.assert_array_equal(warm.encode("Isha angle?", normalize_embeddings=True), vec)
+    assert model.calls == []
+
+    cold = CachedEmbedder(_CountingModel(), "other-model", path=path)
+    assert cold.stats["size"] == 0
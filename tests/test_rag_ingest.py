@@ -1,5 +1,12 @@
 """Tests for the RAG ingestion pipeline (no API keys needed)."""
-from rag.ingest import chunk_text, CHUNK_SIZE, OVERLAP
+import numpy as np
+
+import rag.ingest
+from rag.ingest import (
+    CHUNK_SIZE, OVERLAP, build_index, chunk_docs, chunk_hash, chunk_text,
+    embed_chunks, load_cached_embeddings,
+)
+from rag.store import write_index
 
 
 def test_short_text_is_single_chunk():
@@ -49,3 +56,63 @@ def test_empty_text_returns_empty():
 
 def test_whitespace_only_returns_empty():
     assert chunk_text("   \n\n   ") == []
+
+
+# ── Incremental embedding ─────────────────────────────────────────────────────
+
+
+class _FakeModel:
+    def __init__(self):
+        self.encoded: list[str] = []
+
+    def encode(self, texts, **kw):
+        self.encoded.extend(texts)
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def _docs(**texts):
+    return [{"source": name, "text": text} for name, text in texts.items()]
+
+
+def test_chunk_hash_depends_only_on_text():
+    a, b = chunk_docs(_docs(a="same text", b="same text"))
+    assert a["hash"] == b["hash"] == chunk_hash("same text")
+
+
+def test_embed_chunks_reuses_cached_vectors():
+    model = _FakeModel()
+    chunks = chunk_docs(_docs(a="old paragraph", b="new paragraph"))
+    cached = {chunk_hash("old paragraph"): np.array([9.0, 9.0], dtype=np.float32)}
+    matrix = embed_chunks(chunks, cached, lambda: model)
+    assert model.encoded == ["new paragraph"]
+    assert matrix[0].tolist() == [9.0, 9.0]
+
+
+def test_embed_chunks_skips_model_when_nothing_changed():
+    chunks = chunk_docs(_docs(a="unchanged"))
+    cached = {chunk_hash("unchanged"): np.ones(2, dtype=np.float32)}
+
+    def _loader():
+        raise AssertionError("model should not be loaded")
+
+    assert embed_chunks(chunks, cached, _loader).shape == (1, 2)
+
+
+def test_reindex_round_trip_drops_deleted_docs(tmp_path):
+    path = tmp_path / "index"
+    model = _FakeModel()
+    chunks, matrix = build_index(_docs(a="alpha", b="beta"), lambda: model)
+    write_index(chunks, matrix, path, embed_model=rag.ingest.EMBED_MODEL)
+
+    cached = load_cached_embeddings(path)
+    assert set(cached) == {chunk_hash("alpha"), chunk_hash("beta")}
+    chunks, _ = build_index(_docs(a="alpha"), lambda: model, cached)
+    assert [c["text"] for c in chunks] == ["alpha"]
+    assert model.encoded == ["alpha", "beta"]   # nothing re-embedded
+
+
+def test_cached_embeddings_ignored_for_other_model(tmp_path):
+    path = tmp_path / "index"
+    chunks, matrix = build_index(_docs(a="alpha"), _FakeModel)
+    write_index(chunks, matrix, path, embed_model="some-other-model")
+    assert load_cached_embeddings(path) == {}
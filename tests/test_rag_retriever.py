@@ -0,0 +1,98 @@
+"""Tests for the pluggable RAG retrievers (no embedding model needed)."""
+import numpy as np
+
+from rag.query import retrieve
+from rag.retriever import (
+    IVF_FILE, ExactRetriever, IVFRetriever, as_retriever, load_retriever, recall_at_k,
+    top_k_indices,
+)
+from rag.store import write_index
+
+
+def _clustered(n=2000, dim=16, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    data = centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _queries(matrix, n=50, seed=1):
+    rng = np.random.default_rng(seed)
+    q = matrix[rng.integers(len(matrix), size=n)] + 0.1 * rng.normal(size=(n, matrix.shape[1]))
+    return (q / np.linalg.norm(q, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).normal(size=500)
+    np.testing.assert_array_equal(top_k_indices(scores, 7), np.argsort(scores)[::-1][:7])
+    assert len(top_k_indices(scores[:3], 10)) == 3
+    assert len(top_k_indices(scores, 0)) == 0
+    idx, scores = ExactRetriever(_clustered(50)).search(_clustered(1)[0], 0)
+    assert len(idx) == 0 and len(scores) == 0
+
+
+def test_exact_retriever_returns_best_first():
+    matrix = _clustered(200)
+    idx, scores = ExactRetriever(matrix).search(matrix[42], 4)
+    assert idx[0] == 42
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_ivf_recall_improves_with_nprobe():
+    matrix = _clustered()
+    exact = ExactRetriever(matrix)
+    queries = _queries(matrix)
+    ivf = IVFRetriever.build(matrix, nlist=32, nprobe=1)
+    low = recall_at_k(ivf, exact, queries, 5)
+    ivf.nprobe = 8
+    high = recall_at_k(ivf, exact, queries, 5)
+    ivf.nprobe = 32
+    assert recall_at_k(ivf, exact, queries, 5) == 1.0
+    assert low <= high
+    assert high >= 0.9
+
+
+def test_ivf_lists_cover_every_row_once():
+    matrix = _clustered(500)
+    ivf = IVFRetriever.build(matrix, nlist=10)
+    assert ivf.offsets[-1] == len(matrix)
+    assert sorted(ivf.list_ids.tolist()) == list(range(len(matrix)))
+
+
+def test_ivf_falls_back_to_exact_when_probes_are_too_small():
+    matrix = _clustered(50)
+    ivf = IVFRetriever.build(matrix, nlist=25, nprobe=1)
+    idx, _ = ivf.search(matrix[0], 10)
+    assert len(idx) == 10
+
+
+def test_ivf_persists_and_is_ignored_once_stale(tmp_path):
+    path = tmp_path / "index"
+    matrix = _clustered(300)
+    chunks = [{"source": "doc.md", "chunk_id": i, "text": str(i)} for i in range(len(matrix))]
+    write_index(chunks, matrix, path)
+
+    assert isinstance(load_retriever(path, matrix), ExactRetriever)
+    IVFRetriever.build(matrix, nlist=8).save(path)
+    loaded = load_retriever(path, matrix, nprobe=3)
+    assert isinstance(loaded, IVFRetriever)
+    assert loaded.nprobe == 3
+    assert isinstance(load_retriever(path, matrix, kind="exact"), ExactRetriever)
+
+    write_index(chunks, matrix[::-1].copy(), path)
+    assert (path / IVF_FILE).exists()
+    assert isinstance(load_retriever(path, matrix, kind="ivf"), ExactRetriever)
+
+
+def test_retrieve_accepts_matrix_or_retriever():
+    class _Embedder:
+        def encode(self, text, normalize_embeddings=True):
+            return matrix[int(text)]
+
+    matrix = _clustered(300)
+    records = [{"source": "doc.md", "chunk_id": i, "text": str(i)} for i in range(len(matrix))]
+    plain = retrieve("7", records, matrix, _Embedder(), top_k=3)
+    via_ivf = retrieve("7", records, IVFRetriever.build(matrix, nlist=8, nprobe=8), _Embedder(), top_k=3)
+    assert plain[0]["chunk_id"] == 7
+    assert [r["chunk_id"] for r in plain] == [r["chunk_id"] for r in via_ivf]
+    assert as_retriever(matrix).matrix is matrix
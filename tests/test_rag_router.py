@@ -0,0 +1,77 @@
+"""Tests for the local TOOL/RAG router (no LLM or embedding model needed)."""
+import zlib
+
+import numpy as np
+import pytest
+
+from rag.router import EXEMPLARS, RAG, TOOL, Router, keyword_route
+
+
+class _BagOfWords:
+    """Toy embedder: hashed bag of lower-cased words."""
+
+    def encode(self, sentences, normalize_embeddings=True):
+        if isinstance(sentences, list):
+            return np.stack([self.encode(s) for s in sentences])
+        vec = np.zeros(64, dtype=np.float32)
+        for word in sentences.lower().strip("?").split():
+            vec[zlib.crc32(word.encode()) % 64] += 1
+        return vec / (np.linalg.norm(vec) or 1)
+
+
+def _never():
+    raise AssertionError("LLM classifier should not be called")
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("When is Fajr in Toronto?", TOOL),
+    ("what time is isha tomorrow", TOOL),
+    ("Prayer times for London", TOOL),
+    ("How long until Maghrib?", TOOL),
+    ("What is the Isha angle?", RAG),
+    ("What angle is used for Isha?", RAG),
+    ("Explain the Hanafi Asr method", RAG),
+    ("How do I change the calculation method?", RAG),
+    ("and tomorrow?", None),
+    ("Why is Isha so late in London?", None),
+])
+def test_keyword_route(question, expected):
+    assert keyword_route(question) == expected
+
+
+def test_every_exemplar_routes_without_the_llm():
+    router = Router()
+    for label, questions in EXEMPLARS.items():
+        for q in questions:
+            assert router.route(q, _never, embedder=_BagOfWords()).route == label
+
+
+def test_exemplars_decide_when_keywords_abstain():
+    router = Router(threshold=0.5, margin=0.0)
+    decision = router.route("Does the app find my location?", _never, embedder=_BagOfWords())
+    assert decision.source == "exemplars"
+    assert decision.route == RAG
+
+
+def test_ambiguous_follow_up_falls_back_to_llm():
+    router = Router()
+    history = [{"role": "user", "content": "When is Fajr in Toronto?"},
+               {"role": "assistant", "content": "5:12 AM"}]
+    decision = router.route("and in London?", lambda: TOOL, embedder=_BagOfWords(), history=history)
+    assert decision == decision.__class__(TOOL, "llm", 1.0)
+
+
+def test_llm_mode_always_calls_fallback():
+    router = Router(mode="llm")
+    assert router.route("When is Fajr today?", lambda: RAG).source == "llm"
+
+
+def test_stats_count_decisions_per_stage():
+    router = Router()
+    router.route("When is Fajr today?", _never)
+    router.route("What is the Isha angle?", _never)
+    router.route("hello", lambda: RAG)
+    stats = router.stats
+    assert stats["decisions"] == {"keywords": {TOOL: 1, RAG: 1}, "llm": {RAG: 1}}
+    assert stats["llm_fallback_rate"] == pytest.approx(1 / 3, abs=1e-3)
+    assert set(stats["avg_ms"]) == {"keywords", "llm"}
@@ -0,0 +1,114 @@
+"""Tests for the binary RAG index format (no embedding model needed)."""
+import json
+
+import numpy as np
+import pytest
+
+import rag.store
+from rag.store import (
+    IndexFormatError, index_exists, index_version, load_index, save_index,
+)
+
+
+def _records(n=5, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"source": "doc.md", "chunk_id": i, "text": f"chunk {i}",
+         "embedding": rng.normal(size=dim).tolist()}
+        for i in range(n)
+    ]
+
+
+def test_round_trip_is_memory_mapped_and_normalised(tmp_path):
+    path = tmp_path / "index"
+    save_index(_records(), path)
+    records, matrix = load_index(path)
+    assert isinstance(matrix, np.memmap)
+    assert matrix.shape == (5, 8)
+    assert [r["chunk_id"] for r in records] == list(range(5))
+    assert "embedding" not in records[0]
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-5)
+
+
+def test_float16_storage(tmp_path):
+    path = tmp_path / "index"
+    save_index(_records(), path, dtype="float16")
+    _, matrix = load_index(path)
+    assert matrix.dtype == np.float16
+
+
+def test_verify_detects_corruption(tmp_path):
+    path = tmp_path / "index"
+    save_index(_records(), path)
+    emb = path / json.loads((path / "meta.json").read_text())["embeddings"]
+    data = bytearray(emb.read_bytes())
+    data[-1] ^= 0xFF
+    emb.write_bytes(bytes(data))
+    load_index(path)   # unverified load still works
+    with pytest.raises(IndexFormatError):
+        load_index(path, verify=True)
+
+
+def test_crash_before_meta_keeps_previous_index(tmp_path, monkeypatch):
+    path = tmp_path / "index"
+    save_index(_records(n=5, seed=0), path)
+    before_records, before_matrix = load_index(path)
+    before = np.array(before_matrix)
+
+    real_write = rag.store.atomic_write
+
+    def crash_on_meta(target, data):
+        if target.name == "meta.json":
+            raise OSError("disk full")
+        real_write(target, data)
+
+    monkeypatch.setattr(rag.store, "atomic_write", crash_on_meta)
+    with pytest.raises(OSError):
+        save_index(_records(n=7, seed=1), path)
+
+    records, matrix = load_index(path, verify=True)
+    assert len(records) == len(before_records) == 5
+    np.testing.assert_array_equal(matrix, before)
+
+
+def test_rebuild_removes_old_embeddings(tmp_path):
+    path = tmp_path / "index"
+    save_index(_records(seed=0), path)
+    save_index(_records(seed=1), path)
+    assert len(list(path.glob("embeddings-*.npy"))) == 1
+
+
+def test_version_1_index_is_still_readable(tmp_path):
+    path = tmp_path / "index"
+    meta = save_index(_records(), path)
+    (path / meta.pop("embeddings")).rename(path / "embeddings.npy")
+    meta["format_version"] = 1
+    (path / "meta.json").write_text(json.dumps(meta))
+    records, matrix = load_index(path, verify=True)
+    assert matrix.shape == (5, 8)
+
+
+def test_legacy_index_json_is_migrated(tmp_path):
+    legacy = tmp_path / "index.json"
+    legacy.write_text(json.dumps(_records()))
+    path = tmp_path / "index"
+    assert index_exists(path)
+    records, matrix = load_index(path)
+    assert (path / "meta.json").exists()
+    assert len(records) == 5
+    _, legacy_matrix = load_index(legacy)
+    np.testing.assert_allclose(matrix, legacy_matrix, rtol=1e-6)
+
+
+def test_index_version_changes_with_content(tmp_path):
+    path = tmp_path / "index"
+    save_index(_records(seed=0), path)
+    v1 = index_version(path)
+    save_index(_records(seed=1), path)
+    assert index_version(path) != v1
+
+
+def test_missing_index(tmp_path):
+    assert not index_exists(tmp_path / "index")
+    with pytest.raises(IndexFormatError):
+        load_index(tmp_path / "index")
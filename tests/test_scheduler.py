@@ -0,0 +1,107 @@
+"""Tests for adhan.scheduler — driven through tick() with a fake clock."""
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytz
+import pytest
+
+from adhan.calculator import build_params, calculate
+from adhan.models import Config, Coordinates
+from adhan.scheduler import PrayerScheduler
+
+TZ = pytz.timezone("Europe/London")
+LONDON = Coordinates(latitude=51.5074, longitude=-0.1278)
+PARAMS = build_params(Config())
+
+
+def _make_clock(tmp_path):
+    clock = MagicMock()
+    clock.timezone = TZ
+    clock.config_path = tmp_path / "config.json"
+    clock.get_prayer_times.side_effect = lambda d: calculate(d, LONDON, PARAMS, TZ)
+    return clock
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def scheduler(tmp_path, fired):
+    return PrayerScheduler(_make_clock(tmp_path), on_prayer=fired.append)
+
+
+def _times(day):
+    return calculate(day, LONDON, PARAMS, TZ)
+
+
+def test_tick_sleeps_until_next_prayer(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    now = pt.dhuhr - timedelta(minutes=5)
+    assert scheduler.tick(now) == pytest.approx(300)
+    assert fired == []
+
+
+def test_tick_fires_due_event_once(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.dhuhr - timedelta(minutes=5))
+    scheduler.tick(pt.dhuhr)
+    scheduler.tick(pt.dhuhr + timedelta(seconds=1))
+    assert [e.name for e in fired] == ["Dhuhr"]
+
+
+def test_missed_event_recovered_within_grace(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.dhuhr - timedelta(minutes=5))
+    scheduler.tick(pt.dhuhr + timedelta(minutes=3))    # woke late, e.g. after suspend
+    assert [e.name for e in fired] == ["Dhuhr"]
+
+
+def test_reschedule_after_small_move_does_not_replay(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.dhuhr - timedelta(minutes=5))
+    scheduler.tick(pt.dhuhr)
+    # Half a degree west: Dhuhr moves about two minutes later
+    moved = Coordinates(latitude=LONDON.latitude, longitude=LONDON.longitude - 0.5)
+    scheduler._clock.get_prayer_times.side_effect = lambda d: calculate(d, moved, PARAMS, TZ)
+    assert calculate(date(2024, 6, 1), moved, PARAMS, TZ).dhuhr > pt.dhuhr
+    scheduler.reschedule()
+    scheduler.tick(pt.dhuhr + timedelta(minutes=4))
+    assert [e.name for e in fired] == ["Dhuhr"]
+
+
+def test_missed_event_skipped_beyond_grace(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.dhuhr - timedelta(minutes=5))
+    scheduler.tick(pt.asr + timedelta(seconds=1))
+    assert [e.name for e in fired] == ["Asr"]
+
+
+def test_prayers_before_start_are_not_fired(scheduler, fired):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.dhuhr + timedelta(seconds=30))
+    assert fired == []
+
+
+def test_date_change_refreshes_settings(scheduler):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.maghrib + timedelta(minutes=30))
+    scheduler._clock.refresh_settings.assert_not_called()
+    scheduler.tick(TZ.localize(datetime(2024, 6, 2, 0, 0, 1)))
+    scheduler._clock.refresh_settings.assert_called_once()
+
+
+def test_sleep_never_passes_midnight(scheduler):
+    pt = _times(date(2024, 6, 1))
+    now = pt.maghrib + timedelta(minutes=1)
+    midnight = TZ.localize(datetime(2024, 6, 2))
+    assert scheduler.tick(now) <= (midnight - now).total_seconds()
+
+
+def test_upcoming_is_sorted_and_spans_tomorrow(scheduler):
+    pt = _times(date(2024, 6, 1))
+    scheduler.tick(pt.fajr - timedelta(minutes=1))
+    events = scheduler.upcoming()
+    assert events == sorted(events)
+    assert events[-1].time.date() == date(2024, 6, 2)
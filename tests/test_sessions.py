@@ -0,0 +1,140 @@
+"""Tests for the bounded chat session store."""
+import asyncio
+import time
+
+import pytest
+
+from api.sessions import (
+    MemorySessionStore, SessionStore, SQLiteSessionStore, estimate_tokens, trim_history,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            store = MemorySessionStore(**kwargs)
+        else:
+            store = SQLiteSessionStore(tmp_path / "sessions.sqlite3", **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_turns_round_trip(make_store):
+    store = make_store()
+    store.save_turn("a", "When is Fajr?", "05:12")
+    store.save_turn("a", "And Isha?", "21:40")
+    assert [m["content"] for m in store.get_history("a")] == [
+        "When is Fajr?", "05:12", "And Isha?", "21:40",
+    ]
+    assert store.get_history("missing") == []
+
+
+def test_expired_sessions_are_dropped_on_read_and_by_sweep(make_store, monkeypatch):
+    store = make_store(ttl=60)
+    store.save_turn("old", "q", "a")
+    store.save_turn("also-old", "q", "a")
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert store.get_history("old") == []
+    assert store.sweep() == 1
+    assert store.stats["expired"] == 2
+    assert len(store) == 0
+
+
+def test_lru_bound_evicts_least_recently_active(make_store, monkeypatch):
+    store = make_store(max_sessions=2)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(time, "time", lambda: next(clock))
+    for sid in ("a", "b", "a", "c"):
+        store.save_turn(sid, "q", "a")
+    assert store.get_history("b") == []
+    assert store.get_history("a") and store.get_history("c")
+    assert store.stats["evicted"] == 1
+
+
+def test_history_is_trimmed_to_token_budget(make_store):
+    store = make_store(max_tokens=30)
+    for i in range(10):
+        store.save_turn("a", f"question {i} " + "x" * 20, f"answer {i}")
+    history = store.get_history("a")
+    assert sum(estimate_tokens(m["content"]) for m in history) <= 30
+    assert history[-1]["content"] == "answer 9"
+    assert store.stats["trimmed_messages"] == 20 - len(history)
+
+
+def test_trim_history_keeps_the_latest_turn_even_if_too_long():
+    turn = [{"role": "user", "content": "x" * 400}, {"role": "assistant", "content": "y"}]
+    assert trim_history(turn, 10) == turn
+
+
+def test_background_sweeper(make_store):
+    store = make_store(ttl=0.05)
+    store.save_turn("a", "q", "a")
+    store.start_sweeper(interval=0.02)
+    deadline = time.time() + 2
+    while len(store) and time.time() < deadline:
+        time.sleep(0.02)
+    store.stop_sweeper()
+    assert len(store) == 0
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoExpiry(SessionStore):
+        def _load(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        NoExpiry()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def test_chat_api_keeps_session_io_off_the_event_loop(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as api_main
+    import rag.chat as chat
+
+    calls = []
+
+    class Store(SQLiteSessionStore):
+        def get_history(self, session_id):
+            calls.append(("get", _on_event_loop()))
+            return super().get_history(session_id)
+
+        def save_turn(self, session_id, user_msg, assistant_msg):
+            calls.append(("save", _on_event_loop()))
+            super().save_turn(session_id, user_msg, assistant_msg)
+
+    async def fake_answer(*args, **kwargs):
+        async def tokens():
+            yield "Fajr at 05:12"
+        return tokens(), []
+
+    store = Store(tmp_path / "sessions.sqlite3")
+    monkeypatch.setattr(api_main, "_sessions", store)
+    monkeypatch.setattr(chat, "answer_stream_with_tools_async", fake_answer)
+    for key, value in {"ready": True, "records": [], "matrix": None, "embedder": None,
+                       "client": None, "model": "m", "answer_cache": None}.items():
+        monkeypatch.setitem(api_main._rag, key, value)
+
+    client = TestClient(api_main.app)
+    client.get("/api/chat", params={"q": "Fajr?", "session_id": "s1"})
+    assert calls == [("get", False), ("save", False)]
+    assert store.get_history("s1")[-1]["content"] == "Fajr at 05:12"
+    assert client.delete("/api/session/s1").json() == {"ok": True}
+    assert store.get_history("s1") == []
+    store.close()
@@ -0,0 +1,75 @@
+"""Tests for annual timetable export and its on-disk cache."""
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+import pytz
+
+from adhan.calculator import build_params, calculate
+from adhan.models import Config, Coordinates
+from adhan.timetable import TimetableCache, build_year, download_name, render_ics, timetable_key
+
+_TORONTO = Coordinates(43.6532, -79.3832)
+_TZ = pytz.timezone("America/Toronto")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TimetableCache(tmp_path / "timetables")
+
+
+def test_csv_has_a_row_per_day_matching_calculate(cache):
+    config = Config(method="MUSLIM_WORLD_LEAGUE")
+    path = cache.get(_TORONTO, _TZ, "Toronto", config, 2028, "csv")
+    rows = list(csv.DictReader(io.StringIO(path.read_text())))
+    assert len(rows) == 366
+    day = calculate(date(2028, 7, 4), _TORONTO, build_params(config), _TZ)
+    assert {k: v for k, v in rows[185].items() if k != "Date"} == day.as_dict()
+
+
+def test_json_is_columnar(cache):
+    path = cache.get(_TORONTO, _TZ, "Toronto", Config(), 2027, "json")
+    data = json.loads(path.read_text())
+    assert (data["start"], data["end"]) == ("2027-01-01", "2027-12-31")
+    assert data["method"] == "NORTH_AMERICA"
+    assert len(data["times"]["Fajr"]) == 365
+
+
+def test_ics_has_five_events_per_day_in_utc():
+    ics = render_ics(build_year(_TORONTO, _TZ, Config(), 2027), "Toronto")
+    assert ics.startswith("BEGIN:VCALENDAR\r\n")
+    assert ics.count("BEGIN:VEVENT") == 5 * 365
+    assert all(len(line.encode()) <= 75 for line in ics.split("\r\n"))
+    assert "DTSTART:20270101T" in ics and "SUMMARY:Isha" in ics
+
+
+def test_cache_reuses_files_and_keys_on_method_and_angles(cache):
+    first = cache.get(_TORONTO, _TZ, "Toronto", Config(), 2027, "csv")
+    again = cache.get(_TORONTO, _TZ, "Toronto", Config(), 2027, "csv")
+    assert first == again
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    other = cache.get(_TORONTO, _TZ, "Toronto", Config(fajr_angle=18.0), 2027, "csv")
+    assert other != first
+    assert timetable_key(_TORONTO, _TZ, Config(), 2027) != timetable_key(_TORONTO, _TZ, Config(), 2028)
+    assert cache.clear() == 2
+
+
+def test_cache_keys_on_the_displayed_city_name(cache):
+    mecca = Coordinates(latitude=21.4225, longitude=39.8262)
+    tz = pytz.timezone("Asia/Riyadh")
+    first = cache.get(mecca, tz, "Mecca", Config(), 2027, "json")
+    second = cache.get(mecca, tz, "Makkah", Config(), 2027, "json")
+    assert first != second
+    assert json.loads(second.read_text(encoding="utf-8"))["city"] == "Makkah"
+
+
+def test_unknown_format_is_rejected(cache):
+    with pytest.raises(ValueError):
+        cache.get(_TORONTO, _TZ, "Toronto", Config(), 2027, "pdf")
+
+
+def test_download_name():
+    assert download_name("New York, NY, USA", 2027, "ics") == "New_York-2027.ics"
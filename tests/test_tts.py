@@ -0,0 +1,121 @@
+"""Tests for gui.tts — sentence splitting, the clip cache and pipelined playback."""
+import os
+import threading
+import time
+
+import pytest
+
+from gui import tts
+
+
+class FakeEngine:
+    name = "fake"
+    extension = ".wav"
+
+    def __init__(self, delay: float = 0.0, fail_on: str | None = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls: list[tuple[str, str]] = []
+
+    def synthesize(self, text, language):
+        time.sleep(self.delay)
+        if text == self.fail_on:
+            raise RuntimeError("synthesis failed")
+        self.calls.append((text, language))
+        return f"{language}:{text}".encode()
+
+
+def test_split_sentences():
+    text = "Fajr is at 05:12. Dhuhr is at 13:04!\n- Asr: 16:30\n\nPi is 3.14 today?  ..."
+    assert tts.split_sentences(text) == [
+        "Fajr is at 05:12.", "Dhuhr is at 13:04!", "Asr: 16:30", "Pi is 3.14 today?",
+    ]
+    assert tts.split_sentences("فجر کا وقت ہے۔ ظہر کب ہے؟") == ["فجر کا وقت ہے۔", "ظہر کب ہے؟"]
+    assert tts.split_sentences("  \n ") == []
+
+
+def test_cache_keys_and_hits(tmp_path):
+    cache = tts.TtsCache(tmp_path)
+    engine = FakeEngine()
+    key = cache.path_for("Fajr  is at 05:12", "en", engine)
+    assert key == cache.path_for("Fajr is at 05:12", "en", engine)
+    assert key != cache.path_for("Fajr is at 05:12", "ur", engine)
+    assert key.suffix == ".wav"
+
+    path = cache.get("Fajr is at 05:12", "en", engine)
+    assert path.read_bytes() == b"en:Fajr is at 05:12"
+    assert cache.get("Fajr is at 05:12", "en", engine) == path
+    assert engine.calls == [("Fajr is at 05:12", "en")]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_prunes_least_recently_used(tmp_path):
+    cache = tts.TtsCache(tmp_path, max_files=2)
+    engine = FakeEngine()
+    first = cache.get("one", "en", engine)
+    old = time.time() - 100
+    os.utime(first, (old, old))
+    cache.get("two", "en", engine)
+    cache.get("three", "en", engine)
+    assert not first.exists()
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_speak_plays_in_order_while_synthesising(tmp_path):
+    engine = FakeEngine(delay=0.05)
+    played: list[tuple[bytes, int]] = []
+
+    def player(path, stop):
+        played.append((path.read_bytes(), len(engine.calls)))
+
+    n = tts.speak("One. Two. Three.", "en", engine, tts.TtsCache(tmp_path), player)
+    assert n == 3
+    assert [audio for audio, _ in played] == [b"en:One.", b"en:Two.", b"en:Three."]
+    assert played[0][1] < 3      # first sentence played before the last was synthesised
+
+
+def test_stop_mid_queue_skips_remaining_sentences(tmp_path):
+    stop = threading.Event()
+    playing = threading.Event()
+    played, result = [], []
+
+    def player(path, stop_event):
+        played.append(path.read_bytes())
+        playing.set()
+        stop_event.wait(5)              # a long clip, cut off by stop()
+
+    speaker = threading.Thread(target=lambda: result.append(tts.speak(
+        "One. Two. Three. Four.", "en", FakeEngine(), tts.TtsCache(tmp_path), player, stop,
+    )))
+    speaker.start()
+    assert playing.wait(5)
+    stop.set()                          # what TtsWorker.stop() does
+    speaker.join(5)
+    assert result == [1]
+    assert played == [b"en:One."]
+
+
+def test_speak_stop_and_errors(tmp_path):
+    stop = threading.Event()
+    played = []
+
+    def player(path, stop_event):
+        played.append(path)
+        stop_event.set()
+
+    engine = FakeEngine()
+    assert tts.speak("One. Two. Three.", "en", engine, tts.TtsCache(tmp_path), player, stop) == 1
+    assert len(played) == 1
+
+    with pytest.raises(RuntimeError, match="synthesis failed"):
+        tts.speak("Ok. Bad.", "en", FakeEngine(fail_on="Bad."),
+                  tts.TtsCache(tmp_path / "b"), lambda p, s: None)
+
+
+def test_default_engine(monkeypatch):
+    monkeypatch.setattr(tts.shutil, "which", lambda name: None)
+    assert tts.default_engine("auto").name == "gtts"
+    monkeypatch.setattr(tts.shutil, "which", lambda name: f"/usr/bin/{name}")
+    assert tts.default_engine("auto").name == "espeak"
+    with pytest.raises(ValueError):
+        tts.default_engine("nope")
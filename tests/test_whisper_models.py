@@ -0,0 +1,102 @@
+"""Tests for gui.whisper_models — a fake loader stands in for faster-whisper."""
+import threading
+import time
+
+import pytest
+
+import gui.whisper_models as whisper_models
+from gui.whisper_models import WhisperRegistry
+
+
+class _Loader:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, size):
+        self.calls.append(size)
+        time.sleep(self.delay)
+        return f"model-{size}"
+
+
+def test_model_is_loaded_once_and_reused():
+    loader = _Loader()
+    registry = WhisperRegistry(loader)
+    for _ in range(3):
+        with registry.use("tiny") as model:
+            assert model == "model-tiny"
+    assert loader.calls == ["tiny"]
+
+
+def test_preload_and_concurrent_users_share_one_load():
+    loader = _Loader(delay=0.1)
+    registry = WhisperRegistry(loader)
+    registry.preload("tiny")
+    results = []
+
+    def worker():
+        with registry.use("tiny") as model:
+            results.append(model)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert results == ["model-tiny"] * 4
+    assert loader.calls == ["tiny"]
+
+
+def test_use_is_exclusive():
+    registry = WhisperRegistry(_Loader())
+    active, overlap = [], []
+
+    def worker():
+        with registry.use("tiny"):
+            active.append(1)
+            overlap.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert max(overlap) == 1
+
+
+def test_switching_size_unloads_the_idle_model():
+    registry = WhisperRegistry(_Loader(), max_models=1)
+    with registry.use("large-v3"):
+        pass
+    with registry.use("tiny"):
+        pass
+    assert registry.loaded == ["tiny"]
+    assert registry.stats["unloads"] == 1
+
+
+def test_models_in_use_are_not_unloaded():
+    registry = WhisperRegistry(_Loader())
+    with registry.use("tiny"):
+        assert registry.unload() == 0
+    assert registry.unload("tiny") == 1
+    assert registry.loaded == []
+
+
+def test_memory_pressure_unloads_idle_models(monkeypatch):
+    registry = WhisperRegistry(_Loader(), min_available_mb=512)
+    monkeypatch.setattr(whisper_models, "memory_available_mb", lambda: 4096.0)
+    with registry.use("tiny"):
+        pass
+    assert registry.loaded == ["tiny"]
+    monkeypatch.setattr(whisper_models, "memory_available_mb", lambda: 100.0)
+    with registry.use("tiny"):
+        pass
+    assert registry.loaded == []
+
+
+def test_unknown_size_is_rejected():
+    with pytest.raises(ValueError):
+        with WhisperRegistry(_Loader()).use("gigantic"):
+            pass
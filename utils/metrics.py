@@ -0,0 +1,211 @@
+"""
+Lightweight metrics and per-request tracing.
+
+    @timed("retrieve")              # function (sync or async) → span histogram
+    with timer("embed"): ...        # block → span histogram
+    inc("chat_tokens_total", 42)    # counter
+    observe("chat_ttft_seconds", t) # histogram
+
+Spans are also added to the current request's Trace (if one is active, see
+trace()), which the chat API can send back as an SSE trailer.  render()
+produces Prometheus text exposition for /api/metrics.
+
+Disabled by default; set ADHAN_METRICS=1 or call enable().  When disabled,
+every helper returns after a single flag check — no clock reads, no locks,
+no allocation.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+PREFIX = "adhan_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = os.environ.get("ADHAN_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], list] = {}    # [bucket counts..., sum, count]
+_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        i = bisect_left(BUCKETS, value)
+        if i < len(BUCKETS):
+            h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+
+def _record_span(span: str, seconds: float) -> None:
+    observe("span_seconds", seconds, span=span)
+    current = _trace.get()
+    if current is not None:
+        current.add(span, seconds)
+
+
+@contextmanager
+def timer(span: str) -> Iterator[None]:
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_span(span, time.perf_counter() - start)
+
+
+def timed(span: str):
+    """Decorator: record each call of a sync or async function as `span`."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record_span(span, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record_span(span, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# ── Per-request tracing ───────────────────────────────────────────────────────
+
+class Trace:
+    """Span durations for one request (summed if a span repeats)."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.spans: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, span: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[span] = self.spans.get(span, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            spans = {k: round(v * 1000, 1) for k, v in self.spans.items()}
+        spans["total"] = round((time.perf_counter() - self.start) * 1000, 1)
+        return spans
+
+
+@contextmanager
+def trace() -> Iterator[Optional[Trace]]:
+    """
+    Collect spans recorded in this context (and in contexts copied from it,
+    e.g. executor calls wrapped with contextvars.copy_context()).  Yields
+    None when metrics are disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+    t = Trace()
+    previous = _trace.set(t).old_value
+    try:
+        yield t
+    finally:
+        # set(), not reset(): a streaming response may be closed from another context
+        _trace.set(None if previous is contextvars.Token.MISSING else previous)
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def render() -> str:
+    """All metrics in Prometheus text format (version 0.0.4)."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+
+    lines: list[str] = []
+    typed: set[str] = set()
+    for (name, labels), value in counters:
+        metric = PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+    for (name, labels), h in histograms:
+        metric = PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {h[-1]}")
+        lines.append(f"{metric}_sum{_labels(labels)} {_number(h[-2])}")
+        lines.append(f"{metric}_count{_labels(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    parts = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+             for k, v in labels)
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)